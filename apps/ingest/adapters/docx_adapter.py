@@ -1,22 +1,43 @@
-from typing import List
-from docx import Document
+from typing import Dict, Iterator, List
+
+from rag.docx_stream import iter_docx
 
 from ..models import ContractChunk
-from ..utils import split_into_sections, count_tokens, new_id
+from ..utils import chunk_id, chunk_section, is_heading
+
+
+def iter_chunks(path: str, contract_id: str) -> Iterator[ContractChunk]:
+    """Stream the chunks of a DOCX file one section at a time.
+
+    Blocks are read with :func:`rag.docx_stream.iter_docx` and only the
+    section being chunked is held in memory.  Paragraphs with a heading
+    style, or that look like headings, start a new section; table cells
+    never do.
+    """
+    seen: Dict[str, int] = {}
+    section = "preamble"
+    body: List[str] = []
+
+    def flush() -> Iterator[ContractChunk]:
+        for piece in chunk_section("".join(body), section):
+            yield ContractChunk(
+                id=chunk_id(contract_id, piece.section, piece.text, seen),
+                contract_id=contract_id,
+                section=piece.section,
+                text=piece.text,
+                page=piece.page,
+                tokens=piece.tokens,
+            )
+
+    for block in iter_docx(path):
+        heading = block.text.strip()
+        if block.kind != "cell" and heading and (block.kind == "heading" or is_heading(heading)):
+            yield from flush()
+            section, body = heading, []
+        else:
+            body.append(block.text + block.sep)
+    yield from flush()
 
 
 def ingest(path: str, contract_id: str) -> List[ContractChunk]:
-    doc = Document(path)
-    text = "\n".join(p.text for p in doc.paragraphs)
-    chunks: List[ContractChunk] = []
-    for section, section_text in split_into_sections(text):
-        chunk = ContractChunk(
-            id=new_id(),
-            contract_id=contract_id,
-            section=section,
-            text=section_text,
-            page=1,
-            tokens=count_tokens(section_text),
-        )
-        chunks.append(chunk)
-    return chunks
+    return list(iter_chunks(path, contract_id))
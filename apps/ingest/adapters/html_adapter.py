@@ -1,14 +1,15 @@
-from typing import List
+from typing import Dict, List
 from bs4 import BeautifulSoup
 
 from ..models import ContractChunk
-from ..utils import count_tokens, new_id
+from ..utils import chunk_id, count_tokens
 
 
 def ingest(path: str, contract_id: str) -> List[ContractChunk]:
     with open(path, 'r', encoding='utf-8', errors='ignore') as f:
         soup = BeautifulSoup(f, 'html.parser')
     chunks: List[ContractChunk] = []
+    seen: Dict[str, int] = {}
     section = 'preamble'
     for elem in soup.find_all(['h1', 'h2', 'h3', 'p']):
         text = elem.get_text(strip=True)
@@ -18,7 +19,7 @@ def ingest(path: str, contract_id: str) -> List[ContractChunk]:
             section = text
             continue
         chunk = ContractChunk(
-            id=new_id(),
+            id=chunk_id(contract_id, section, text, seen),
             contract_id=contract_id,
             section=section,
             text=text,
@@ -1,23 +1,108 @@
-from typing import List
+import math
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
 from pypdf import PdfReader
 
+from rag.chunking import PAGE_BREAK
+
 from ..models import ContractChunk
-from ..utils import split_into_sections, count_tokens, new_id
+from ..utils import chunk_id, chunk_sections
+
+# PDFs with at least this many pages have their text extracted by several
+# processes, each taking a contiguous range of pages.
+PARALLEL_MIN_PAGES = 64
+
+# A first or last line repeated on this share of the pages (and on at least
+# RUNNING_MIN_PAGES pages) is a running header or footer.
+RUNNING_LINE_SHARE = 0.5
+RUNNING_MIN_PAGES = 3
+
+# A standalone page number ("3", "- 3 -", "3 of 10") or a "Page 3 of 10"
+# label ending the line.  Other numbers, as in "SCHEDULE 2", are kept.
+_PAGE_NUMBER_RE = re.compile(
+    r'(?:^[-\s]*|\bpage\s+)\d+(?:\s*(?:of|/)\s*\d+)?[-\s]*$', re.IGNORECASE)
+
+
+def _extract_range(path: str, start: int, stop: int) -> List[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
 
+def extract_pages(path: str, workers: Optional[int] = None) -> List[str]:
+    """Return the text of each page, in order.
 
-def ingest(path: str, contract_id: str) -> List[ContractChunk]:
+    Large PDFs are split into page ranges extracted in parallel.  By default
+    only the top-level process does so; inside a worker of the folder ingest
+    pool, files are already processed in parallel.
+    """
     reader = PdfReader(path)
+    pages = len(reader.pages)
+    if workers is None:
+        top_level = multiprocessing.parent_process() is None
+        workers = (os.cpu_count() or 1) if top_level else 1
+    if pages < PARALLEL_MIN_PAGES or workers <= 1:
+        return [page.extract_text() or "" for page in reader.pages]
+
+    size = math.ceil(pages / workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_range, path, start, min(pages, start + size))
+                   for start in range(0, pages, size)]
+        return [text for future in futures for text in future.result()]
+
+
+def _edge_lines(text: str) -> List[str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    return lines[:1] + lines[-1:] if len(lines) > 1 else lines
+
+
+def strip_running_lines(pages: List[str]) -> List[str]:
+    """Remove running headers and footers repeated at the top or bottom of pages.
+
+    Page numbers are ignored when comparing lines; other numbers are not, so
+    headings such as "SCHEDULE 1" and "SCHEDULE 2" are kept.  Without this, an
+    all-caps running header is taken for a section heading on every page
+    and splits sections at each page break.
+    """
+    threshold = max(RUNNING_MIN_PAGES, math.ceil(len(pages) * RUNNING_LINE_SHARE))
+    if len(pages) < threshold:
+        return pages
+    key = lambda line: _PAGE_NUMBER_RE.sub('#', line.strip())  # noqa: E731
+    counts = Counter(key(line) for text in pages for line in set(_edge_lines(text)))
+    running = {line for line, n in counts.items() if n >= threshold}
+    if not running:
+        return pages
+
+    stripped = []
+    for text in pages:
+        lines = text.splitlines()
+        for index in (0, -1):
+            while lines and not lines[index].strip():
+                lines.pop(index)
+            if lines and key(lines[index]) in running:
+                lines.pop(index)
+        stripped.append("\n".join(lines))
+    return stripped
+
+
+def ingest(path: str, contract_id: str, workers: Optional[int] = None) -> List[ContractChunk]:
+    # One pass over the whole document: form feeds give exact page numbers
+    # and sections continue across pages.
+    text = PAGE_BREAK.join(strip_running_lines(extract_pages(path, workers)))
     chunks: List[ContractChunk] = []
-    for page_num, page in enumerate(reader.pages, start=1):
-        text = page.extract_text() or ""
-        for section, section_text in split_into_sections(text):
-            chunk = ContractChunk(
-                id=new_id(),
-                contract_id=contract_id,
-                section=section,
-                text=section_text,
-                page=page_num,
-                tokens=count_tokens(section_text),
-            )
-            chunks.append(chunk)
+    seen: Dict[str, int] = {}
+    for piece in chunk_sections(text):
+        chunk = ContractChunk(
+            id=chunk_id(contract_id, piece.section, piece.text, seen),
+            contract_id=contract_id,
+            section=piece.section,
+            text=piece.text,
+            page=piece.page,
+            tokens=piece.tokens,
+        )
+        chunks.append(chunk)
     return chunks
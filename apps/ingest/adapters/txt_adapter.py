@@ -1,21 +1,22 @@
-from typing import List
+from typing import Dict, List
 
 from ..models import ContractChunk
-from ..utils import split_into_sections, count_tokens, new_id
+from ..utils import chunk_id, chunk_sections
 
 
 def ingest(path: str, contract_id: str) -> List[ContractChunk]:
     with open(path, 'r', encoding='utf-8', errors='ignore') as f:
         text = f.read()
     chunks: List[ContractChunk] = []
-    for section, section_text in split_into_sections(text):
+    seen: Dict[str, int] = {}
+    for piece in chunk_sections(text):
         chunk = ContractChunk(
-            id=new_id(),
+            id=chunk_id(contract_id, piece.section, piece.text, seen),
             contract_id=contract_id,
-            section=section,
-            text=section_text,
-            page=1,
-            tokens=count_tokens(section_text),
+            section=piece.section,
+            text=piece.text,
+            page=piece.page,
+            tokens=piece.tokens,
         )
         chunks.append(chunk)
     return chunks
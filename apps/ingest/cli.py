@@ -1,28 +1,166 @@
 import argparse
 import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import asdict
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from .adapters import ingest_file
+from .adapters import ADAPTERS, ingest_file
+from .manifest import FileRecord, IngestManifest, file_hash
+
+logger = logging.getLogger(__name__)
+
+# Small files are grouped into tasks of about this many bytes so that
+# per-task overhead does not dominate; larger files get a task each.
+TASK_BYTES = 4 << 20
+
+# Manifest writes are batched by this many files or chunks
+RECORD_FILES = 1000
+RECORD_CHUNKS = 20000
+
+# (path, hash from the manifest or None)
+Task = List[Tuple[str, Optional[str]]]
+# (path, hash, chunk dicts or None when the content is unchanged, error)
+Result = Tuple[str, str, Optional[List[Dict[str, Any]]], Optional[str]]
+
+
+def plan_tasks(files: List[Tuple[str, int, Optional[str]]], task_bytes: int = TASK_BYTES) -> List[Task]:
+    """Group ``(path, size, known_hash)`` into tasks, largest files first."""
+    tasks: List[Task] = []
+    current: Task = []
+    current_bytes = 0
+    for path, size, known in sorted(files, key=lambda f: f[1], reverse=True):
+        if size >= task_bytes:
+            tasks.append([(path, known)])
+            continue
+        if current and current_bytes + size > task_bytes:
+            tasks.append(current)
+            current, current_bytes = [], 0
+        current.append((path, known))
+        current_bytes += size
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def ingest_task(task: Task) -> List[Result]:
+    results: List[Result] = []
+    for path, known in task:
+        digest = ''
+        try:
+            digest = file_hash(path)
+            if digest == known:
+                results.append((path, digest, None, None))
+                continue
+            chunks = ingest_file(path, Path(path).stem)
+            results.append((path, digest, [asdict(c) for c in chunks], None))
+        except Exception as exc:  # one bad file must not stop the run
+            results.append((path, digest, None, f'{type(exc).__name__}: {exc}'))
+    return results
+
+
+def _run(tasks: List[Task], workers: int) -> Iterator[Result]:
+    if workers <= 1:
+        for task in tasks:
+            yield from ingest_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(ingest_task, task) for task in tasks]):
+            yield from future.result()
+
+
+def ingest_folder(folder: str, out, manifest: IngestManifest, workers: Optional[int] = None,
+                  full: bool = False) -> Dict[str, int]:
+    """Write the chunks of every file in ``folder`` to ``out``, parsing only new and changed files.
+
+    Files whose mtime and size match the manifest are skipped without being
+    read and files whose content hash matches are skipped without being
+    parsed; their chunks are copied from the manifest.  ``out`` therefore
+    always holds the folder's full chunk set.  Deleted files and files that
+    fail to parse have no chunks in it.
+    """
+    known = manifest.load()
+    stored = manifest.chunk_counts()
+    stats = {'files': 0, 'skipped': 0, 'ingested': 0, 'failed': 0, 'removed': 0, 'chunks': 0, 'reused': 0}
+    stat_by_path: Dict[str, os.stat_result] = {}
+    candidates: List[Tuple[str, int, Optional[str]]] = []
+    present = set()
+    for entry in os.scandir(folder):
+        if not entry.is_file() or Path(entry.name).suffix.lower() not in ADAPTERS:
+            continue
+        path = os.path.abspath(entry.path)
+        present.add(path)
+        st = entry.stat()
+        stats['files'] += 1
+        record = None if full else known.get(path)
+        if record is not None and stored.get(path, 0) != record.chunks:
+            record = None  # recorded without its chunks; parse it again
+        if record is not None and record.mtime_ns == st.st_mtime_ns and record.size == st.st_size:
+            stats['skipped'] += 1
+            stats['reused'] += _copy_stored(manifest, path, out)
+            continue
+        stat_by_path[path] = st
+        candidates.append((path, st.st_size, record.hash if record else None))
+
+    folder_abs = os.path.abspath(folder)
+    removed = [p for p in known if os.path.dirname(p) == folder_abs and p not in present]
+    manifest.forget(removed)
+    stats['removed'] = len(removed)
+
+    updates: List[FileRecord] = []
+    new_chunks: Dict[str, List[str]] = {}
+    pending = 0
+    for path, digest, chunks, error in _run(plan_tasks(candidates), workers or os.cpu_count() or 1):
+        if error is not None:
+            stats['failed'] += 1
+            logger.warning('Failed to ingest %s: %s', path, error)
+            continue
+        st = stat_by_path[path]
+        if chunks is None:
+            stats['skipped'] += 1
+            stats['reused'] += _copy_stored(manifest, path, out)
+            updates.append(FileRecord(path, st.st_mtime_ns, st.st_size, digest, known[path].chunks))
+        else:
+            stats['ingested'] += 1
+            stats['chunks'] += len(chunks)
+            lines = [json.dumps(chunk, ensure_ascii=False) + '\n' for chunk in chunks]
+            out.writelines(lines)
+            new_chunks[path] = lines
+            pending += len(lines)
+            updates.append(FileRecord(path, st.st_mtime_ns, st.st_size, digest, len(chunks)))
+        if len(updates) >= RECORD_FILES or pending >= RECORD_CHUNKS:
+            manifest.record(updates, new_chunks)
+            updates, new_chunks, pending = [], {}, 0
+    manifest.record(updates, new_chunks)
+    return stats
+
+
+def _copy_stored(manifest: IngestManifest, path: str, out) -> int:
+    count = 0
+    for line in manifest.chunks(path):
+        out.write(line)
+        count += 1
+    return count
 
 
 def main():
     parser = argparse.ArgumentParser(description="Ingest contracts into chunks")
     parser.add_argument("--path", required=True, help="Path to folder with contracts")
-    parser.add_argument("--out", required=True, help="Output JSONL file")
+    parser.add_argument("--out", required=True, help="Output JSONL file, rewritten with the chunks of every file")
+    parser.add_argument("--manifest", help="Manifest database (default: <out>.manifest.sqlite3)")
+    parser.add_argument("--workers", type=int, default=None, help="Ingest processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="Re-ingest every file regardless of the manifest")
     args = parser.parse_args()
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = IngestManifest(args.manifest or str(out_path) + '.manifest.sqlite3')
 
     with open(out_path, "w", encoding="utf-8") as outfile:
-        for file_path in Path(args.path).glob("*"):
-            if not file_path.is_file():
-                continue
-            contract_id = file_path.stem
-            chunks = ingest_file(str(file_path), contract_id)
-            for chunk in chunks:
-                outfile.write(json.dumps(asdict(chunk), ensure_ascii=False) + "\n")
+        stats = ingest_folder(args.path, outfile, manifest, workers=args.workers, full=args.full)
+    print(json.dumps(stats))
 
 
 if __name__ == "__main__":
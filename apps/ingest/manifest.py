@@ -0,0 +1,90 @@
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+HASH_BLOCK = 1 << 20
+
+
+@dataclass
+class FileRecord:
+    path: str
+    mtime_ns: int
+    size: int
+    hash: str
+    chunks: int = 0
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """SQLite record of ingested files keyed by path.
+
+    A file whose mtime and size match its record is unchanged without being
+    read; otherwise its content hash decides.  The chunks of each file are
+    kept too, as JSON lines, so unchanged files are re-emitted unparsed.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        if path != ':memory:':
+            self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, '
+            'size INTEGER NOT NULL, hash TEXT NOT NULL, chunks INTEGER NOT NULL, ingested REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS chunks (path TEXT NOT NULL, seq INTEGER NOT NULL, '
+            'chunk TEXT NOT NULL, PRIMARY KEY (path, seq))'
+        )
+
+    def load(self) -> Dict[str, FileRecord]:
+        rows = self._db.execute('SELECT path, mtime_ns, size, hash, chunks FROM files')
+        return {row[0]: FileRecord(*row) for row in rows}
+
+    def get(self, path: str) -> Optional[FileRecord]:
+        row = self._db.execute(
+            'SELECT path, mtime_ns, size, hash, chunks FROM files WHERE path = ?', (path,)
+        ).fetchone()
+        return FileRecord(*row) if row else None
+
+    def record(self, records: Iterable[FileRecord], chunks: Optional[Mapping[str, List[str]]] = None) -> None:
+        """Record files and replace the stored chunks of the paths in ``chunks``."""
+        now = time.time()
+        chunks = chunks or {}
+        self._db.execute('BEGIN')
+        self._db.executemany(
+            'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+            [(r.path, r.mtime_ns, r.size, r.hash, r.chunks, now) for r in records],
+        )
+        self._db.executemany('DELETE FROM chunks WHERE path = ?', [(p,) for p in chunks])
+        self._db.executemany(
+            'INSERT INTO chunks VALUES (?, ?, ?)',
+            [(path, seq, line) for path, lines in chunks.items() for seq, line in enumerate(lines)],
+        )
+        self._db.execute('COMMIT')
+
+    def chunk_counts(self) -> Dict[str, int]:
+        """Return the number of stored chunks per path."""
+        return dict(self._db.execute('SELECT path, COUNT(*) FROM chunks GROUP BY path'))
+
+    def chunks(self, path: str) -> Iterator[str]:
+        """Yield the stored chunk JSON lines of ``path`` in order."""
+        rows = self._db.execute('SELECT chunk FROM chunks WHERE path = ? ORDER BY seq', (path,))
+        return (row[0] for row in rows.fetchall())
+
+    def forget(self, paths: Iterable[str]) -> None:
+        paths = [(p,) for p in paths]
+        self._db.executemany('DELETE FROM files WHERE path = ?', paths)
+        self._db.executemany('DELETE FROM chunks WHERE path = ?', paths)
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM files').fetchone()[0]
@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from apps.ingest.adapters import ingest_file
+from apps.ingest.utils import SECTION_MAX_TOKENS
 
 
 def test_ingest_empty_file(tmp_path: Path):
@@ -15,8 +16,10 @@ def test_ingest_large_file(tmp_path: Path):
     content = "1. Section\n" + ("word " * 1000)
     file_path.write_text(content, encoding="utf-8")
     chunks = ingest_file(str(file_path), "large")
-    assert len(chunks) >= 1
-    assert chunks[0].tokens >= 1000
+    assert len(chunks) >= 2
+    assert sum(c.tokens for c in chunks) >= 1000
+    assert all(c.tokens <= SECTION_MAX_TOKENS for c in chunks)
+    assert {c.section for c in chunks} == {"1. Section"}
 
 
 def test_ingest_mixed_encodings(tmp_path: Path):
@@ -26,3 +29,133 @@ def test_ingest_mixed_encodings(tmp_path: Path):
     chunks = ingest_file(str(file_path), "mixed")
     assert chunks[0].section == "1. Section"
     assert "Caf\u00e9" in chunks[0].text
+
+
+def test_chunk_ids_are_content_derived(tmp_path: Path):
+    file_path = tmp_path / "ids.txt"
+    file_path.write_text("1. Terms\nSame words.\n\nSame words.\n\n2. Law\nEnglish law.", encoding="utf-8")
+    first = [c.id for c in ingest_file(str(file_path), "ids")]
+    assert first == [c.id for c in ingest_file(str(file_path), "ids")]
+    assert len(set(first)) == len(first) and all(i.startswith("ids_") for i in first)
+
+
+def test_folder_ingest_skips_unchanged_files(tmp_path: Path):
+    import io
+    import json
+    import os
+
+    from apps.ingest.cli import ingest_folder, plan_tasks
+    from apps.ingest.manifest import IngestManifest
+
+    folder = tmp_path / "contracts"
+    folder.mkdir()
+    for name in ("a", "b", "c"):
+        (folder / f"{name}.txt").write_text(f"1. Terms\nContract {name}.", encoding="utf-8")
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite3"))
+
+    out = io.StringIO()
+    stats = ingest_folder(str(folder), out, manifest, workers=2)
+    assert (stats["ingested"], stats["skipped"]) == (3, 0)
+    assert len(out.getvalue().splitlines()) == 3
+
+    # Touched but identical, edited, deleted and added files.
+    os.utime(folder / "a.txt", ns=(1, 1))
+    (folder / "b.txt").write_text("1. Terms\nContract b, amended.", encoding="utf-8")
+    (folder / "c.txt").unlink()
+    (folder / "d.txt").write_text("1. Terms\nContract d.", encoding="utf-8")
+    out = io.StringIO()
+    stats = ingest_folder(str(folder), out, manifest, workers=1)
+    assert (stats["ingested"], stats["skipped"], stats["removed"]) == (2, 1, 1)
+    assert (stats["chunks"], stats["reused"]) == (2, 1)
+    second = out.getvalue()
+    assert sorted(json.loads(line)["contract_id"] for line in second.splitlines()) == ["a", "b", "d"]
+    assert "amended" in second
+
+    # An unchanged folder still yields its full chunk set, unparsed.
+    out = io.StringIO()
+    stats = ingest_folder(str(folder), out, manifest)
+    assert (stats["skipped"], stats["ingested"], stats["reused"]) == (3, 0, 3)
+    assert sorted(out.getvalue().splitlines()) == sorted(second.splitlines())
+
+    # Records without stored chunks (older manifests) are parsed again.
+    manifest._db.execute("DELETE FROM chunks")
+    out = io.StringIO()
+    assert ingest_folder(str(folder), out, manifest)["ingested"] == 3
+    assert sorted(out.getvalue().splitlines()) == sorted(second.splitlines())
+
+    tasks = plan_tasks([("big", 10, None), ("s1", 2, None), ("s2", 2, None), ("s3", 2, None)], task_bytes=5)
+    assert [[p for p, _ in t] for t in tasks] == [["big"], ["s1", "s2"], ["s3"]]
+
+
+def test_ingest_docx_streams_sections_and_tables(tmp_path: Path):
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading("Definitions", 1)
+    doc.add_paragraph("Goods means the items listed below.")
+    table = doc.add_table(rows=2, cols=2)
+    for (r, c), text in {(0, 0): "ITEM", (0, 1): "PRICE", (1, 0): "Widget", (1, 1): "10 GBP"}.items():
+        table.cell(r, c).text = text
+    doc.add_paragraph("2. Payment")
+    doc.add_paragraph("Invoices are payable within 30 days.")
+    file_path = tmp_path / "supply.docx"
+    doc.save(str(file_path))
+
+    chunks = ingest_file(str(file_path), "supply")
+    assert [c.section for c in chunks] == ["Definitions", "2. Payment"]
+    # Table cells stay in the section they appear in, and never start one
+    assert chunks[0].text == "Goods means the items listed below.\nITEM\tPRICE\nWidget\t10 GBP"
+    assert chunks[1].text.startswith("Invoices are payable")
+
+
+def _running_header_pdf(path: Path, pages: int) -> None:
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    for i in range(pages):
+        page = writer.add_blank_page(612, 792)
+        font = DictionaryObject({NameObject("/Type"): NameObject("/Font"),
+                                 NameObject("/Subtype"): NameObject("/Type1"),
+                                 NameObject("/BaseFont"): NameObject("/Helvetica")})
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        lines = ["CONFIDENTIAL"] + (["1. Delivery"] if i == 0 else []) + [
+            f"The Supplier shall deliver item {i}.", f"Page {i + 1} of {pages}"]
+        stream = DecodedStreamObject()
+        stream.set_data("".join(f"BT /F1 10 Tf 72 {770 - 20 * n} Td ({line}) Tj ET\n"
+                                for n, line in enumerate(lines)).encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def test_pdf_sections_continue_past_running_headers(tmp_path: Path):
+    file_path = tmp_path / "supply.pdf"
+    _running_header_pdf(file_path, 3)
+    chunks = ingest_file(str(file_path), "supply")
+    assert [c.section for c in chunks] == ["1. Delivery"]
+    assert [f"item {i}." in chunks[0].text for i in range(3)] == [True] * 3
+    assert "CONFIDENTIAL" not in chunks[0].text and "Page" not in chunks[0].text
+
+
+def test_pdf_pages_are_extracted_in_parallel(tmp_path: Path, monkeypatch):
+    from apps.ingest.adapters import pdf_adapter
+
+    file_path = tmp_path / "long.pdf"
+    _running_header_pdf(file_path, 7)
+    monkeypatch.setattr(pdf_adapter, "PARALLEL_MIN_PAGES", 2)
+    pages = pdf_adapter.extract_pages(str(file_path), workers=3)
+    assert pages == pdf_adapter.extract_pages(str(file_path), workers=1)
+    parallel = pdf_adapter.ingest(str(file_path), "long", workers=3)
+    assert parallel == pdf_adapter.ingest(str(file_path), "long", workers=1)
+    assert [c.page for c in parallel] == [1]
+
+
+def test_running_lines_fold_only_page_numbers():
+    from apps.ingest.adapters.pdf_adapter import strip_running_lines
+
+    pages = [f"SCHEDULE {i}\nThe Supplier shall deliver item {i}.\n- {i} -" for i in range(1, 5)]
+    stripped = strip_running_lines(pages)
+    assert [text.splitlines()[0] for text in stripped] == [f"SCHEDULE {i}" for i in range(1, 5)]
+    assert all(text.splitlines()[-1].startswith("The Supplier") for text in stripped)
@@ -1,39 +1,94 @@
+import hashlib
 import re
 import uuid
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from rag.chunking import Chunk, chunk_text
+
+# Upper bound on the tokens of one ingested chunk; longer sections are split
+# at sentence boundaries.
+SECTION_MAX_TOKENS = 512
+SECTION_OVERLAP_TOKENS = 48
+
+
+_NUMBERED_HEADING_RE = re.compile(r'\d+[\.\)]?\s')
+_TOKEN_RE = re.compile(r'\w+')
 
 
 def is_heading(line: str) -> bool:
     line = line.strip()
     if not line:
         return False
-    if re.match(r'^\d+[\.\)]?\s', line):
+    if line[0].isdigit() and _NUMBERED_HEADING_RE.match(line):
         return True
     if line.isupper() and len(line) <= 80:
         return True
     return False
 
 
-def split_into_sections(text: str) -> List[Tuple[str, str]]:
-    sections: List[Tuple[str, str]] = []
+def section_spans(text: str) -> List[Tuple[int, int, str]]:
+    """Return ``(start, end, heading)`` offsets of the body of each section."""
+    spans: List[Tuple[int, int, str]] = []
     current_section = "preamble"
-    current_lines: List[str] = []
-    for line in text.splitlines():
+    start = pos = 0
+    for line in text.splitlines(keepends=True):
         if is_heading(line):
-            if current_lines:
-                sections.append((current_section, "\n".join(current_lines)))
-                current_lines = []
+            if text[start:pos].strip():
+                spans.append((start, pos, current_section))
             current_section = line.strip()
-        else:
-            current_lines.append(line)
-    if current_lines:
-        sections.append((current_section, "\n".join(current_lines)))
-    return sections
+            start = pos + len(line)
+        pos += len(line)
+    if text[start:pos].strip():
+        spans.append((start, pos, current_section))
+    return spans
+
+
+def chunk_sections(text: str, max_tokens: int = SECTION_MAX_TOKENS,
+                   overlap_tokens: int = SECTION_OVERLAP_TOKENS) -> List[Chunk]:
+    """Split ``text`` into size-bounded chunks that never cross a heading."""
+    return chunk_text(
+        text,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+        sections=section_spans(text),
+        tokenizer=count_tokens,
+    )
+
+
+def chunk_section(text: str, section: str, max_tokens: int = SECTION_MAX_TOKENS,
+                  overlap_tokens: int = SECTION_OVERLAP_TOKENS) -> List[Chunk]:
+    """Split the body of a single section into size-bounded chunks."""
+    if not text.strip():
+        return []
+    return chunk_text(
+        text,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+        sections=[(0, len(text), section)],
+        tokenizer=count_tokens,
+    )
+
+
+def split_into_sections(text: str) -> List[Tuple[str, str]]:
+    return [(chunk.section, chunk.text) for chunk in chunk_sections(text)]
 
 
 def count_tokens(text: str) -> int:
-    return len(re.findall(r'\w+', text))
+    return len(_TOKEN_RE.findall(text))
 
 
 def new_id() -> str:
     return str(uuid.uuid4())
+
+
+def chunk_id(contract_id: str, section: str, text: str, seen: Dict[str, int]) -> str:
+    """Return a content-derived chunk id, stable across re-ingests.
+
+    ``seen`` counts ids already issued for the contract so that repeated
+    identical chunks get distinct ``_<n>`` suffixes.
+    """
+    digest = hashlib.sha1(f"{section}\x00{text}".encode("utf-8")).hexdigest()[:16]
+    base = f"{contract_id}_{digest}"
+    n = seen.get(base, 0)
+    seen[base] = n + 1
+    return base if n == 0 else f"{base}_{n}"
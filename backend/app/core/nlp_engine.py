@@ -19,7 +19,7 @@ from transformers import (
     QuestionAnsweringPipeline, SummarizationPipeline
 )
 import torch
-from sentence_transformers import SentenceTransformer
+from sentence_transformers import CrossEncoder, SentenceTransformer
 import spacy
 import nltk
 from nltk.tokenize import word_tokenize, sent_tokenize
@@ -114,7 +114,8 @@ class NLPEngine:
             'summarization': 'facebook/bart-large-cnn',
             'question_answering': 'deepset/roberta-base-squad2',
             'zero_shot': 'facebook/bart-large-mnli',
-            'embedding': 'sentence-transformers/all-MiniLM-L6-v2'
+            'embedding': 'sentence-transformers/all-MiniLM-L6-v2',
+            'cross-encoder': 'cross-encoder/ms-marco-MiniLM-L-6-v2'
         }
         
     def load_model(self, model_name: str, task: str = None) -> Any:
@@ -146,6 +147,8 @@ class NLPEngine:
                 model = pipeline("zero-shot-classification", model=model_name, device=self.device)
             elif task == "embedding":
                 model = SentenceTransformer(model_name, device=self.device)
+            elif task == "cross-encoder":
+                model = CrossEncoder(model_name, device=self.device)
             else:
                 model = pipeline(task, model=model_name, device=self.device)
                 
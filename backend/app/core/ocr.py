@@ -1,9 +1,18 @@
 from typing import Optional
+import asyncio
 import pdfplumber
 import pytesseract
-from PIL import Image
 import io
 
+try:
+    from rag.ocr_pool import get_ocr_pool
+    from rag.ocr_preprocess import aocr_page_adaptive
+    from rag.page_classifier import classify_pdf
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    get_ocr_pool = None
+    aocr_page_adaptive = None
+    classify_pdf = None
+
 class OCRProcessor:
     def __init__(self):
         # Configure pytesseract path for Windows
@@ -12,24 +21,38 @@ class OCRProcessor:
     async def extract_text(self, file_content: bytes) -> str:
         """Extract text from a PDF file using pdfplumber and pytesseract for images."""
         try:
+            # Classify pages from their content streams so that scanned
+            # pages are not text-extracted first
+            needs_ocr = None
+            if classify_pdf is not None:
+                try:
+                    pages = await asyncio.to_thread(classify_pdf, file_content)
+                    needs_ocr = [page.needs_ocr for page in pages]
+                except Exception:
+                    needs_ocr = None
+
             with pdfplumber.open(io.BytesIO(file_content)) as pdf:
                 text_content = []
                 
-                for page in pdf.pages:
-                    # Extract text content
-                    text = page.extract_text() or ""
+                for page_num, page in enumerate(pdf.pages):
+                    if needs_ocr is not None:
+                        scanned = needs_ocr[page_num]
+                        text = "" if scanned else page.extract_text() or ""
+                    else:
+                        # Extract text content
+                        text = page.extract_text() or ""
+                        scanned = len(text.strip()) < 50  # Arbitrary threshold
                     
                     # If page has little or no text, try OCR on the page image
-                    if len(text.strip()) < 50:  # Arbitrary threshold
-                        img = page.to_image()
-                        # Convert to PIL Image
-                        pil_image = Image.frombytes(
-                            mode='RGB',
-                            size=(img.width, img.height),
-                            data=img.original.tobytes()
-                        )
-                        # Perform OCR
-                        text = pytesseract.image_to_string(pil_image) or ""
+                    if scanned:
+                        # Perform OCR, raising the resolution only for low-confidence pages
+                        if aocr_page_adaptive is not None:
+                            text, _, _ = await aocr_page_adaptive(
+                                lambda dpi, page=page: page.to_image(resolution=dpi).original,
+                                get_ocr_pool()
+                            )
+                        else:
+                            text = pytesseract.image_to_string(page.to_image().original) or ""
                     
                     text_content.append(text.strip())
                 
@@ -0,0 +1,300 @@
+"""
+Columnar Chunk Storage
+
+Compact row storage for RAG chunks. Text lives in one UTF-8 buffer addressed
+by an offsets column, positions and pages live in NumPy integer columns and
+embeddings exist only as rows of a single float32 matrix. Rows are appended
+and tombstoned; ``compact`` rewrites the live rows densely.
+
+The embedding matrix can be moved to a memory-mapped file (``use_mmap``) so
+that, with a quantized first pass, exact vectors are only paged in for the
+candidates being re-ranked.
+"""
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+_NO_PAGE = -1
+_INITIAL_CAPACITY = 64
+
+
+class _Column:
+    """Growable one-dimensional NumPy column with amortised O(1) append."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype, fill=0):
+        self.data = np.full(_INITIAL_CAPACITY, fill, dtype=dtype)
+        self.size = 0
+
+    def append(self, value) -> None:
+        if self.size == len(self.data):
+            grown = np.empty(len(self.data) * 2, dtype=self.data.dtype)
+            grown[: self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+    def replace(self, values: np.ndarray) -> None:
+        capacity = max(_INITIAL_CAPACITY, len(values))
+        self.data = np.empty(capacity, dtype=self.data.dtype)
+        self.data[: len(values)] = values
+        self.size = len(values)
+
+
+class ChunkColumns:
+    """Columnar storage for chunk rows."""
+
+    def __init__(self, embedding_dim: int):
+        self.embedding_dim = embedding_dim
+        self._text = bytearray()
+        self._text_offsets = _Column(np.int64)
+        self._text_offsets.append(0)
+        self.start_pos = _Column(np.int64)
+        self.end_pos = _Column(np.int64)
+        self.page = _Column(np.int32, _NO_PAGE)
+        self.doc_code = _Column(np.int32)
+        self.meta_code = _Column(np.int32)
+        self.live = _Column(np.bool_)
+        self.has_embedding = _Column(np.bool_)
+        self.norms = _Column(np.float32)
+        self._matrix = np.zeros((_INITIAL_CAPACITY, embedding_dim), dtype=np.float32)
+        self._mmap_path: Optional[str] = None
+        self._sections: Dict[int, str] = {}
+        self._doc_ids: List[str] = []
+        self._doc_codes: Dict[str, int] = {}
+        self._metadata: List[Dict[str, Any]] = []
+        self._embedded = 0
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return self.live.size
+
+    @property
+    def embedded_count(self) -> int:
+        """Number of live rows that have an embedding."""
+        return self._embedded
+
+    def append(
+        self,
+        doc_id: str,
+        text: str,
+        start_pos: int,
+        end_pos: int,
+        page: Optional[int] = None,
+        section: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Append a row and return its row number."""
+        row = self.live.size
+        self._text += text.encode("utf-8")
+        self._text_offsets.append(len(self._text))
+        self.start_pos.append(start_pos)
+        self.end_pos.append(end_pos)
+        self.page.append(_NO_PAGE if page is None else page)
+        self.doc_code.append(self._intern_doc(doc_id))
+        self.meta_code.append(self._intern_metadata(metadata or {}))
+        self.live.append(True)
+        self.has_embedding.append(False)
+        self.norms.append(0.0)
+        if section is not None:
+            self._sections[row] = section
+        if row >= len(self._matrix):
+            self._resize_matrix(len(self._matrix) * 2)
+        return row
+
+    def remove(self, row: int) -> None:
+        """Tombstone a row; its storage is reclaimed by :meth:`compact`."""
+        if not self.live.data[row]:
+            return
+        self.live.data[row] = False
+        if self.has_embedding.data[row]:
+            self.has_embedding.data[row] = False
+            self._embedded -= 1
+        self._sections.pop(row, None)
+        self.dead += 1
+
+    # -- row accessors -------------------------------------------------
+
+    def text(self, row: int) -> str:
+        offsets = self._text_offsets.data
+        return self._text[offsets[row]:offsets[row + 1]].decode("utf-8")
+
+    def doc_id(self, row: int) -> str:
+        return self._doc_ids[self.doc_code.data[row]]
+
+    def page_of(self, row: int) -> Optional[int]:
+        page = int(self.page.data[row])
+        return None if page == _NO_PAGE else page
+
+    def section(self, row: int) -> Optional[str]:
+        return self._sections.get(row)
+
+    def set_section(self, row: int, section: Optional[str]) -> None:
+        if section is None:
+            self._sections.pop(row, None)
+        else:
+            self._sections[row] = section
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Return a copy of the row's metadata; the interned dict is shared."""
+        return dict(self._metadata[self.meta_code.data[row]])
+
+    def set_metadata(self, row: int, metadata: Dict[str, Any]) -> None:
+        self.meta_code.data[row] = self._intern_metadata(metadata)
+
+    def set_position(self, row: int, start_pos: int, end_pos: int, page: Optional[int]) -> None:
+        """Move a row's text span, e.g. when a new version shifts an unchanged chunk."""
+        self.start_pos.data[row] = start_pos
+        self.end_pos.data[row] = end_pos
+        self.page.data[row] = _NO_PAGE if page is None else page
+
+    def embedding(self, row: int) -> Optional[np.ndarray]:
+        if not self.has_embedding.data[row]:
+            return None
+        return self._matrix[row]
+
+    def set_embedding(self, row: int, embedding: Optional[Sequence[float]]) -> None:
+        """Store ``embedding`` for ``row`` (``None`` clears it)."""
+        if embedding is None:
+            if self.has_embedding.data[row]:
+                self.has_embedding.data[row] = False
+                self._embedded -= 1
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.embedding_dim,):
+            if self._embedded == 0 and vector.ndim == 1:
+                # Adopt the dimension of the first real embeddings stored.
+                self.embedding_dim = vector.shape[0]
+                self._resize_matrix(len(self._matrix), keep=False)
+            else:
+                raise ValueError(
+                    f"Embedding has {vector.size} dimensions, store expects {self.embedding_dim}"
+                )
+        self._matrix[row] = vector
+        self.norms.data[row] = float(np.linalg.norm(vector))
+        if not self.has_embedding.data[row]:
+            self.has_embedding.data[row] = True
+            self._embedded += 1
+
+    # -- bulk access ---------------------------------------------------
+
+    def embedded_rows(self) -> np.ndarray:
+        """Return the live rows that have embeddings."""
+        return np.flatnonzero(self.has_embedding.view())
+
+    def matrix(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the embedding matrix, optionally restricted to ``rows``."""
+        if rows is None:
+            return self._matrix[: len(self)]
+        if len(rows) and rows[-1] == len(rows) - 1 and np.array_equal(rows, np.arange(len(rows))):
+            return self._matrix[: len(rows)]  # dense prefix: a view, no copy
+        return self._matrix[rows]
+
+    def nbytes(self) -> int:
+        """Approximate in-memory bytes used by the column buffers.
+
+        A memory-mapped embedding matrix is not counted.
+        """
+        columns = (
+            self._text_offsets, self.start_pos, self.end_pos, self.page,
+            self.doc_code, self.meta_code, self.live, self.has_embedding, self.norms,
+        )
+        matrix_bytes = 0 if self._mmap_path else self._matrix.nbytes
+        return len(self._text) + matrix_bytes + sum(c.data.nbytes for c in columns)
+
+    def compact(self) -> np.ndarray:
+        """Drop tombstoned rows.
+
+        Returns:
+            Array mapping each old row to its new row, or ``-1`` if removed.
+        """
+        live = self.live.view()
+        keep = np.flatnonzero(live)
+        remap = np.full(len(live), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        offsets = self._text_offsets.view()
+        pieces = [bytes(self._text[offsets[r]:offsets[r + 1]]) for r in keep.tolist()]
+        lengths = np.fromiter((len(p) for p in pieces), dtype=np.int64, count=len(pieces))
+        self._text = bytearray(b"".join(pieces))
+        self._text_offsets.replace(np.concatenate(([0], np.cumsum(lengths))))
+
+        for column in (self.start_pos, self.end_pos, self.page, self.doc_code,
+                       self.meta_code, self.live, self.has_embedding, self.norms):
+            column.replace(column.view()[keep])
+
+        kept = np.array(self._matrix[keep])
+        self._resize_matrix(max(_INITIAL_CAPACITY, len(keep)), keep=False)
+        self._matrix[: len(keep)] = kept
+        self._sections = {int(remap[r]): s for r, s in self._sections.items() if remap[r] >= 0}
+        self._compact_interned()
+        self.dead = 0
+        return remap
+
+    @property
+    def mmap_path(self) -> Optional[str]:
+        return self._mmap_path
+
+    def use_mmap(self, path: str) -> None:
+        """Move the embedding matrix into a memory-mapped file at ``path``."""
+        current = np.array(self._matrix)
+        self._mmap_path = path
+        self._resize_matrix(len(current), keep=False)
+        self._matrix[:] = current
+        self._matrix.flush()
+
+    def _resize_matrix(self, capacity: int, keep: bool = True) -> None:
+        """Reallocate the matrix for ``capacity`` rows, optionally keeping data."""
+        old = self._matrix
+        shape = (capacity, self.embedding_dim)
+        if self._mmap_path is None:
+            matrix = np.zeros(shape, dtype=np.float32)
+            if keep:
+                matrix[: len(old)] = old
+            self._matrix = matrix
+            return
+        if isinstance(old, np.memmap):
+            old.flush()
+        self._matrix = None
+        # Growing the file in place keeps existing rows; a zero-filled file is
+        # written when the layout changes.
+        mode = "r+" if keep and os.path.exists(self._mmap_path) else "w+"
+        if mode == "r+":
+            with open(self._mmap_path, "r+b") as handle:
+                handle.truncate(capacity * self.embedding_dim * 4)
+        self._matrix = np.memmap(self._mmap_path, dtype=np.float32, mode=mode, shape=shape)
+
+    # -- interning -----------------------------------------------------
+
+    def _compact_interned(self) -> None:
+        """Drop interned doc ids and metadata dicts no live row refers to."""
+        doc_used, doc_inverse = np.unique(self.doc_code.view(), return_inverse=True)
+        self.doc_code.replace(doc_inverse.astype(np.int32))
+        self._doc_ids = [self._doc_ids[c] for c in doc_used.tolist()]
+        self._doc_codes = {doc_id: code for code, doc_id in enumerate(self._doc_ids)}
+
+        meta_used, meta_inverse = np.unique(self.meta_code.view(), return_inverse=True)
+        self.meta_code.replace(meta_inverse.astype(np.int32))
+        self._metadata = [self._metadata[c] for c in meta_used.tolist()]
+
+    def _intern_doc(self, doc_id: str) -> int:
+        code = self._doc_codes.get(doc_id)
+        if code is None:
+            code = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._doc_codes[doc_id] = code
+        return code
+
+    def _intern_metadata(self, metadata: Dict[str, Any]) -> int:
+        # Chunks of one document share a metadata dict; reuse the last code
+        # when an equal dict is appended again. A copy is interned so later
+        # changes by the caller cannot alter stored rows.
+        if self._metadata and self._metadata[-1] == metadata:
+            return len(self._metadata) - 1
+        self._metadata.append(dict(metadata))
+        return len(self._metadata) - 1
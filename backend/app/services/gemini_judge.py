@@ -5,8 +5,14 @@ LLM-powered contract analysis using Google's Gemini model.
 """
 import os
 import json
+import hashlib
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+try:
+    from rag.clause_cache import clause_cache
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    clause_cache = None
 
 @dataclass
 class JudgmentResult:
@@ -48,12 +54,36 @@ class GeminiJudge:
             JudgmentResult with verdict and analysis
         """
         
+        # Verdicts on standard clause text are reused across contracts
+        cache_key = self._verdict_cache_key(rule)
+        if clause_cache is not None:
+            cached = clause_cache.get("verdict", snippet, key=cache_key)
+            if cached is not None:
+                return self._from_cache(cached, citations)
+        
         # Build analysis prompt
         prompt = self._build_analysis_prompt(rule, snippet, context, citations)
         
         # For now, return a structured mock response
         # TODO: Replace with actual Gemini API call
-        return self._mock_gemini_response(rule, snippet)
+        result = self._mock_gemini_response(rule, snippet)
+        if clause_cache is not None:
+            clause_cache.put("verdict", snippet, asdict(result), key=cache_key)
+        return result
+    
+    def _verdict_cache_key(self, rule: Dict[str, Any]) -> str:
+        """Cache namespace for a rule: model, rule id and a hash of the rule definition."""
+        definition = json.dumps(rule, sort_keys=True, default=str)
+        digest = hashlib.sha256(definition.encode("utf-8")).hexdigest()[:16]
+        return f"{self.model}:{rule['id']}:{digest}"
+    
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any], citations: List[Dict[str, Any]]) -> JudgmentResult:
+        """Rebuild a cached judgment, pointing its quotes at the current document."""
+        result = JudgmentResult(**cached)
+        if citations:
+            result.quotes = [{**quote, "citation": citations[0]} for quote in result.quotes]
+        return result
     
     def _build_analysis_prompt(self, rule: Dict[str, Any], snippet: str, 
                               context: str, citations: List[Dict[str, Any]]) -> str:
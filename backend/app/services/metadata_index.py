@@ -0,0 +1,283 @@
+"""
+Metadata Bitmap Index
+
+Per-field bitmap indexes over chunk metadata for the RAG store. Each chunk is
+assigned a row number; for every indexed field the index keeps one compressed
+bitmap per distinct value. A filtered query intersects the bitmaps first so
+only the surviving rows are scored.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Rows are split into blocks of 2**16 by their high bits; a block stores the
+# low 16 bits of its rows in a container.
+_BLOCK_BITS = 16
+_LOW_MASK = (1 << _BLOCK_BITS) - 1
+_WORDS = (1 << _BLOCK_BITS) // 64
+# Blocks with up to this many rows keep them as a sorted uint16 array (at
+# most 8 KB, the size of a bitmap container); fuller ones use 1024 words.
+_ARRAY_MAX = 4096
+
+
+def _to_words(container: np.ndarray) -> np.ndarray:
+    if container.dtype == np.uint64:
+        return container
+    flags = np.zeros(1 << _BLOCK_BITS, dtype=np.uint8)
+    flags[container] = 1
+    return np.packbits(flags, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def _to_lows(container: np.ndarray) -> np.ndarray:
+    if container.dtype == np.uint16:
+        return container
+    bits = np.unpackbits(container.astype("<u8").view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _count(container: np.ndarray) -> int:
+    if container.dtype == np.uint16:
+        return len(container)
+    return int(np.unpackbits(container.view(np.uint8)).sum())
+
+
+def _normalise(container: np.ndarray) -> Optional[np.ndarray]:
+    """Pick the smaller container kind; ``None`` when no row is set."""
+    count = _count(container)
+    if count == 0:
+        return None
+    if count <= _ARRAY_MAX:
+        return _to_lows(container)
+    return _to_words(container)
+
+
+class RowBitmap:
+    """Compressed bitset over row numbers, in the style of a roaring bitmap.
+
+    Each block of 65536 rows holds a sorted ``uint16`` array of its rows
+    while sparse and 1024 ``uint64`` words once dense, so adding or
+    removing a row touches one small container and bulk loads go through
+    :meth:`update` in a few array operations per block.
+    """
+
+    __slots__ = ("_blocks",)
+
+    def __init__(self, rows: Optional[Sequence[int]] = None):
+        self._blocks: Dict[int, np.ndarray] = {}
+        if rows is not None:
+            self.update(rows)
+
+    def add(self, row: int) -> None:
+        key, low = row >> _BLOCK_BITS, row & _LOW_MASK
+        container = self._blocks.get(key)
+        if container is None:
+            self._blocks[key] = np.array([low], dtype=np.uint16)
+        elif container.dtype == np.uint64:
+            container[low >> 6] |= np.uint64(1 << (low & 63))
+        else:
+            i = int(np.searchsorted(container, low))
+            if i < len(container) and container[i] == low:
+                return
+            if len(container) >= _ARRAY_MAX:
+                words = _to_words(container)
+                words[low >> 6] |= np.uint64(1 << (low & 63))
+                self._blocks[key] = words
+            else:
+                self._blocks[key] = np.insert(container, i, low)
+
+    def update(self, rows: Sequence[int]) -> None:
+        """Add many rows at once."""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return
+        keys = rows >> _BLOCK_BITS
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        for chunk in np.split(rows, bounds):
+            key = int(chunk[0]) >> _BLOCK_BITS
+            lows = (chunk & _LOW_MASK).astype(np.uint16)
+            container = self._blocks.get(key)
+            if container is not None:
+                lows = np.union1d(_to_lows(container), lows)
+            self._blocks[key] = _to_words(lows) if len(lows) > _ARRAY_MAX else lows
+
+    def discard(self, row: int) -> None:
+        key, low = row >> _BLOCK_BITS, row & _LOW_MASK
+        container = self._blocks.get(key)
+        if container is None:
+            return
+        if container.dtype == np.uint64:
+            container[low >> 6] &= ~np.uint64(1 << (low & 63))
+            if not container[low >> 6] and not container.any():
+                del self._blocks[key]
+            return
+        i = int(np.searchsorted(container, low))
+        if i < len(container) and container[i] == low:
+            if len(container) == 1:
+                del self._blocks[key]
+            else:
+                self._blocks[key] = np.delete(container, i)
+
+    def _combine(self, other: "RowBitmap", keys: Iterable[int], op) -> "RowBitmap":
+        result = RowBitmap()
+        for key in keys:
+            a, b = self._blocks.get(key), other._blocks.get(key)
+            # Copy one-sided containers: the result must not alias the
+            # operands, whose containers are updated in place.
+            container = b.copy() if a is None else a.copy() if b is None else op(a, b)
+            if container is not None:
+                result._blocks[key] = container
+        return result
+
+    def __and__(self, other: "RowBitmap") -> "RowBitmap":
+        def intersect(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+            if a.dtype == np.uint16 and b.dtype == np.uint16:
+                lows = np.intersect1d(a, b, assume_unique=True)
+                return lows if len(lows) else None
+            if a.dtype == np.uint64 and b.dtype == np.uint64:
+                return _normalise(a & b)
+            lows, words = (a, b) if a.dtype == np.uint16 else (b, a)
+            lows = lows[(words[lows >> 6] >> (lows & 63).astype(np.uint64)) & np.uint64(1) == 1]
+            return lows if len(lows) else None
+        return self._combine(other, sorted(self._blocks.keys() & other._blocks.keys()), intersect)
+
+    def __or__(self, other: "RowBitmap") -> "RowBitmap":
+        def union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            if a.dtype == np.uint16 and b.dtype == np.uint16:
+                lows = np.union1d(a, b)
+                return _to_words(lows) if len(lows) > _ARRAY_MAX else lows
+            return _to_words(a) | _to_words(b)
+        return self._combine(other, sorted(self._blocks.keys() | other._blocks.keys()), union)
+
+    def __bool__(self) -> bool:
+        return bool(self._blocks)
+
+    def __len__(self) -> int:
+        return sum(_count(container) for container in self._blocks.values())
+
+    def __contains__(self, row: int) -> bool:
+        container = self._blocks.get(row >> _BLOCK_BITS)
+        if container is None:
+            return False
+        low = row & _LOW_MASK
+        if container.dtype == np.uint64:
+            return bool(int(container[low >> 6]) >> (low & 63) & 1)
+        i = int(np.searchsorted(container, low))
+        return i < len(container) and container[i] == low
+
+    def rows(self) -> np.ndarray:
+        """Return the set row numbers in ascending order."""
+        if not self._blocks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            (key << _BLOCK_BITS) + _to_lows(self._blocks[key]).astype(np.int64)
+            for key in sorted(self._blocks)
+        ])
+
+
+def _accepted(wanted: Any) -> Sequence[Any]:
+    return wanted if isinstance(wanted, (list, tuple, set, frozenset)) else [wanted]
+
+
+def _matches(metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Equality check of ``filters`` against one row's metadata."""
+    for field_name, wanted in filters.items():
+        value = metadata.get(field_name)
+        if not any(value == accepted for accepted in _accepted(wanted)):
+            return False
+    return True
+
+
+class MetadataIndex:
+    """Bitmap indexes for a fixed set of metadata fields."""
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self._bitmaps: Dict[str, Dict[Any, RowBitmap]] = {f: {} for f in self.fields}
+
+    def add(self, row: int, metadata: Dict[str, Any]) -> None:
+        """Index ``row`` under each of its indexed metadata values."""
+        for field_name, value in self._indexed_values(metadata):
+            self._bitmaps[field_name].setdefault(value, RowBitmap()).add(row)
+
+    def add_many(self, rows: Sequence[int], metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Index many rows at once, one bulk update per distinct value."""
+        grouped: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
+        for row, metadata in zip(rows, metadatas):
+            for key in self._indexed_values(metadata):
+                grouped[key].append(row)
+        for (field_name, value), value_rows in grouped.items():
+            self._bitmaps[field_name].setdefault(value, RowBitmap()).update(value_rows)
+
+    def remove(self, row: int, metadata: Dict[str, Any]) -> None:
+        """Clear ``row`` from the bitmaps it was indexed under."""
+        for field_name, value in self._indexed_values(metadata):
+            bitmaps = self._bitmaps[field_name]
+            bitmap = bitmaps.get(value)
+            if bitmap is None:
+                continue
+            bitmap.discard(row)
+            if not bitmap:
+                del bitmaps[value]
+
+    def match(
+        self,
+        filters: Dict[str, Any],
+        metadata_of: Optional[Callable[[int], Dict[str, Any]]] = None,
+        all_rows: Optional[Callable[[], Sequence[int]]] = None,
+    ) -> Optional[RowBitmap]:
+        """Return rows matching all ``filters`` or ``None`` if nothing is filtered.
+
+        A filter value may be a scalar or a list/tuple/set of accepted values.
+        Filters on fields that are not indexed are checked row by row against
+        ``metadata_of(row)``, over the rows the indexed filters kept or over
+        ``all_rows()`` when no indexed field is filtered. Without
+        ``metadata_of`` they raise ``KeyError``.
+        """
+        result: Optional[RowBitmap] = None
+        # Intersect the most selective field first so later ANDs stay small.
+        candidates: List[RowBitmap] = []
+        unindexed: Dict[str, Any] = {}
+        for field_name, wanted in filters.items():
+            if wanted is None:
+                continue
+            if field_name not in self._bitmaps:
+                if metadata_of is None:
+                    raise KeyError(f"Metadata field '{field_name}' is not indexed")
+                unindexed[field_name] = wanted
+                continue
+            union = RowBitmap()
+            for value in _accepted(wanted):
+                bitmap = self._bitmaps[field_name].get(value)
+                if bitmap is not None:
+                    union = union | bitmap
+            candidates.append(union)
+
+        for bitmap in sorted(candidates, key=len):
+            result = bitmap if result is None else result & bitmap
+            if not result:
+                break
+        if not unindexed or (result is not None and not result):
+            return result
+        if result is not None:
+            rows = result.rows().tolist()
+        elif all_rows is not None:
+            rows = all_rows()
+        else:
+            raise ValueError("all_rows is required to filter only on unindexed fields")
+        return RowBitmap([row for row in rows if _matches(metadata_of(row), unindexed)])
+
+    def values(self, field_name: str) -> List[Any]:
+        """Return the distinct indexed values of ``field_name``."""
+        return list(self._bitmaps.get(field_name, {}))
+
+    def count(self, field_name: str, value: Any) -> int:
+        """Return how many rows carry ``value`` for ``field_name``."""
+        bitmap = self._bitmaps.get(field_name, {}).get(value)
+        return len(bitmap) if bitmap is not None else 0
+
+    def _indexed_values(self, metadata: Dict[str, Any]):
+        for field_name in self.fields:
+            value = metadata.get(field_name)
+            if value is not None and isinstance(value, (str, int, bool)):
+                yield field_name, value
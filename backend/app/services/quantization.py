@@ -0,0 +1,215 @@
+"""
+Embedding Quantization
+
+Compressed embedding codes for a first-pass similarity scan. Two schemes are
+provided, both trained on the stored vectors:
+
+- ``ScalarQuantizer``: symmetric int8 per dimension (4x smaller than float32)
+- ``ProductQuantizer``: k-means codebooks per subspace, one byte per subspace
+  (e.g. 768 float32 dims -> 96 bytes with 96 subspaces)
+
+Scores from the codes are approximate; ``RAGStore`` re-ranks the best
+candidates against the exact float32 vectors.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+
+class Quantizer(ABC):
+    """Interface shared by the quantizers."""
+
+    kind = ""
+    code_dtype = np.uint8
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.fitted = False
+
+    @property
+    @abstractmethod
+    def code_size(self) -> int:
+        """Code entries per row."""
+
+    @property
+    def min_train_size(self) -> int:
+        return 1
+
+    @abstractmethod
+    def fit(self, vectors: np.ndarray) -> "Quantizer":
+        """Train on ``vectors`` and return ``self``."""
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode ``vectors`` as one code row each."""
+
+    @abstractmethod
+    def approx_dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate dot products between ``query`` and the encoded rows."""
+
+
+class ScalarQuantizer(Quantizer):
+    """Symmetric int8 quantization with one scale per dimension."""
+
+    kind = "int8"
+    code_dtype = np.int8
+
+    def __init__(self, dim: int):
+        super().__init__(dim)
+        self.scale = np.ones(dim, dtype=np.float32)
+
+    @property
+    def code_size(self) -> int:
+        return self.dim
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        max_abs = np.abs(np.asarray(vectors, dtype=np.float32)).max(axis=0)
+        self.scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        self.fitted = True
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        scaled = np.asarray(vectors, dtype=np.float32) / self.scale
+        return np.clip(np.rint(scaled), -127, 127).astype(np.int8)
+
+    def approx_dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        weights = query * self.scale
+        out = np.empty(len(codes), dtype=np.float32)
+        # Convert in blocks so the float copy stays cache-sized.
+        for start in range(0, len(codes), 4096):
+            block = codes[start:start + 4096]
+            out[start:start + len(block)] = block.astype(np.float32) @ weights
+        return out
+
+
+class ProductQuantizer(Quantizer):
+    """Product quantization with ``n_subspaces`` codebooks of 256 centroids."""
+
+    kind = "pq"
+    code_dtype = np.uint8
+    n_centroids = 256
+
+    def __init__(self, dim: int, n_subspaces: Optional[int] = None,
+                 iterations: int = 15, sample_size: int = 20000, seed: int = 0):
+        super().__init__(dim)
+        if n_subspaces is None:
+            n_subspaces = next(m for m in (96, 64, 48, 32, 16, 8, 4, 2, 1) if dim % m == 0)
+        if dim % n_subspaces:
+            raise ValueError(f"dim {dim} is not divisible by {n_subspaces} subspaces")
+        self.n_subspaces = n_subspaces
+        self.sub_dim = dim // n_subspaces
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.seed = seed
+        self.codebooks = np.zeros((n_subspaces, self.n_centroids, self.sub_dim), dtype=np.float32)
+
+    @property
+    def code_size(self) -> int:
+        return self.n_subspaces
+
+    @property
+    def min_train_size(self) -> int:
+        return self.n_centroids
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.n_subspaces, self.sub_dim)
+
+    def fit(self, vectors: np.ndarray) -> "ProductQuantizer":
+        rng = np.random.default_rng(self.seed)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > self.sample_size:
+            vectors = vectors[rng.choice(len(vectors), self.sample_size, replace=False)]
+        subvectors = self._split(vectors)
+        k = min(self.n_centroids, len(vectors))
+        for m in range(self.n_subspaces):
+            data = subvectors[:, m, :]
+            centroids = data[rng.choice(len(data), k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assign = self._nearest(data, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, data)
+                counts = np.bincount(assign, minlength=k)[:, None]
+                nonempty = counts[:, 0] > 0
+                centroids[nonempty] = sums[nonempty] / counts[nonempty]
+            self.codebooks[m, :k] = centroids
+            if k < self.n_centroids:
+                self.codebooks[m, k:] = centroids[0]
+        self.fitted = True
+        return self
+
+    @staticmethod
+    def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = (
+            (data * data).sum(1)[:, None]
+            - 2.0 * data @ centroids.T
+            + (centroids * centroids).sum(1)[None, :]
+        )
+        return distances.argmin(axis=1)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        subvectors = self._split(vectors)
+        codes = np.empty((len(subvectors), self.n_subspaces), dtype=np.uint8)
+        for m in range(self.n_subspaces):
+            codes[:, m] = self._nearest(subvectors[:, m, :], self.codebooks[m])
+        return codes
+
+    def approx_dot(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # Asymmetric distance computation: one lookup table per subspace.
+        tables = np.einsum("mkd,md->mk", self.codebooks, query.reshape(self.n_subspaces, self.sub_dim))
+        return tables[np.arange(self.n_subspaces), codes].sum(axis=1)
+
+
+QUANTIZERS = {"int8": ScalarQuantizer, "pq": ProductQuantizer}
+
+
+def make_quantizer(kind: str, dim: int, **options) -> Quantizer:
+    """Create a quantizer by name (``"int8"`` or ``"pq"``)."""
+    try:
+        return QUANTIZERS[kind](dim, **options)
+    except KeyError:
+        raise ValueError(f"Unknown quantization '{kind}', expected one of {sorted(QUANTIZERS)}") from None
+
+
+class QuantizedCodes:
+    """Growable code matrix aligned with chunk rows.
+
+    Rows are only encoded once the quantizer is trained and the row has a
+    vector; rows past the encoded ones read as zero codes.
+    """
+
+    def __init__(self, quantizer: Quantizer):
+        self.quantizer = quantizer
+        self.codes = np.zeros((64, quantizer.code_size), dtype=quantizer.code_dtype)
+
+    def _reserve(self, needed: int) -> None:
+        if needed > len(self.codes):
+            grown = np.zeros((max(needed, len(self.codes) * 2), self.codes.shape[1]), dtype=self.codes.dtype)
+            grown[: len(self.codes)] = self.codes
+            self.codes = grown
+
+    def set_rows(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        self._reserve(int(rows.max()) + 1)
+        self.codes[rows] = self.quantizer.encode(vectors)
+
+    def approx_dot(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        if len(rows) and rows[-1] == len(rows) - 1 and np.array_equal(rows, np.arange(len(rows))):
+            codes = self.codes[: len(rows)]  # dense prefix: a view, no copy
+        else:
+            codes = self.codes[rows]
+        return self.quantizer.approx_dot(query, codes)
+
+    def remap(self, keep: np.ndarray) -> None:
+        """Keep the rows ``keep`` (ascending), renumbered from zero."""
+        if len(keep):
+            # Rows appended since the last encode were never allocated
+            self._reserve(int(keep[-1]) + 1)
+        codes = np.zeros((max(64, len(keep)), self.codes.shape[1]), dtype=self.codes.dtype)
+        codes[: len(keep)] = self.codes[keep]
+        self.codes = codes
+
+    def nbytes(self) -> int:
+        return self.codes.nbytes
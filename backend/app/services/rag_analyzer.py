@@ -15,6 +15,11 @@ from ..core.llm_adapter import LLMAdapter
 from .rag_store import rag_store
 from .vague_detector import VagueTermsDetector
 
+try:
+    from rag.packing import pack_contexts
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    pack_contexts = None
+
 # Input validation decorator
 def validate_input(**validators):
     """
@@ -600,6 +605,31 @@ class RAGAnalyzer:
                 processing_time_ms=processing_time_ms
             )
     
+    def _pack_context_chunks(self, similar_chunks: List[Tuple[Any, float]]) -> List[str]:
+        """Return prompt-ready context texts for retrieved chunks.
+
+        Overlapping and adjacent chunks are merged and near-duplicates dropped so
+        the context fits the model's token budget.
+        """
+        if pack_contexts is None:
+            return [chunk.text for chunk, score in similar_chunks]
+
+        packed = pack_contexts(
+            [
+                {
+                    "source_id": chunk.doc_id,
+                    "page": chunk.page,
+                    "content": chunk.text,
+                    "score": score,
+                    "start": chunk.start_pos,
+                    "end": chunk.end_pos,
+                }
+                for chunk, score in similar_chunks
+            ],
+            model=getattr(self.llm_adapter, "model", None),
+        )
+        return [c.content for c in packed.contexts]
+
     async def _generate_rag_insights(self, doc_id: str, text: str, 
                                    vague_hits: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate insights using RAG capabilities."""
@@ -634,7 +664,7 @@ class RAGAnalyzer:
                 
                 if similar_chunks:
                     # Generate insight using context
-                    context_chunks = [chunk.text for chunk, score in similar_chunks]
+                    context_chunks = self._pack_context_chunks(similar_chunks)
                     insight = await self.llm_adapter.generate_with_context(query, context_chunks)
                     
                     # Categorize insight
@@ -676,7 +706,7 @@ class RAGAnalyzer:
                 )
                 
                 if similar_chunks:
-                    context_chunks = [chunk.text for chunk, score in similar_chunks]
+                    context_chunks = self._pack_context_chunks(similar_chunks)
                     analysis = await self.llm_adapter.generate_with_context(query, context_chunks)
                     
                     compliance_issues.append({
@@ -722,7 +752,7 @@ class RAGAnalyzer:
                 )
                 
                 if similar_chunks:
-                    context_chunks = [chunk.text for chunk, score in similar_chunks]
+                    context_chunks = self._pack_context_chunks(similar_chunks)
                     risk_analysis = await self.llm_adapter.generate_with_context(query, context_chunks)
                     
                     # Categorize risk
@@ -836,7 +866,7 @@ class RAGAnalyzer:
                 }
             
             # Generate response using context
-            context_chunks = [chunk.text for chunk, score in similar_chunks]
+            context_chunks = self._pack_context_chunks(similar_chunks)
             answer = await self.llm_adapter.generate_with_context(query, context_chunks)
             
             # Calculate processing time
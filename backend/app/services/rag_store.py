@@ -2,49 +2,250 @@
 RAG Store Service
 
 Handles text chunking, embedding, and retrieval for contract analysis.
+
+Chunks are stored column-wise (see ``chunk_columns``): texts share one buffer,
+positions and pages are NumPy integer columns and embeddings are rows of a
+single float32 matrix. ``TextChunk`` objects handed out by the store are
+lightweight views onto those columns.
 """
+import bisect
 import hashlib
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from collections.abc import Mapping
+from typing import (
+    List, Dict, Any, Optional, Tuple, Iterable, Iterator, Sequence, Callable, Awaitable
+)
 import numpy as np
 
-@dataclass
+from .chunk_columns import ChunkColumns
+from .metadata_index import MetadataIndex
+from .quantization import QuantizedCodes, make_quantizer
+
+try:
+    from rag.chunking import chunk_text as split_chunks
+    from rag.clause_cache import cached_embed_fn
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    split_chunks = None
+    cached_embed_fn = None
+
+# Chunk metadata fields with bitmap indexes for filtered retrieval
+DEFAULT_INDEXED_FIELDS = ("doc_id", "contract_id", "ruleset", "severity", "contract_type")
+
+# With quantization enabled, this many candidates per requested result are
+# re-ranked against the exact vectors
+DEFAULT_RERANK_FACTOR = 4
+
+# Roughly one sentence in this many ends a chunk, chosen by content, so that
+# re-chunking an edited version reproduces the chunks away from the edit
+CHUNK_ANCHOR_EVERY = 32
+
+# Async callable embedding a batch of texts
+EmbedFn = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+# Compact the columns once tombstoned rows outnumber live ones (and exceed this)
+_COMPACT_MIN_DEAD = 1024
+
+_FIELDS = ("doc_id", "text", "start_pos", "end_pos", "page", "section", "embedding", "metadata")
+
+
 class TextChunk:
-    """Represents a chunk of contract text with metadata."""
-    id: str
-    doc_id: str
-    text: str
-    start_pos: int
-    end_pos: int
-    page: Optional[int] = None
-    section: Optional[str] = None
-    embedding: Optional[List[float]] = None
+    """Represents a chunk of contract text with metadata.
+    
+    A chunk is either detached (holding its own values, as when constructed
+    directly) or a view bound to a ``RAGStore`` row, in which case every
+    attribute is read from and written to the store's columns.
+    """
+    __slots__ = ("id", "_store", "_values")
+    
+    def __init__(self, id: str, doc_id: str, text: str, start_pos: int, end_pos: int,
+                 page: Optional[int] = None, section: Optional[str] = None,
+                 embedding: Optional[Sequence[float]] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self._store: Optional["RAGStore"] = None
+        self._values: Optional[Dict[str, Any]] = {
+            "doc_id": doc_id,
+            "text": text,
+            "start_pos": start_pos,
+            "end_pos": end_pos,
+            "page": page,
+            "section": section,
+            "embedding": embedding,
+            "metadata": metadata if metadata is not None else {},
+        }
+    
+    @classmethod
+    def _view(cls, store: "RAGStore", chunk_id: str) -> "TextChunk":
+        chunk = cls.__new__(cls)
+        chunk.id = chunk_id
+        chunk._store = store
+        chunk._values = None
+        return chunk
+    
+    def _get(self, name: str) -> Any:
+        if self._store is None:
+            return self._values[name]
+        return self._store._read_field(self.id, name)
+    
+    def _set(self, name: str, value: Any) -> None:
+        if self._store is None:
+            self._values[name] = value
+        else:
+            self._store._write_field(self.id, name, value)
+    
+    doc_id = property(lambda self: self._get("doc_id"))
+    text = property(lambda self: self._get("text"))
+    start_pos = property(lambda self: self._get("start_pos"))
+    end_pos = property(lambda self: self._get("end_pos"))
+    page = property(lambda self: self._get("page"))
+    section = property(lambda self: self._get("section"),
+                       lambda self, value: self._set("section", value))
+    embedding = property(lambda self: self._get("embedding"),
+                         lambda self, value: self._set("embedding", value))
+    metadata = property(lambda self: self._get("metadata"))
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TextChunk):
+            return NotImplemented
+        return self.id == other.id and all(
+            _field_equal(self._get(f), other._get(f)) for f in _FIELDS
+        )
+    
+    __hash__ = None  # mutable, like the dataclass it replaces
+    
+    def __repr__(self) -> str:
+        return (f"TextChunk(id={self.id!r}, doc_id={self.doc_id!r}, "
+                f"start_pos={self.start_pos}, end_pos={self.end_pos}, page={self.page})")
+
+
+def _field_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return a is not None and b is not None and np.array_equal(np.asarray(a), np.asarray(b))
+    return a == b
+
+
+class _ChunkMapping(Mapping):
+    """Read-only ``chunk_id -> TextChunk`` mapping over the store's rows."""
+    
+    def __init__(self, store: "RAGStore"):
+        self._store = store
+    
+    def __getitem__(self, chunk_id: str) -> TextChunk:
+        if chunk_id not in self._store._rows:
+            raise KeyError(chunk_id)
+        return TextChunk._view(self._store, chunk_id)
+    
+    def __contains__(self, chunk_id: object) -> bool:
+        return chunk_id in self._store._rows
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._rows)
+    
+    def __len__(self) -> int:
+        return len(self._store._rows)
+
+
+class _EmbeddingMapping(Mapping):
+    """Read-only ``chunk_id -> embedding row`` mapping over the float32 matrix."""
+    
+    def __init__(self, store: "RAGStore"):
+        self._store = store
+    
+    def __getitem__(self, chunk_id: str) -> np.ndarray:
+        row = self._store._rows.get(chunk_id)
+        embedding = None if row is None else self._store._columns.embedding(row)
+        if embedding is None:
+            raise KeyError(chunk_id)
+        return embedding
+    
+    def __iter__(self) -> Iterator[str]:
+        row_ids = self._store._row_ids
+        return (row_ids[row] for row in self._store._columns.embedded_rows().tolist())
+    
+    def __len__(self) -> int:
+        return self._store._columns.embedded_count
 
 class RAGStore:
     """Vector store for contract text chunks and retrieval."""
     
-    def __init__(self, embedding_dim: int = 768):
+    def __init__(self, embedding_dim: int = 768,
+                 indexed_fields: Iterable[str] = DEFAULT_INDEXED_FIELDS):
         """Initialize the RAG store."""
-        self.embedding_dim = embedding_dim
-        self.chunks: Dict[str, TextChunk] = {}
-        self.embeddings: Dict[str, List[float]] = {}
+        self._columns = ChunkColumns(embedding_dim)
+        self.chunks: Mapping = _ChunkMapping(self)
+        self.embeddings: Mapping = _EmbeddingMapping(self)
+        # Row numbers address the columns and back the metadata bitmaps; rows
+        # of removed chunks are tombstoned until the next compaction.
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self.metadata_index = MetadataIndex(indexed_fields)
+        # doc_id -> chunk ids ordered by start position, kept up to date on
+        # every insert/remove so document-scoped operations never scan the store
+        self._doc_chunks: Dict[str, List[str]] = {}
+        # Optional compressed codes for a first-pass scan (see enable_quantization)
+        self._codes: Optional[QuantizedCodes] = None
+        self.rerank_factor = DEFAULT_RERANK_FACTOR
+        self.ingest_stats: Dict[str, int] = {
+            "chunks_added": 0, "chunks_reused": 0, "chunks_retired": 0, "embedding_calls": 0,
+        }
         
-    def chunk_text(self, text: str, doc_id: str, chunk_size: int = 1000, overlap: int = 200) -> List[TextChunk]:
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension of the stored embeddings."""
+        return self._columns.embedding_dim
+        
+    def chunk_text(self, text: str, doc_id: str, max_tokens: int = 256, overlap_tokens: int = 48,
+                   metadata: Optional[Dict[str, Any]] = None,
+                   page_starts: Optional[Sequence[int]] = None) -> List[TextChunk]:
         """
-        Split text into overlapping chunks for embedding.
+        Split text into overlapping, sentence-aligned chunks for embedding.
         
         Args:
-            text: Full contract text
+            text: Full contract text (pages separated by form feeds)
             doc_id: Document identifier
-            chunk_size: Target chunk size in characters
-            overlap: Overlap between chunks in characters
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens of whole sentences repeated between chunks
+            metadata: Document metadata copied onto every chunk
+            page_starts: Offsets at which pages start, if known
             
         Returns:
             List of TextChunk objects
         """
+        chunks = self._split_text(text, doc_id, max_tokens, overlap_tokens, metadata, page_starts)
+        self._add_chunks(chunks)
+        return chunks
+    
+    def _split_text(self, text: str, doc_id: str, max_tokens: int = 256, overlap_tokens: int = 48,
+                    metadata: Optional[Dict[str, Any]] = None,
+                    page_starts: Optional[Sequence[int]] = None) -> List[TextChunk]:
+        """Chunk ``text`` into detached chunks with content-hash ids."""
+        if split_chunks is None:
+            return self._chunk_by_characters(text, doc_id, metadata=metadata)
+        
+        metadata = dict(metadata or {})
+        seen: Dict[str, int] = {}
+        return [
+            TextChunk(
+                id=self._generate_chunk_id(doc_id, piece.text, seen),
+                doc_id=doc_id,
+                text=piece.text,
+                start_pos=piece.start,
+                end_pos=piece.end,
+                page=piece.page,
+                metadata=metadata
+            )
+            for piece in split_chunks(
+                text, max_tokens=max_tokens, overlap_tokens=overlap_tokens,
+                page_starts=page_starts, anchor_every=CHUNK_ANCHOR_EVERY
+            )
+        ]
+    
+    def _chunk_by_characters(self, text: str, doc_id: str, chunk_size: int = 1000, overlap: int = 200,
+                             metadata: Optional[Dict[str, Any]] = None) -> List[TextChunk]:
+        """Character-window chunking used when the shared ``rag`` chunker is unavailable."""
         chunks = []
         start = 0
-        chunk_index = 0
+        seen: Dict[str, int] = {}
+        metadata = dict(metadata or {})
         
         while start < len(text):
             end = min(start + chunk_size, len(text))
@@ -58,33 +259,102 @@ class RAGStore:
             
             chunk_text = text[start:end].strip()
             if chunk_text:
-                chunk_id = self._generate_chunk_id(doc_id, chunk_index)
                 chunk = TextChunk(
-                    id=chunk_id,
+                    id=self._generate_chunk_id(doc_id, chunk_text, seen),
                     doc_id=doc_id,
                     text=chunk_text,
                     start_pos=start,
                     end_pos=end,
-                    page=self._estimate_page(start, text)
+                    page=self._estimate_page(start, text),
+                    metadata=metadata
                 )
                 chunks.append(chunk)
-                self.chunks[chunk_id] = chunk
-                chunk_index += 1
             
             # Move start position with overlap
             start = max(start + 1, end - overlap)
             
         return chunks
 
-    async def store_document(self, doc_id: str, text: str, metadata: Dict[str, Any]) -> List[TextChunk]:
-        """Chunk the provided text and store placeholder embeddings."""
-        chunks = self.chunk_text(text, doc_id)
-        # Use zero vectors as placeholder embeddings for testing
-        zero_embeddings = [[0.0] * self.embedding_dim for _ in chunks]
-        self.embed_chunks(chunks, zero_embeddings)
-        return chunks
+    async def store_document(self, doc_id: str, text: str, metadata: Dict[str, Any],
+                             embed_fn: Optional[EmbedFn] = None,
+                             embedding_model: Optional[str] = None) -> List[TextChunk]:
+        """
+        Chunk and store a document, or a new version of an already stored one.
+        
+        Chunk ids are content hashes, so when ``doc_id`` is already stored only
+        chunks whose text is new are inserted and embedded; unchanged chunks
+        keep their embeddings (their positions and metadata are updated in
+        place) and chunks missing from the new version are tombstoned.
+        
+        Args:
+            doc_id: Document identifier, stable across versions of a contract
+            text: Full text of this version
+            metadata: Document metadata copied onto every chunk
+            embed_fn: Async function embedding a list of texts in one call;
+                zero placeholder vectors are stored when omitted
+            embedding_model: Name of the model behind ``embed_fn``; when given,
+                vectors are shared through the cross-document clause cache
+            
+        Returns:
+            The document's chunks in reading order
+        """
+        chunks = self._split_text(text, doc_id, metadata=metadata)
+        new_ids = {chunk.id for chunk in chunks}
+        retired = [cid for cid in self._doc_chunks.get(doc_id, ()) if cid not in new_ids]
+        for chunk_id in retired:
+            self._remove_chunk(chunk_id)
+        
+        stored: List[TextChunk] = []
+        to_embed: List[TextChunk] = []
+        for chunk in chunks:
+            if chunk.id in self._rows:
+                self._update_chunk(chunk)
+                chunk = self.chunks[chunk.id]
+            stored.append(chunk)
+        added = [chunk for chunk in stored if chunk._store is not self]
+        self._add_chunks(added)
+        self.ingest_stats["chunks_added"] += len(added)
+        for chunk in stored:
+            if chunk.embedding is None:
+                to_embed.append(chunk)
+        if stored:
+            # Reading order of the new version; kept chunks may have moved.
+            self._doc_chunks[doc_id] = [chunk.id for chunk in stored]
+        
+        if to_embed:
+            if embed_fn is None:
+                # Use zero vectors as placeholder embeddings for testing
+                embeddings = np.zeros((len(to_embed), self.embedding_dim), dtype=np.float32)
+            else:
+                embed_texts = embed_fn
+
+                async def counted(texts: List[str]):
+                    self.ingest_stats["embedding_calls"] += 1
+                    return await embed_texts(texts)
+
+                # Counted inside the clause cache, so a batch served entirely
+                # from the cache is not an embedding call.
+                embed_fn = counted
+                if embedding_model is not None and cached_embed_fn is not None:
+                    embed_fn = cached_embed_fn(counted, embedding_model)
+                embeddings = await embed_fn([chunk.text for chunk in to_embed])
+            self.embed_chunks(to_embed, embeddings)
+        
+        self.ingest_stats["chunks_reused"] += len(stored) - len(to_embed)
+        self.ingest_stats["chunks_retired"] += len(retired)
+        self._maybe_compact()
+        return stored
+    
+    def _update_chunk(self, chunk: TextChunk) -> None:
+        """Refresh a stored chunk's position, page and metadata from ``chunk``."""
+        row = self._rows[chunk.id]
+        self._columns.set_position(row, chunk.start_pos, chunk.end_pos, chunk.page)
+        if self._columns.metadata(row) != chunk.metadata:
+            self.metadata_index.remove(row, self._index_fields(row))
+            self._columns.set_metadata(row, chunk.metadata)
+            self.metadata_index.add(row, self._index_fields(row))
 
-    def embed_chunks(self, chunks: List[TextChunk], embeddings: List[List[float]]) -> None:
+    def embed_chunks(self, chunks: List[TextChunk], embeddings: Sequence[Sequence[float]]) -> None:
         """
         Store embeddings for text chunks.
         
@@ -92,19 +362,32 @@ class RAGStore:
             chunks: List of text chunks
             embeddings: Corresponding embeddings from LLM
         """
+        rows = []
         for chunk, embedding in zip(chunks, embeddings):
-            chunk.embedding = embedding
-            self.embeddings[chunk.id] = embedding
+            row = self._rows.get(chunk.id)
+            if row is None:
+                chunk.embedding = embedding
+            else:
+                self._columns.set_embedding(row, embedding)
+                rows.append(row)
+        self._encode_rows(rows)
     
     def retrieve_similar(self, query_embedding: List[float], top_k: int = 5, 
-                        doc_id: Optional[str] = None) -> List[Tuple[TextChunk, float]]:
+                        doc_id: Optional[str] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> List[Tuple[TextChunk, float]]:
         """
         Retrieve most similar chunks to query embedding.
         
+        Metadata filters are resolved against the bitmap index first, so only
+        chunks that survive every filter are scored. Fields outside the index
+        are compared row by row.
+        
         Args:
             query_embedding: Query vector
             top_k: Number of results to return
             doc_id: Optional filter by document ID
+            filters: Optional metadata filters, e.g. ``{"severity": "high"}``;
+                a list value matches any of its elements
             
         Returns:
             List of (chunk, similarity_score) tuples
@@ -112,30 +395,156 @@ class RAGStore:
         if not self.embeddings:
             return []
         
-        similarities = []
-        for chunk_id, embedding in self.embeddings.items():
-            chunk = self.chunks[chunk_id]
+        filters = dict(filters or {})
+        if doc_id:
+            filters["doc_id"] = doc_id
+        
+        candidates = self.metadata_index.match(
+            filters, metadata_of=self._index_fields, all_rows=self._columns.embedded_rows
+        )
+        if candidates is None:
+            rows = self._columns.embedded_rows()
+        else:
+            rows = candidates.rows()
+            rows = rows[self._columns.has_embedding.data[rows]]
+        if len(rows) == 0 or top_k <= 0:
+            return []
+        
+        if self._quantized_ready() and len(rows) > top_k * self.rerank_factor:
+            # First pass on the compressed codes, then exact re-ranking of
+            # the best candidates only.
+            approx = self._approx_scores(query_embedding, rows)
+            n_candidates = top_k * self.rerank_factor
+            rows = rows[np.argpartition(-approx, n_candidates - 1)[:n_candidates]]
+            rows.sort()  # sequential reads from the (possibly mmap'd) matrix
+        
+        scores = self._score_rows(query_embedding, rows)
+        if len(rows) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        
+        row_ids = self._row_ids
+        return [
+            (TextChunk._view(self, row_ids[row]), float(score))
+            for row, score in zip(rows[order].tolist(), scores[order].tolist())
+        ]
+    
+    def retrieve_reranked(self, query: str, query_embedding: List[float], reranker: Any,
+                          top_k: int = 4, candidates: int = 20,
+                          doc_id: Optional[str] = None,
+                          filters: Optional[Dict[str, Any]] = None) -> List[Tuple[TextChunk, float]]:
+        """
+        Over-fetch by vector similarity, then re-rank with a cross-encoder.
+        
+        Args:
+            query: Query text scored against each candidate passage
+            query_embedding: Query vector for the first stage
+            reranker: A ``CrossEncoderReranker`` (or compatible ``rerank``)
+            top_k: Number of re-ranked results to return
+            candidates: Number of first-stage candidates to score
+            doc_id: Optional filter by document ID
+            filters: Optional metadata filters
             
-            # Filter by document if specified
-            if doc_id and chunk.doc_id != doc_id:
-                continue
-                
-            similarity = self._cosine_similarity(query_embedding, embedding)
-            similarities.append((chunk, similarity))
+        Returns:
+            List of (chunk, cross_encoder_score) tuples
+        """
+        first_stage = self.retrieve_similar(query_embedding, max(candidates, top_k),
+                                            doc_id=doc_id, filters=filters)
+        return reranker.rerank(query, [(chunk.id, chunk.text, chunk) for chunk, _ in first_stage],
+                               top_n=top_k)
+    
+    def enable_quantization(self, kind: str = "int8", mmap_path: Optional[str] = None,
+                            rerank_factor: int = DEFAULT_RERANK_FACTOR, **options: Any) -> None:
+        """
+        Score retrieval candidates against compressed codes first.
         
-        # Sort by similarity and return top-k
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        Args:
+            kind: ``"int8"`` (scalar) or ``"pq"`` (product quantization)
+            mmap_path: Optional file to hold the exact float32 vectors; only the
+                re-ranked candidates are then paged into memory
+            rerank_factor: Candidates re-ranked exactly per requested result
+            **options: Passed to the quantizer (e.g. ``n_subspaces`` for PQ)
+        """
+        self.rerank_factor = max(1, rerank_factor)
+        if mmap_path:
+            self._columns.use_mmap(mmap_path)
+        self._codes = QuantizedCodes(make_quantizer(kind, self.embedding_dim, **options))
+        self._quantized_ready()
+    
+    def train_quantizer(self) -> None:
+        """(Re)train the quantizer on the stored vectors and re-encode all rows."""
+        if self._codes is None:
+            raise ValueError("Quantization is not enabled")
+        rows = self._columns.embedded_rows()
+        if len(rows) == 0:
+            return
+        quantizer = make_quantizer(self._codes.quantizer.kind, self.embedding_dim,
+                                   **self._quantizer_options(self._codes.quantizer))
+        quantizer.fit(self._columns.matrix(rows))
+        self._codes = QuantizedCodes(quantizer)
+        self._codes.set_rows(rows, self._columns.matrix(rows))
+    
+    def _quantized_ready(self) -> bool:
+        """Train the quantizer once enough vectors exist; report readiness."""
+        if self._codes is None:
+            return False
+        quantizer = self._codes.quantizer
+        if not quantizer.fitted:
+            if quantizer.dim != self.embedding_dim:
+                self._codes = QuantizedCodes(make_quantizer(
+                    quantizer.kind, self.embedding_dim, **self._quantizer_options(quantizer)))
+            if self._columns.embedded_count < self._codes.quantizer.min_train_size:
+                return False
+            self.train_quantizer()
+        return True
+    
+    @staticmethod
+    def _quantizer_options(quantizer: Any) -> Dict[str, Any]:
+        if quantizer.kind == "pq":
+            return {"n_subspaces": quantizer.n_subspaces, "iterations": quantizer.iterations,
+                    "sample_size": quantizer.sample_size, "seed": quantizer.seed}
+        return {}
+    
+    def _encode_rows(self, rows: List[int]) -> None:
+        if rows and self._codes is not None and self._codes.quantizer.fitted:
+            rows_array = np.asarray(rows, dtype=np.int64)
+            self._codes.set_rows(rows_array, self._columns.matrix(rows_array))
+    
+    def _approx_scores(self, query_embedding: Sequence[float], rows: np.ndarray) -> np.ndarray:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.embedding_dim,):
+            return np.zeros(len(rows), dtype=np.float32)
+        dots = self._codes.approx_dot(query, rows)
+        norms = self._columns.norms.data[rows]
+        return np.where(norms > 0, dots / np.where(norms > 0, norms, 1.0), 0.0)
+    
+    def _score_rows(self, query_embedding: Sequence[float], rows: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query against the embeddings of ``rows``."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self._columns.embedding_dim,):
+            return np.zeros(len(rows), dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        norms = self._columns.norms.data[rows]
+        if query_norm == 0:
+            return np.zeros(len(rows), dtype=np.float32)
+        dots = self._columns.matrix(rows) @ query
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+        return scores.astype(np.float32)
 
     def get_stats(self) -> Dict[str, Any]:
         """Return basic statistics about the stored chunks and documents."""
-        doc_ids = {chunk.doc_id for chunk in self.chunks.values()}
         return {
             "total_chunks": len(self.chunks),
-            "total_documents": len(doc_ids),
-            "document_ids": list(doc_ids),
+            "total_documents": len(self._doc_chunks),
+            "document_ids": list(self._doc_chunks),
         }
     
+    def get_document_chunks(self, doc_id: str) -> List[TextChunk]:
+        """Return a document's chunks in reading order."""
+        return [self.chunks[cid] for cid in self._doc_chunks.get(doc_id, ())]
+    
     def get_context_around_chunk(self, chunk_id: str, context_chunks: int = 2) -> str:
         """
         Get expanded context around a specific chunk.
@@ -151,27 +560,156 @@ class RAGStore:
             return ""
         
         target_chunk = self.chunks[chunk_id]
-        doc_chunks = [c for c in self.chunks.values() if c.doc_id == target_chunk.doc_id]
-        doc_chunks.sort(key=lambda c: c.start_pos)
+        doc_chunk_ids = self._doc_chunks.get(target_chunk.doc_id, [])
         
         # Find target chunk index
-        target_idx = next((i for i, c in enumerate(doc_chunks) if c.id == chunk_id), -1)
+        target_idx = self._position_in_document(chunk_id)
         if target_idx == -1:
             return target_chunk.text
         
         # Get surrounding chunks
         start_idx = max(0, target_idx - context_chunks)
-        end_idx = min(len(doc_chunks), target_idx + context_chunks + 1)
+        end_idx = min(len(doc_chunk_ids), target_idx + context_chunks + 1)
         
-        context_text = " ".join(c.text for c in doc_chunks[start_idx:end_idx])
+        context_text = " ".join(self.chunks[cid].text for cid in doc_chunk_ids[start_idx:end_idx])
         return context_text
     
-    def _generate_chunk_id(self, doc_id: str, chunk_index: int) -> str:
-        """Generate unique chunk ID."""
-        return f"{doc_id}_chunk_{chunk_index:04d}"
+    def _add_chunks(self, chunks: Sequence[TextChunk]) -> None:
+        """Add detached chunks, indexing their metadata in one bulk update."""
+        rows = [self._add_chunk(chunk, index=False) for chunk in chunks]
+        # A later chunk with the same id replaces an earlier one's row
+        live = [row for row in rows if row is not None and self._row_ids[row] is not None]
+        self.metadata_index.add_many(live, map(self._index_fields, live))
+    
+    def _add_chunk(self, chunk: TextChunk, index: bool = True) -> Optional[int]:
+        """Write a detached chunk into the columns and bind it as a view.
+        
+        Returns the chunk's row, or ``None`` if it is already stored here.
+        With ``index=False`` the caller indexes the row's metadata.
+        """
+        if chunk._store is self:
+            return None
+        if chunk.id in self._rows:
+            self._remove_chunk(chunk.id)
+        row = self._columns.append(
+            chunk.doc_id, chunk.text, chunk.start_pos, chunk.end_pos,
+            page=chunk.page, section=chunk.section, metadata=chunk.metadata,
+        )
+        if chunk.embedding is not None:
+            self._columns.set_embedding(row, chunk.embedding)
+            self._encode_rows([row])
+        self._row_ids.append(chunk.id)
+        self._rows[chunk.id] = row
+        chunk._store, chunk._values = self, None
+        if index:
+            self.metadata_index.add(row, self._index_fields(row))
+        
+        doc_chunk_ids = self._doc_chunks.setdefault(chunk.doc_id, [])
+        start_pos = self._columns.start_pos.data[row]
+        if not doc_chunk_ids or self._start_of(doc_chunk_ids[-1]) <= start_pos:
+            doc_chunk_ids.append(chunk.id)  # common case: chunks arrive in order
+        else:
+            idx = bisect.bisect_right(doc_chunk_ids, start_pos, key=self._start_of)
+            doc_chunk_ids.insert(idx, chunk.id)
+        return row
+    
+    def _remove_chunk(self, chunk_id: str) -> None:
+        """Drop a chunk, its embedding and its index entries."""
+        row = self._rows.get(chunk_id)
+        if row is None:
+            return
+        doc_id = self._columns.doc_id(row)
+        doc_chunk_ids = self._doc_chunks.get(doc_id)
+        idx = self._position_in_document(chunk_id)
+        if idx != -1:
+            del doc_chunk_ids[idx]
+            if not doc_chunk_ids:
+                del self._doc_chunks[doc_id]
+        self.metadata_index.remove(row, self._index_fields(row))
+        self._columns.remove(row)
+        self._row_ids[row] = None
+        del self._rows[chunk_id]
+    
+    def _start_of(self, chunk_id: str) -> int:
+        return int(self._columns.start_pos.data[self._rows[chunk_id]])
+    
+    def _position_in_document(self, chunk_id: str) -> int:
+        """Return the chunk's index within its document's ordered chunk list."""
+        row = self._rows[chunk_id]
+        doc_chunk_ids = self._doc_chunks.get(self._columns.doc_id(row), [])
+        start_pos = self._start_of(chunk_id)
+        idx = bisect.bisect_left(doc_chunk_ids, start_pos, key=self._start_of)
+        while idx < len(doc_chunk_ids):
+            if doc_chunk_ids[idx] == chunk_id:
+                return idx
+            if self._start_of(doc_chunk_ids[idx]) != start_pos:
+                break
+            idx += 1
+        return -1
+    
+    def _read_field(self, chunk_id: str, name: str) -> Any:
+        row = self._rows[chunk_id]
+        columns = self._columns
+        if name == "text":
+            return columns.text(row)
+        if name == "doc_id":
+            return columns.doc_id(row)
+        if name == "start_pos":
+            return int(columns.start_pos.data[row])
+        if name == "end_pos":
+            return int(columns.end_pos.data[row])
+        if name == "page":
+            return columns.page_of(row)
+        if name == "section":
+            return columns.section(row)
+        if name == "embedding":
+            return columns.embedding(row)
+        if name == "metadata":
+            return columns.metadata(row)
+        raise AttributeError(name)
+    
+    def _write_field(self, chunk_id: str, name: str, value: Any) -> None:
+        row = self._rows[chunk_id]
+        if name == "embedding":
+            self._columns.set_embedding(row, value)
+            self._encode_rows([row])
+        elif name == "section":
+            self._columns.set_section(row, value)
+        else:
+            raise AttributeError(f"TextChunk.{name} is read-only once stored")
+    
+    def compact(self) -> None:
+        """Reclaim the storage of removed chunks and renumber rows densely."""
+        remap = self._columns.compact()
+        if self._codes is not None:
+            self._codes.remap(np.flatnonzero(remap >= 0))
+        live_ids = [cid for cid in self._row_ids if cid is not None]
+        self._row_ids = live_ids
+        self._rows = {cid: int(remap[row]) for cid, row in self._rows.items()}
+        self.metadata_index = MetadataIndex(self.metadata_index.fields)
+        self.metadata_index.add_many(range(len(live_ids)), map(self._index_fields, range(len(live_ids))))
+    
+    def memory_usage(self) -> int:
+        """Approximate in-memory bytes held by the chunk columns and codes."""
+        codes = self._codes.nbytes() if self._codes is not None else 0
+        return self._columns.nbytes() + codes
+    
+    def _index_fields(self, row: int) -> Dict[str, Any]:
+        return {**self._columns.metadata(row), "doc_id": self._columns.doc_id(row)}
+    
+    def _generate_chunk_id(self, doc_id: str, text: str, seen: Dict[str, int]) -> str:
+        """Generate a chunk ID from the chunk's content.
+        
+        Repeated texts within a document get an occurrence suffix; ``seen``
+        counts the occurrences so far.
+        """
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        return f"{doc_id}_{digest}" if occurrence == 0 else f"{doc_id}_{digest}_{occurrence}"
     
     def _estimate_page(self, char_pos: int, full_text: str) -> int:
-        """Estimate page number based on character position."""
+        """Estimate page number based on character position (fallback chunker only)."""
         # Rough estimate: 2500 chars per page
         return (char_pos // 2500) + 1
     
@@ -191,11 +729,14 @@ class RAGStore:
     
     def clear_document(self, doc_id: str) -> None:
         """Remove all chunks and embeddings for a document."""
-        chunk_ids_to_remove = [cid for cid, chunk in self.chunks.items() if chunk.doc_id == doc_id]
-        for chunk_id in chunk_ids_to_remove:
-            del self.chunks[chunk_id]
-            if chunk_id in self.embeddings:
-                del self.embeddings[chunk_id]
+        for chunk_id in self._doc_chunks.pop(doc_id, []):
+            self._remove_chunk(chunk_id)
+        self._maybe_compact()
+    
+    def _maybe_compact(self) -> None:
+        columns = self._columns
+        if columns.dead > _COMPACT_MIN_DEAD and columns.dead > len(columns) - columns.dead:
+            self.compact()
 
 
 # Global instance used across the application
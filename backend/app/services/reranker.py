@@ -0,0 +1,113 @@
+"""
+Cross-Encoder Re-ranker
+
+Optional second retrieval stage: candidates from the vector search are
+re-scored as (query, passage) pairs by a small local cross-encoder, loaded
+through ``NLPEngine.load_model(..., "cross-encoder")``. All uncached pairs of
+a request are scored in one batched ``predict`` call and scores are cached
+per (query hash, chunk id).
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+_WS_RE = re.compile(r"\s+")
+
+
+class CrossEncoderReranker:
+    """Re-rank retrieval candidates with a cross-encoder and a score cache."""
+
+    def __init__(self, model: Any = None, nlp_engine: Any = None,
+                 model_name: str = DEFAULT_RERANK_MODEL, batch_size: int = 32,
+                 cache_size: int = 50000):
+        """
+        Args:
+            model: Object with ``predict(pairs, batch_size=...)``; loaded lazily
+                from ``nlp_engine`` when omitted
+            nlp_engine: ``NLPEngine`` used to load ``model_name``
+            model_name: Cross-encoder model to load
+            batch_size: Pairs per forward pass
+            cache_size: Maximum cached (query, chunk) scores
+        """
+        self._model = model
+        self.nlp_engine = nlp_engine
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = Lock()
+        self.stats: Dict[str, int] = {"pairs_scored": 0, "cache_hits": 0, "batches": 0}
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            if self.nlp_engine is None:
+                from ..core.nlp_engine import NLPEngine  # heavy; import on demand
+                self.nlp_engine = NLPEngine()
+            self._model = self.nlp_engine.load_model(self.model_name, "cross-encoder")
+            if self._model is None:
+                raise RuntimeError(f"Failed to load cross-encoder '{self.model_name}'")
+        return self._model
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        normalised = _WS_RE.sub(" ", query.casefold()).strip()
+        return hashlib.sha1(normalised.encode("utf-8")).hexdigest()
+
+    def rerank(self, query: str, candidates: Sequence[Tuple[str, str, T]],
+               top_n: Optional[int] = None) -> List[Tuple[T, float]]:
+        """
+        Score ``candidates`` against ``query`` and return the best ``top_n``.
+
+        Args:
+            query: Search query
+            candidates: ``(chunk_id, passage_text, payload)`` tuples
+            top_n: Number of results to keep (all when ``None``)
+
+        Returns:
+            ``(payload, score)`` tuples, highest cross-encoder score first
+        """
+        if not candidates:
+            return []
+        qhash = self.query_hash(query)
+        scores: List[Optional[float]] = []
+        missing: List[int] = []
+        with self._lock:
+            for i, (chunk_id, _, _) in enumerate(candidates):
+                score = self._cache.get((qhash, chunk_id))
+                if score is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end((qhash, chunk_id))
+                    self.stats["cache_hits"] += 1
+                scores.append(score)
+
+        if missing:
+            pairs = [(query, candidates[i][1]) for i in missing]
+            predicted = self.model.predict(pairs, batch_size=self.batch_size)
+            with self._lock:
+                self.stats["pairs_scored"] += len(pairs)
+                self.stats["batches"] += -(-len(pairs) // self.batch_size)
+                for i, score in zip(missing, predicted):
+                    score = float(score)
+                    scores[i] = score
+                    self._cache[(qhash, candidates[i][0])] = score
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        ranked = sorted(
+            ((payload, scores[i]) for i, (_, _, payload) in enumerate(candidates)),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return ranked[:top_n] if top_n is not None else ranked
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
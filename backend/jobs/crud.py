@@ -131,6 +131,52 @@ async def update_job_result(
         raise
 
 
+async def update_job_fingerprint(
+    db: AsyncSession,
+    job_id: UUID,
+    minhash_signature: List[int],
+    segment_hashes: List[str],
+    near_duplicate_of: Optional[UUID] = None,
+) -> Optional[Job]:
+    """Stores the near-duplicate fingerprint of a job's extracted text."""
+    try:
+        result = await db.execute(select(Job).filter(Job.id == job_id))
+        job = result.scalars().first()
+
+        if not job:
+            return None
+
+        job.minhash_signature = minhash_signature
+        job.segment_hashes = segment_hashes
+        job.near_duplicate_of = near_duplicate_of
+
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to update job {job_id} fingerprint: {e}")
+        raise
+
+
+async def get_fingerprinted_jobs(
+    db: AsyncSession, completed_after: Optional[datetime] = None
+) -> List[Job]:
+    """Retrieves completed jobs that have a near-duplicate fingerprint."""
+    try:
+        query = select(Job).filter(
+            Job.status == JobStatus.COMPLETED, Job.minhash_signature.isnot(None)
+        )
+        if completed_after is not None:
+            query = query.filter(Job.completed_at >= completed_after)
+        result = await db.execute(query.order_by(Job.completed_at))
+        return result.scalars().all()
+    except Exception as e:
+        logger.error(f"Failed to retrieve fingerprinted jobs: {e}")
+        raise
+
+
 async def get_jobs_by_status(
     db: AsyncSession, status: JobStatus, limit: int = 100
 ) -> List[Job]:
@@ -47,6 +47,11 @@ class Job(Base):
     extracted_text_length = Column(Integer, nullable=True)
     processing_steps_completed = Column(JSON, nullable=True, default=list)
 
+    # Near-duplicate detection (see services.near_duplicates)
+    minhash_signature = Column(JSON, nullable=True)
+    segment_hashes = Column(JSON, nullable=True)
+    near_duplicate_of = Column(UUID(as_uuid=True), nullable=True)
+
     # Output and Error Handling
     result = Column(
         JSON,
@@ -91,6 +91,10 @@ class AnalysisResult(BaseModel):
     issues_detected: int
     issues: List[AnalysisIssue]
     processing_time_seconds: Optional[float] = None
+    llm_failed_rules: List[str] = Field(
+        default_factory=list,
+        description="Rule ids whose LLM follow-up analysis failed.",
+    )
 
 
 class JobResultResponse(JobStatusResponse):
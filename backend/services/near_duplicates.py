@@ -0,0 +1,191 @@
+"""Near-duplicate contract detection with MinHash signatures and LSH.
+
+Many submissions are the same template with different party names and
+dates. A MinHash signature over word shingles of the normalised text
+estimates the Jaccard similarity between two contracts, and an LSH index
+over the signatures of completed jobs finds candidates without comparing
+against every job.
+
+For a near-duplicate, the analysis is diff-scoped: the new text is split
+into paragraphs, paragraphs whose hash is not among the prior job's are the
+changed regions, and only findings touching those regions (or whose rule
+outcome changed) are re-analysed; the rest are inherited.
+"""
+import hashlib
+import re
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_WORDS = 5
+DEFAULT_THRESHOLD = 0.85
+
+# Suffixes of follow-up issues produced by the LLM for a rule issue
+FOLLOW_UP_SUFFIXES = ("_llm_enhanced", "_adequacy_check")
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"\w+")
+_DIGIT_RE = re.compile(r"\d")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_WS_RE = re.compile(r"\s+")
+
+
+def _normalise(text: str) -> str:
+    # Digits are folded so that dates and amounts do not break shingles.
+    return _DIGIT_RE.sub("0", text.casefold())
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Return the MinHash signature of ``text``'s word shingles."""
+    words = _WORD_RE.findall(_normalise(text))
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # (a * x + b) mod p for every permutation and shingle; a < 2**31 and
+    # x < 2**32, so the sum fits in 64 bits.
+    signature = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(hashes), 4096):
+        block = hashes[start:start + 4096]
+        values = (np.outer(_PERM_A, block) + _PERM_B[:, None]) % _PRIME
+        np.minimum(signature, values.min(axis=1), out=signature)
+    return signature.tolist()
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return float(np.mean(np.asarray(a, dtype=np.uint64) == np.asarray(b, dtype=np.uint64)))
+
+
+class LSHIndex:
+    """Banded LSH index of MinHash signatures."""
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._signatures: Dict[str, List[int]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._signatures
+
+    def _band_keys(self, signature: Sequence[int]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key: str, signature: Sequence[int]) -> None:
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = list(signature)
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def query(self, signature: Sequence[int], threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+        """Return ``(key, estimated_jaccard)`` pairs above ``threshold``, best first."""
+        with self._lock:
+            candidates: Set[str] = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+            scored = [(key, estimate_jaccard(signature, self._signatures[key])) for key in candidates]
+        return sorted((item for item in scored if item[1] >= threshold), key=lambda item: -item[1])
+
+    def _remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [p for p in (_WS_RE.sub(" ", part).strip() for part in _PARAGRAPH_RE.split(text)) if p]
+
+
+def segment_hashes(text: str) -> List[str]:
+    """Return a hash for each paragraph of ``text``."""
+    return [hashlib.sha1(p.casefold().encode("utf-8")).hexdigest()[:16] for p in _paragraphs(text)]
+
+
+def changed_regions(text: str, prior_hashes: Iterable[str]) -> str:
+    """Return the paragraphs of ``text`` that do not occur in the prior version."""
+    known = set(prior_hashes)
+    return "\n\n".join(
+        p for p in _paragraphs(text)
+        if hashlib.sha1(p.casefold().encode("utf-8")).hexdigest()[:16] not in known
+    )
+
+
+def _citation_text(citation: Optional[str]) -> str:
+    return _WS_RE.sub(" ", (citation or "").strip().strip('"').rstrip(".").strip())
+
+
+def partition_for_reuse(rule_issues: Sequence[Any], prior_issues: Sequence[Any],
+                        changed_text: str, failed: Iterable[str] = ()) -> Tuple[List[Any], List[Any]]:
+    """
+    Split rule issues into those whose prior follow-ups can be inherited and
+    those that need a fresh analysis.
+
+    A rule issue is unchanged when the prior job produced the same outcome
+    with the same citation and that citation does not fall in a changed
+    region. Issues are objects with ``rule_id``, ``compliant`` and
+    ``citation`` attributes. Rule ids in ``failed`` had no follow-up in the
+    prior job because its LLM analysis failed, so they are always analysed
+    again rather than inheriting the empty result.
+
+    Returns:
+        ``(inherited_follow_ups, issues_to_analyse)``
+    """
+    prior_rules = {}
+    follow_ups: Dict[str, List[Any]] = {}
+    for issue in prior_issues:
+        suffix = next((s for s in FOLLOW_UP_SUFFIXES if issue.rule_id.endswith(s)), None)
+        if suffix is None:
+            prior_rules[issue.rule_id] = issue
+        else:
+            follow_ups.setdefault(issue.rule_id[: -len(suffix)], []).append(issue)
+
+    failed = set(failed)
+    changed = _WS_RE.sub(" ", changed_text)
+    inherited: List[Any] = []
+    to_analyse: List[Any] = []
+    for issue in rule_issues:
+        before = prior_rules.get(issue.rule_id)
+        citation = _citation_text(issue.citation)
+        unchanged = (
+            before is not None
+            and issue.rule_id not in failed
+            and before.compliant == issue.compliant
+            and before.citation == issue.citation
+            and not (citation and citation in changed)
+        )
+        if unchanged:
+            inherited.extend(follow_ups.get(issue.rule_id, ()))
+        else:
+            to_analyse.append(issue)
+    return inherited, to_analyse
@@ -1,14 +1,48 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
 
 from ..db.session import AsyncSessionLocal
 from ..jobs import crud
+from ..models.job import Job
 from ..models.schemas import AnalysisIssue, AnalysisResult, JobStatus
+from ..services.near_duplicates import (
+    DEFAULT_THRESHOLD,
+    LSHIndex,
+    changed_regions,
+    minhash_signature,
+    partition_for_reuse,
+    segment_hashes,
+)
 from ..services.storage import storage_service
 from .celery_app import celery_app
 
+try:
+    from rag.clause_cache import clause_cache
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    clause_cache = None
+
+try:
+    from rag.docx_stream import docx_text
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    docx_text = None
+
+try:
+    from rag.ocr_pool import get_ocr_pool
+    from rag.ocr_preprocess import aocr_page_adaptive
+except Exception:  # pragma: no cover - root ``rag`` package not on the path
+    get_ocr_pool = None
+    aocr_page_adaptive = None
+
+ADEQUACY_MODEL = "gpt-3.5-turbo"
+
+# LSH index over the MinHash signatures of completed jobs; each worker loads
+# it from the database and catches up on jobs completed since the last sync.
+_job_index = LSHIndex()
+_job_index_synced_at: Optional[datetime] = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +88,17 @@ def process_contract(self, job_id: str):
                     file_content, job.original_filename
                 )
 
+                signature = minhash_signature(extracted_text)
+                segments = segment_hashes(extracted_text)
+                prior_job, similarity = await find_near_duplicate_job(db, job, signature)
+                await crud.update_job_fingerprint(
+                    db,
+                    job_id,
+                    signature,
+                    segments,
+                    near_duplicate_of=prior_job.id if prior_job else None,
+                )
+
                 await crud.update_job_status(
                     db,
                     job_id,
@@ -69,7 +114,19 @@ def process_contract(self, job_id: str):
                     db, job_id, JobStatus.PROCESSING, processing_step="AI analysis"
                 )
 
-                llm_issues = await run_llm_analysis(extracted_text, rule_issues)
+                llm_failed: List[str] = []
+                if prior_job is not None:
+                    logger.info(
+                        f"Job {job_id}: near-duplicate of job {prior_job.id} "
+                        f"(Jaccard ~{similarity:.2f}); running diff-scoped analysis"
+                    )
+                    llm_issues = await run_diff_scoped_llm_analysis(
+                        extracted_text, rule_issues, prior_job, llm_failed
+                    )
+                else:
+                    llm_issues = await run_llm_analysis(
+                        extracted_text, rule_issues, llm_failed
+                    )
 
                 await crud.update_job_status(
                     db,
@@ -99,6 +156,7 @@ def process_contract(self, job_id: str):
                     ),
                     issues=all_issues,
                     processing_time_seconds=processing_time,
+                    llm_failed_rules=llm_failed,
                 )
 
                 report_file_key = await generate_pdf_report(job_id, analysis_result)
@@ -111,6 +169,8 @@ def process_contract(self, job_id: str):
                     processing_time=processing_time,
                 )
 
+                _job_index.add(str(job_id), signature)
+
                 logger.info(
                     f"Successfully processed job {job_id} in {processing_time:.2f} seconds."
                 )
@@ -134,6 +194,66 @@ def process_contract(self, job_id: str):
     asyncio.run(_run_task())
 
 
+async def find_near_duplicate_job(
+    db, job: Job, signature: List[int], threshold: float = DEFAULT_THRESHOLD
+) -> Tuple[Optional[Job], float]:
+    """Find a completed job whose contract is a near-duplicate of ``job``'s.
+
+    Only jobs analysed under the same contract type, jurisdiction and
+    playbook qualify, since their findings are inherited.
+    """
+    global _job_index_synced_at
+    # Jobs completed at the last synced instant are fetched again so that one
+    # finishing in the same timestamp is not skipped; re-adding a key is a no-op.
+    for completed in await crud.get_fingerprinted_jobs(
+        db, completed_after=_job_index_synced_at
+    ):
+        _job_index.add(str(completed.id), completed.minhash_signature)
+        if completed.completed_at is not None:
+            _job_index_synced_at = completed.completed_at
+
+    for key, similarity in _job_index.query(signature, threshold):
+        if key == str(job.id):
+            continue
+        prior = await crud.get_job_by_id(db, UUID(key))
+        if (
+            prior is not None
+            and prior.result
+            and prior.segment_hashes is not None
+            and prior.contract_type == job.contract_type
+            and prior.jurisdiction == job.jurisdiction
+            and prior.playbook_id == job.playbook_id
+        ):
+            return prior, similarity
+    return None, 0.0
+
+
+async def run_diff_scoped_llm_analysis(
+    text: str,
+    rule_issues: List[AnalysisIssue],
+    prior_job: Job,
+    failed: Optional[List[str]] = None,
+) -> List[AnalysisIssue]:
+    """Re-run LLM analysis only for findings affected by the differences from ``prior_job``.
+
+    Follow-up issues of rule findings that are unchanged and do not cite a
+    changed paragraph are inherited from the prior job.
+    """
+    prior_issues = [AnalysisIssue(**issue) for issue in prior_job.result.get("issues", [])]
+    changed_text = changed_regions(text, prior_job.segment_hashes)
+    inherited, to_analyse = partition_for_reuse(
+        rule_issues,
+        prior_issues,
+        changed_text,
+        failed=prior_job.result.get("llm_failed_rules", ()),
+    )
+    logger.info(
+        f"Diff-scoped analysis: {len(rule_issues) - len(to_analyse)} findings inherited, "
+        f"{len(to_analyse)} re-checked"
+    )
+    return inherited + await run_llm_analysis(text, to_analyse, failed)
+
+
 async def extract_text_from_file(file_content: bytes, filename: str) -> str:
     """Extract text content from uploaded file."""
     try:
@@ -177,25 +297,26 @@ async def extract_text_from_pdf(file_content: bytes) -> str:
 
 
 async def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file."""
-    import io
-
-    from docx import Document
+    """Extract text from DOCX file.
 
+    Streams ``word/document.xml`` when the shared reader is available, so
+    tables stay in document order and memory does not grow with the file.
+    """
     try:
-        doc = Document(io.BytesIO(file_content))
-        text = ""
+        if docx_text is not None:
+            return docx_text(file_content).strip()
+
+        import io
 
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        from docx import Document
 
+        doc = Document(io.BytesIO(file_content))
+        parts = [paragraph.text for paragraph in doc.paragraphs]
         for table in doc.tables:
             for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text + " "
-                text += "\n"
+                parts.append(" ".join(cell.text for cell in row.cells))
 
-        return text.strip()
+        return "\n".join(parts).strip()
 
     except Exception as e:
         logger.error(f"DOCX extraction failed: {e}")
@@ -205,15 +326,18 @@ async def extract_text_from_docx(file_content: bytes) -> str:
 async def ocr_pdf_page(page) -> str:
     """Perform OCR on a PDF page using Tesseract."""
     try:
-        import io
-
         import pytesseract
         from PIL import Image
 
-        pix = page.get_pixmap()
-        img_data = pix.tobytes("png")
-        image = Image.open(io.BytesIO(img_data))
-        text = pytesseract.image_to_string(image, config="--psm 6")
+        def render(dpi: int) -> "Image.Image":
+            pix = page.get_pixmap(dpi=dpi)
+            mode = "L" if pix.n == 1 else "RGB" if pix.n == 3 else "RGBA"
+            return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+        if aocr_page_adaptive is not None:
+            text, _, _ = await aocr_page_adaptive(render, get_ocr_pool(), config="--psm 6")
+            return text
+        text = pytesseract.image_to_string(render(72), config="--psm 6")
         return text
 
     except ImportError:
@@ -404,36 +528,50 @@ def get_default_gdpr_rules() -> List[dict]:
 
 
 async def run_llm_analysis(
-    text: str, rule_issues: List[AnalysisIssue]
+    text: str, rule_issues: List[AnalysisIssue], failed: Optional[List[str]] = None
 ) -> List[AnalysisIssue]:
-    """Run LLM-based analysis for complex compliance evaluation."""
+    """Run LLM-based analysis for complex compliance evaluation.
+
+    Rule ids whose analysis raised are appended to ``failed`` so that a
+    missing follow-up is not mistaken for a clean result.
+    """
+    pending = [
+        issue
+        for issue in rule_issues
+        if (not issue.compliant and issue.severity == "high")
+        or (issue.compliant and issue.citation)
+    ]
     try:
         import openai
 
         from ..core.config import settings
 
         openai.api_key = settings.OPENAI_API_KEY
-        llm_issues: List[AnalysisIssue] = []
-
-        for issue in rule_issues:
-            if not issue.compliant and issue.severity == "high":
-                enhanced_issue = await analyze_missing_clause_with_llm(text, issue)
-                if enhanced_issue:
-                    llm_issues.append(enhanced_issue)
-            elif issue.compliant and issue.citation:
-                verified_issue = await verify_clause_adequacy_with_llm(
-                    issue.citation, issue
-                )
-                if verified_issue:
-                    llm_issues.append(verified_issue)
-
-        logger.info(f"LLM analysis completed: {len(llm_issues)} additional insights")
-        return llm_issues
-
     except Exception as e:
         logger.error(f"LLM analysis failed: {e}")
+        if failed is not None:
+            failed.extend(issue.rule_id for issue in pending)
         return []
 
+    llm_issues: List[AnalysisIssue] = []
+    for issue in pending:
+        try:
+            if not issue.compliant:
+                follow_up = await analyze_missing_clause_with_llm(text, issue)
+            else:
+                follow_up = await verify_clause_adequacy_with_llm(
+                    issue.citation, issue
+                )
+        except Exception:
+            if failed is not None:
+                failed.append(issue.rule_id)
+            continue
+        if follow_up:
+            llm_issues.append(follow_up)
+
+    logger.info(f"LLM analysis completed: {len(llm_issues)} additional insights")
+    return llm_issues
+
 
 async def analyze_missing_clause_with_llm(
     text: str, issue: AnalysisIssue
@@ -496,6 +634,7 @@ async def analyze_missing_clause_with_llm(
 
     except Exception as e:
         logger.error(f"LLM missing clause analysis failed: {e}")
+        raise
 
     return None
 
@@ -504,40 +643,18 @@ async def verify_clause_adequacy_with_llm(
     citation: str, issue: AnalysisIssue
 ) -> AnalysisIssue | None:
     """Use LLM to verify if found clauses are actually adequate."""
+    # The model's answer for a clause/requirement pair is shared across jobs.
+    cache_key = f"{ADEQUACY_MODEL}:{issue.rule_id}:{issue.description}"
     try:
-        import openai
-
-        prompt = f"""
-    As a GDPR compliance expert, evaluate if this contract clause adequately meets the requirement:
-
-    Requirement: {issue.description}
-    Contract Clause: "{citation}"
-
-    Analyze:
-    1. Does this clause fully satisfy the GDPR requirement?
-    2. Are there any gaps or weaknesses?
-    3. What improvements could be made?
-
-    Format your response as:
-    ADEQUATE: Yes/No
-    ANALYSIS: [Your analysis]
-    IMPROVEMENTS: [Suggested improvements if any]
-    """
-
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a GDPR compliance expert providing detailed clause analysis.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=400,
-            temperature=0.1,
+        analysis = (
+            clause_cache.get("adequacy", citation, key=cache_key)
+            if clause_cache is not None
+            else None
         )
-
-        analysis = response.choices[0].message.content
+        if analysis is None:
+            analysis = await _ask_clause_adequacy(citation, issue)
+            if clause_cache is not None:
+                clause_cache.put("adequacy", citation, analysis, key=cache_key)
 
         if "ADEQUATE: No" in analysis:
             analysis_start = analysis.find("ANALYSIS:") + 9
@@ -559,10 +676,48 @@ async def verify_clause_adequacy_with_llm(
 
     except Exception as e:
         logger.error(f"LLM adequacy check failed: {e}")
+        raise
 
     return None
 
 
+async def _ask_clause_adequacy(citation: str, issue: AnalysisIssue) -> str:
+    """Ask the LLM whether ``citation`` satisfies the requirement behind ``issue``."""
+    import openai
+
+    prompt = f"""
+    As a GDPR compliance expert, evaluate if this contract clause adequately meets the requirement:
+
+    Requirement: {issue.description}
+    Contract Clause: "{citation}"
+
+    Analyze:
+    1. Does this clause fully satisfy the GDPR requirement?
+    2. Are there any gaps or weaknesses?
+    3. What improvements could be made?
+
+    Format your response as:
+    ADEQUATE: Yes/No
+    ANALYSIS: [Your analysis]
+    IMPROVEMENTS: [Suggested improvements if any]
+    """
+
+    response = await openai.ChatCompletion.acreate(
+        model=ADEQUACY_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a GDPR compliance expert providing detailed clause analysis.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=400,
+        temperature=0.1,
+    )
+
+    return response.choices[0].message.content
+
+
 async def generate_pdf_report(job_id: str, analysis_result: AnalysisResult) -> str:
     """Generate PDF report and return S3 object key."""
     try:
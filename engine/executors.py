@@ -7,7 +7,8 @@ def execute_rules(rules: Iterable[Rule], chunks: Iterable[Dict[str, Any]]) -> Li
     """Apply rules to chunks and return list of findings."""
     findings: List[Dict[str, Any]] = []
     for chunk in chunks:
-        chunk_id = chunk.get('chunk_id')
+        # ``apps.ingest`` chunks carry their id as ``id``
+        chunk_id = chunk.get('chunk_id', chunk.get('id'))
         text = chunk.get('text', '')
         for rule in rules:
             if rule.is_regex() and rule.pattern:
@@ -0,0 +1,273 @@
+"""Streaming ingest -> rules -> index pipeline.
+
+Contracts in a folder flow through three stages without intermediate files:
+
+1. ingest: ``apps.ingest`` adapters parse each file into ``ContractChunk``s
+   in a process pool;
+2. rules: the compliance rules run over each contract's chunks in a second
+   process pool and findings are appended to a JSONL file as they arrive;
+3. index: one thread feeds the chunks to :func:`rag.index.index_chunks`,
+   which upserts them into the Chroma store in batches.
+
+Stages are chained generators.  Each pool has at most ``max_pending`` files in
+flight and the index stage reads from a bounded queue, so memory stays
+constant however many contracts the folder holds, and a slow stage throttles
+the ones before it instead of letting work pile up.
+
+Usage: python -m engine.pipeline --path contracts/ --rules rules.yaml --findings findings.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from apps.ingest.adapters import ADAPTERS, ingest_file
+from rag.index import DEFAULT_BATCH_SIZE, MANIFEST_NAME, IndexManifest, index_chunks, open_collection
+
+from .executors import execute_rules
+from .rules import Rule, load_rules
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_SENTINEL = object()
+
+# Rules for the current rules worker process, set by ``_init_rules_worker``.
+_worker_rules: List[Rule] = []
+
+
+@dataclass
+class PipelineStats:
+    """Counters reported by :func:`run_pipeline`."""
+
+    files: int = 0
+    failed: int = 0
+    chunks: int = 0
+    findings: int = 0
+    seconds: float = 0.0
+    index: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "findings": self.findings,
+            "seconds": round(self.seconds, 3),
+            "files_per_second": self.files / self.seconds if self.seconds else 0.0,
+            "index": self.index,
+        }
+
+
+def bounded_map(executor: Executor, fn: Callable[[T], R], items: Iterable[T],
+                max_pending: int) -> Iterator[Tuple[T, R]]:
+    """Yield ``(item, fn(item))`` as results complete, keeping at most
+    ``max_pending`` items in flight.
+
+    ``items`` is only consumed when there is room, so an upstream generator
+    is throttled by this stage.
+    """
+    pending: Dict[Any, T] = {}
+
+    def drain(return_when: str) -> Iterator[Tuple[T, R]]:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            yield pending.pop(future), future.result()
+
+    for item in items:
+        pending[executor.submit(fn, item)] = item
+        if len(pending) >= max_pending:
+            yield from drain(FIRST_COMPLETED)
+    while pending:
+        yield from drain(FIRST_COMPLETED)
+
+
+def _ingest(path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    try:
+        return [asdict(chunk) for chunk in ingest_file(path, Path(path).stem)], None
+    except Exception as exc:  # one bad file must not stop the run
+        return [], f"{type(exc).__name__}: {exc}"
+
+
+def _init_rules_worker(rules: Sequence[Rule]) -> None:
+    global _worker_rules
+    _worker_rules = list(rules)
+
+
+def _apply_rules(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return execute_rules(_worker_rules, chunks)
+
+
+def contract_files(folder: str) -> Iterator[str]:
+    """Yield the files in ``folder`` that an ingest adapter can read."""
+    for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+        if entry.is_file() and Path(entry.name).suffix.lower() in ADAPTERS:
+            yield entry.path
+
+
+class _IndexStage(threading.Thread):
+    """Indexer thread consuming contract chunk lists from a bounded queue."""
+
+    def __init__(self, collection: Any, manifest: IndexManifest, collection_name: str,
+                 batch_size: int, max_pending: int):
+        super().__init__(name="pipeline-index", daemon=True)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self.collection = collection
+        self.manifest = manifest
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.stats: Dict[str, Any] = {}
+        self.error: Optional[BaseException] = None
+
+    def _chunks(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            item = self.queue.get()
+            if item is _SENTINEL:
+                return
+            yield from item
+
+    def run(self) -> None:
+        try:
+            self.stats = index_chunks(
+                self._chunks(), self.collection, self.manifest,
+                collection_name=self.collection_name, batch_size=self.batch_size,
+            ).as_dict()
+        except BaseException as exc:
+            self.error = exc
+            # Keep draining so the producer never blocks on a full queue.
+            while self.queue.get() is not _SENTINEL:
+                pass
+
+
+def run_pipeline(
+    paths: Iterable[str],
+    rules: Sequence[Rule],
+    findings_out: Any,
+    *,
+    collection: Any = None,
+    manifest: Optional[IndexManifest] = None,
+    collection_name: str = "contracts",
+    ingest_workers: Optional[int] = None,
+    rules_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor_factory: Callable[..., Executor] = ProcessPoolExecutor,
+) -> PipelineStats:
+    """Stream contracts through ingest, rules and (optionally) indexing.
+
+    Args:
+        paths: Contract files; the file stem is the contract id
+        rules: Compliance rules to apply
+        findings_out: Text stream receiving one JSON finding per line
+        collection: Chroma collection to index into; indexing is skipped when ``None``
+        manifest: Index manifest (an in-memory one when omitted)
+        collection_name: Namespace of ``collection`` in the manifest
+        ingest_workers: Ingest pool size (CPU count by default)
+        rules_workers: Rules pool size (half the CPU count by default)
+        max_pending: Files in flight per stage (twice the pool size by default)
+        batch_size: Chunks per index upsert
+        executor_factory: Pool constructor, ``ProcessPoolExecutor`` by default
+
+    Returns:
+        PipelineStats: File, chunk and finding counts with throughput
+    """
+    cpus = os.cpu_count() or 1
+    ingest_workers = ingest_workers or cpus
+    rules_workers = rules_workers or max(1, cpus // 2)
+    max_pending = max_pending or 2 * max(ingest_workers, rules_workers)
+
+    stats = PipelineStats()
+    start = time.perf_counter()
+    indexer = None
+    if collection is not None:
+        indexer = _IndexStage(collection, manifest or IndexManifest(), collection_name,
+                              batch_size, max_pending)
+        indexer.start()
+
+    try:
+        with executor_factory(max_workers=ingest_workers) as ingest_pool, \
+                executor_factory(max_workers=rules_workers, initializer=_init_rules_worker,
+                                 initargs=(list(rules),)) as rules_pool:
+            ingested = bounded_map(ingest_pool, _ingest, paths, max_pending)
+
+            def parsed() -> Iterator[List[Dict[str, Any]]]:
+                for path, (chunks, error) in ingested:
+                    stats.files += 1
+                    if error is not None:
+                        stats.failed += 1
+                        logger.warning("Failed to ingest %s: %s", path, error)
+                        continue
+                    if chunks:
+                        yield chunks
+
+            for chunks, findings in bounded_map(rules_pool, _apply_rules, parsed(), max_pending):
+                stats.chunks += len(chunks)
+                stats.findings += len(findings)
+                for finding in findings:
+                    findings_out.write(json.dumps(finding, ensure_ascii=False) + "\n")
+                if indexer is not None:
+                    indexer.queue.put(chunks)
+    finally:
+        if indexer is not None:
+            indexer.queue.put(_SENTINEL)
+            indexer.join()
+
+    if indexer is not None:
+        if indexer.error is not None:
+            raise indexer.error
+        stats.index = indexer.stats
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main() -> None:  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser(description="Ingest, check and index a folder of contracts")
+    parser.add_argument("--path", required=True, help="Path to folder with contracts")
+    parser.add_argument("--rules", required=True, help="Path to rules YAML file")
+    parser.add_argument("--findings", required=True, help="Where to write findings JSONL")
+    parser.add_argument("--db", default=os.getenv("CONTRACTS_DB_PATH", "data/contracts"),
+                        help="Chroma store path")
+    parser.add_argument("--collection", default=os.getenv("CONTRACTS_COLLECTION", "contracts"))
+    parser.add_argument("--no-index", action="store_true", help="Only ingest and check rules")
+    parser.add_argument("--ingest-workers", type=int, default=None)
+    parser.add_argument("--rules-workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    collection = manifest = None
+    if not args.no_index:
+        os.makedirs(args.db, exist_ok=True)
+        collection = open_collection(args.db, args.collection)
+        manifest = IndexManifest(os.path.join(args.db, MANIFEST_NAME))
+
+    out_path = Path(args.findings)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as out:
+        stats = run_pipeline(
+            contract_files(args.path),
+            load_rules(args.rules),
+            out,
+            collection=collection,
+            manifest=manifest,
+            collection_name=args.collection,
+            ingest_workers=args.ingest_workers,
+            rules_workers=args.rules_workers,
+            batch_size=args.batch_size,
+        )
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,52 @@
 import json
 import os
-from typing import Any, Dict, List
+from threading import Lock
+from typing import Any, Dict, List, Sequence, Tuple
 
 try:
     import google.generativeai as genai  # type: ignore
 except Exception:  # pragma: no cover - gemini may not be installed
     genai = None  # type: ignore
 
+from .cache import AnswerCache, answer_cache
+from .clause_cache import clause_cache
+from .packing import pack_contexts
 from .prompts import ANSWER_WITH_CITATIONS
 
+# Configured Gemini clients keyed by (model, api_key) so that repeated calls do
+# not re-run ``genai.configure`` or rebuild ``GenerativeModel`` per request.
+_model_clients: Dict[Tuple[str, str], Any] = {}
+_model_lock = Lock()
+
+
+def _get_model_client(model: str) -> Any:
+    """Return a configured Gemini model client, creating it once per key."""
+
+    if genai is None:  # pragma: no cover - runtime safeguard
+        raise RuntimeError("google-generativeai package not available")
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("GEMINI_API_KEY environment variable is required")
+
+    key = (model, api_key)
+    with _model_lock:
+        client = _model_clients.get(key)
+        if client is None:
+            genai.configure(api_key=api_key)
+            client = genai.GenerativeModel(model)
+            _model_clients[key] = client
+        return client
+
+
+def clear_caches() -> None:
+    """Drop cached answers, clause results and model clients (used by tests and reloads)."""
+
+    answer_cache.clear()
+    clause_cache.clear()
+    with _model_lock:
+        _model_clients.clear()
+
 
 def generate_answer(
     query: str,
@@ -16,6 +54,8 @@ def generate_answer(
     *,
     model: str | None = None,
     threshold: float = 0.5,
+    query_embedding: Sequence[float] | None = None,
+    cache: AnswerCache | None = answer_cache,
 ) -> Dict[str, Any]:
     """Generate an answer with citations from retrieved contexts.
 
@@ -31,6 +71,12 @@ def generate_answer(
     threshold: float
         Minimum retrieval score required to attempt an answer. If all contexts
         fall below this score, the function refuses to answer.
+    query_embedding: Sequence[float]
+        Optional embedding of ``query``. When given, a paraphrase of an earlier
+        question over the same contexts can be served from the semantic tier
+        of the answer cache.
+    cache: AnswerCache
+        Cache consulted before prompting the model; ``None`` disables caching.
     """
 
     model = model or os.getenv("RAG_MODEL", "gemini-2.0-flash")
@@ -43,24 +89,22 @@ def generate_answer(
             "confidence": 0.0,
         }
 
-    context_lines = [
-        f"[{c['source_id']}:{c['page']}] {c['content']}" for c in contexts
-    ]
+    if cache is not None:
+        cached = cache.get(query, contexts, model, query_embedding)
+        if cached is not None:
+            # A defaulted confidence follows the scores of this retrieval.
+            cached.setdefault("confidence", float(best_score))
+            return cached
+
+    # Strip overlaps, merge neighbours and drop near-duplicates so the prompt
+    # fits the model's context budget without losing any citation tags.
+    packed = pack_contexts(contexts, model=model)
     prompt = ANSWER_WITH_CITATIONS.format(
-        question=query, context="\n".join(context_lines)
+        question=query, context="\n".join(packed.prompt_lines())
     )
 
-    if genai is None:  # pragma: no cover - runtime safeguard
-        raise RuntimeError("google-generativeai package not available")
+    gemini_model = _get_model_client(model)
 
-    # Configure Gemini API
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise RuntimeError("GEMINI_API_KEY environment variable is required")
-    
-    genai.configure(api_key=api_key)
-    gemini_model = genai.GenerativeModel(model)
-    
     # Generate response using Gemini
     response = gemini_model.generate_content(prompt)
     text: str = ""
@@ -69,9 +113,11 @@ def generate_answer(
     except Exception:  # pragma: no cover - fallback parsing
         text = str(response)
 
+    parsed = True
     try:
         data = json.loads(text)
     except Exception:
+        parsed = False
         data = {
             "answer": text,
             "citations": [],
@@ -103,7 +149,10 @@ def generate_answer(
                 break
         data["citations"] = citations
 
+    # A reply that was not JSON is not cached, so the next call retries it.
+    if cache is not None and parsed:
+        cache.put(query, contexts, model, data, query_embedding)
     data.setdefault("confidence", float(best_score))
     return data
 
-__all__ = ["generate_answer"]
+__all__ = ["answer_cache", "clear_caches", "generate_answer"]
@@ -13,15 +13,17 @@ In this commit we extend the API with several advanced features:
   forwarded to the underlying retrieval module.
 * **Export/reporting** – retrieval results can be exported as JSON or CSV.
 * **Analytics tracking** – basic in‑memory counters for each endpoint.
+* **Answer cache metrics** – hit rates of the two-tier answer cache.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from .analytics import tracker
+from .cache import answer_cache
 from .query import retrieve
 from .reporting import results_to_csv
 
@@ -110,6 +112,13 @@ async def rag_analytics() -> Dict[str, int]:
     return tracker.snapshot()
 
 
+@app.get("/rag/cache-stats")
+async def rag_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the generated-answer cache."""
+
+    return answer_cache.stats()
+
+
 @app.post("/rag/explain-finding", response_model=ExplainResponse)
 async def rag_explain(req: ExplainRequest) -> ExplainResponse:
     """Provide reasoning and citations for a finding."""
@@ -0,0 +1,282 @@
+"""Two-tier answer cache used in front of :func:`rag.generate_answer`.
+
+The first tier is an exact match on a hash of the normalised question, the
+context set and the model name.  The second tier is an approximate match on
+query-embedding similarity and is only consulted within the same context set,
+so a paraphrased question never returns an answer grounded in other sources.
+
+Context sets are fingerprinted from each context's ``source_id``, ``page`` and
+a hash of its ``content``; when the underlying chunks change the fingerprint
+changes and old entries simply stop matching.  :meth:`AnswerCache.invalidate`
+drops entries eagerly; :func:`rag.index.index_chunks` calls it for every
+contract whose chunks it upserts or deletes.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalise_question(question: str) -> str:
+    """Case-fold and collapse whitespace/punctuation in ``question``."""
+
+    text = _PUNCT_RE.sub(" ", question.casefold())
+    return _WS_RE.sub(" ", text).strip()
+
+
+def context_fingerprint(contexts: Sequence[Dict[str, Any]]) -> str:
+    """Return an order-independent hash identifying a set of contexts."""
+
+    parts = sorted(
+        "{}:{}:{}".format(
+            c.get("source_id"),
+            c.get("page"),
+            hashlib.sha256(str(c.get("content", "")).encode("utf-8")).hexdigest(),
+        )
+        for c in contexts
+    )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _unit(vector: Sequence[float]) -> Optional[Tuple[float, ...]]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return None
+    return tuple(v / norm for v in vector)
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    scope: str
+    sources: Set[str]
+    created: float
+    embedding: Optional[Tuple[float, ...]] = None
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for an :class:`AnswerCache`."""
+
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+@dataclass
+class AnswerCache:
+    """Thread-safe TTL/LRU cache of generated answers.
+
+    Parameters
+    ----------
+    max_entries:
+        Maximum number of cached answers; the least recently used entry is
+        evicted first.
+    ttl_seconds:
+        Entries older than this are treated as missing.  ``0`` disables expiry.
+    similarity_threshold:
+        Minimum cosine similarity between query embeddings for a semantic hit.
+    """
+
+    max_entries: int = 1024
+    ttl_seconds: float = 3600.0
+    similarity_threshold: float = 0.95
+    _entries: "OrderedDict[str, _Entry]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _by_scope: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False)
+    _by_source: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False)
+    _stats: CacheStats = field(default_factory=CacheStats, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    @staticmethod
+    def make_key(question: str, scope: str, model: str) -> str:
+        """Return the exact-match key for a question, context scope and model."""
+
+        raw = "\x1f".join((normalise_question(question), scope, model))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        question: str,
+        contexts: Sequence[Dict[str, Any]],
+        model: str,
+        query_embedding: Optional[Sequence[float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached answer or ``None`` on a miss."""
+
+        scope = context_fingerprint(contexts)
+        key = self.make_key(question, scope, model)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats.exact_hits += 1
+                return copy.deepcopy(entry.value)
+
+            if query_embedding is not None:
+                unit = _unit(query_embedding)
+                match = self._nearest(scope, model, unit, now) if unit else None
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self._stats.semantic_hits += 1
+                    return copy.deepcopy(self._entries[match].value)
+
+            self._stats.misses += 1
+            return None
+
+    def put(
+        self,
+        question: str,
+        contexts: Sequence[Dict[str, Any]],
+        model: str,
+        value: Dict[str, Any],
+        query_embedding: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Store ``value`` as the answer for ``question`` over ``contexts``."""
+
+        scope = context_fingerprint(contexts)
+        key = self.make_key(question, scope, model)
+        sources = {str(c.get("source_id")) for c in contexts}
+        sources.update(str(c["contract_id"]) for c in contexts if c.get("contract_id") is not None)
+        entry = _Entry(
+            value=copy.deepcopy(value),
+            scope=f"{model}\x1f{scope}",
+            sources=sources,
+            created=time.monotonic(),
+            embedding=_unit(query_embedding) if query_embedding is not None else None,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._by_scope.setdefault(entry.scope, set()).add(key)
+            for source in sources:
+                self._by_source.setdefault(source, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats.evictions += 1
+
+    def invalidate(self, source_id: str) -> int:
+        """Drop every answer grounded in ``source_id``; return the count.
+
+        ``source_id`` matches a context's ``source_id`` or its ``contract_id``.
+        """
+
+        with self._lock:
+            keys = list(self._by_source.get(str(source_id), ()))
+            for key in keys:
+                self._remove(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+
+        with self._lock:
+            self._entries.clear()
+            self._by_scope.clear()
+            self._by_source.clear()
+            self._stats = CacheStats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate metrics and the current size."""
+
+        with self._lock:
+            data = self._stats.as_dict()
+            data["size"] = len(self._entries)
+            return data
+
+    # ------------------------------------------------------------------
+    # internal helpers (callers must hold ``_lock``)
+
+    def _live(self, key: str, now: float) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl_seconds and now - entry.created > self.ttl_seconds:
+            self._remove(key)
+            self._stats.evictions += 1
+            return None
+        return entry
+
+    def _nearest(
+        self, scope: str, model: str, unit: Tuple[float, ...], now: float
+    ) -> Optional[str]:
+        best_key: Optional[str] = None
+        best_score = self.similarity_threshold
+        for key in list(self._by_scope.get(f"{model}\x1f{scope}", ())):
+            entry = self._live(key, now)
+            if entry is None or entry.embedding is None or len(entry.embedding) != len(unit):
+                continue
+            score = sum(a * b for a, b in zip(unit, entry.embedding))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        scoped = self._by_scope.get(entry.scope)
+        if scoped is not None:
+            scoped.discard(key)
+            if not scoped:
+                del self._by_scope[entry.scope]
+        for source in entry.sources:
+            keys = self._by_source.get(source)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_source[source]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# Module-level cache shared by ``rag.generate_answer``.
+answer_cache = AnswerCache(
+    max_entries=int(_env_float("RAG_ANSWER_CACHE_SIZE", 1024)),
+    ttl_seconds=_env_float("RAG_ANSWER_CACHE_TTL", 3600.0),
+    similarity_threshold=_env_float("RAG_SEMANTIC_CACHE_THRESHOLD", 0.95),
+)
+
+
+__all__ = [
+    "AnswerCache",
+    "CacheStats",
+    "answer_cache",
+    "context_fingerprint",
+    "normalise_question",
+]
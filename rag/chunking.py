@@ -0,0 +1,226 @@
+"""Sentence-aware, token-bounded chunking shared by the ingest paths.
+
+:func:`chunk_text` makes one regex pass over the document to find sentence
+and paragraph boundaries, counts the tokens of each segment once and then
+packs consecutive segments into chunks of at most ``max_tokens`` tokens,
+repeating up to ``overlap_tokens`` tokens of whole sentences at the start of
+the next chunk.  The whole process is linear in the length of the text.
+
+Chunks are :class:`Chunk` views holding ``(start, end)`` offsets into the
+source string; the substring is only materialised when ``.text`` is read.
+Page numbers are exact: they come from the page-break offsets (form feeds,
+or offsets supplied by the caller) rather than an average page length.
+
+With ``anchor_every`` set, sentences whose checksum is divisible by it are
+content-defined anchors: no chunk extends past an anchor, so an edit only
+changes the chunks around it and re-chunking an edited version reproduces
+every other chunk exactly.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from bisect import bisect_right
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .packing import count_tokens
+
+DEFAULT_MAX_TOKENS = 256
+DEFAULT_OVERLAP_TOKENS = 48
+
+PAGE_BREAK = "\f"
+
+# Segment separators (the captured whitespace): whitespace following sentence
+# punctuation when the next sentence starts with a capital, digit or opening
+# bracket/quote (so "e.g. the" stays together), paragraph breaks and page
+# breaks.  The pattern starts with literal characters so the scan stays fast.
+_BOUNDARY_RE = re.compile(
+    r"[.!?;:][\"')\]]*(\s+)(?=[A-Z0-9(\"'\[])|(\n[ \t]*\n\s*|\f\s*)"
+)
+_WORD_RE = re.compile(r"\S+")
+
+Section = Tuple[int, int, Optional[str]]
+
+
+class Chunk:
+    """A chunk of ``source`` addressed by character offsets."""
+
+    __slots__ = ("source", "start", "end", "page", "tokens", "section")
+
+    def __init__(self, source: str, start: int, end: int, page: int, tokens: int,
+                 section: Optional[str] = None):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.page = page
+        self.tokens = tokens
+        self.section = section
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return (f"Chunk(start={self.start}, end={self.end}, page={self.page}, "
+                f"tokens={self.tokens}, section={self.section!r})")
+
+
+def find_page_starts(text: str) -> List[int]:
+    """Return the offset at which each page of ``text`` starts.
+
+    Pages are separated by form feeds; text without any has a single page.
+    """
+
+    starts = [0]
+    pos = text.find(PAGE_BREAK)
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = text.find(PAGE_BREAK, pos + 1)
+    return starts
+
+
+def page_at(page_starts: Sequence[int], offset: int) -> int:
+    """Return the 1-based page containing ``offset``."""
+
+    return max(1, bisect_right(page_starts, offset))
+
+
+def _segments(
+    text: str,
+    start: int,
+    end: int,
+    max_tokens: int,
+    tokenizer: Callable[[str], int],
+    anchor_every: int = 0,
+) -> Tuple[List[int], List[int], List[int], List[bool]]:
+    """Split ``text[start:end]`` into sentence segments with token counts.
+
+    Segments longer than ``max_tokens`` are cut at whitespace so that every
+    segment fits a chunk on its own.
+    """
+
+    starts: List[int] = []
+    ends: List[int] = []
+    tokens: List[int] = []
+    anchors: List[bool] = []
+
+    def anchor(s: int, e: int) -> bool:
+        return bool(anchor_every) and zlib.crc32(text[s:e].encode("utf-8")) % anchor_every == 0
+
+    def add(s: int, e: int) -> None:
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s >= e:
+            return
+        n = tokenizer(text[s:e])
+        if n <= max_tokens:
+            starts.append(s)
+            ends.append(e)
+            tokens.append(n)
+            anchors.append(anchor(s, e))
+            return
+        # Over-long sentence: cut roughly every ``max_tokens`` tokens at a word.
+        words = [m.span() for m in _WORD_RE.finditer(text, s, e)]
+        step = max(1, len(words) * max_tokens // n)
+        for i in range(0, len(words), step):
+            piece = words[i:i + step]
+            ps, pe = piece[0][0], piece[-1][1]
+            starts.append(ps)
+            ends.append(pe)
+            tokens.append(tokenizer(text[ps:pe]))
+            anchors.append(anchor(ps, pe))
+
+    pos = start
+    for match in _BOUNDARY_RE.finditer(text, start, end):
+        add(pos, match.start(match.lastindex))
+        pos = match.end()
+    add(pos, end)
+    return starts, ends, tokens, anchors
+
+
+def chunk_text(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    page_starts: Optional[Sequence[int]] = None,
+    sections: Optional[Sequence[Section]] = None,
+    tokenizer: Callable[[str], int] = count_tokens,
+    anchor_every: int = 0,
+) -> List[Chunk]:
+    """Split ``text`` into token-bounded chunks that end on sentence boundaries.
+
+    Parameters
+    ----------
+    text:
+        Full document text.
+    max_tokens:
+        Upper bound on the tokens of each chunk.
+    overlap_tokens:
+        Up to this many tokens of whole trailing sentences of a chunk are
+        repeated at the start of the next one.
+    page_starts:
+        Sorted offsets at which pages start; found from form feeds in
+        ``text`` when omitted.
+    sections:
+        ``(start, end, title)`` spans to chunk independently.  Chunks never
+        cross a section and carry its title.  Defaults to the whole text.
+    tokenizer:
+        Function returning the token count of a string.
+    anchor_every:
+        End chunks before roughly one sentence in this many, chosen by
+        content, so chunk boundaries survive edits elsewhere (``0`` disables).
+    """
+
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be positive")
+    if page_starts is None:
+        page_starts = find_page_starts(text)
+    if sections is None:
+        sections = [(0, len(text), None)]
+
+    chunks: List[Chunk] = []
+    for sec_start, sec_end, title in sections:
+        starts, ends, tokens, anchors = _segments(
+            text, sec_start, sec_end, max_tokens, tokenizer, anchor_every
+        )
+        n = len(starts)
+        i = fresh = 0
+        while i < n:
+            # ``fresh`` is the first segment not in the previous chunk; only
+            # anchors after it end the chunk.
+            j = i
+            total = 0
+            while j < n and (j == i or (total + tokens[j] <= max_tokens
+                                        and (j == fresh or not anchors[j]))):
+                total += tokens[j]
+                j += 1
+            chunks.append(Chunk(text, starts[i], ends[j - 1],
+                                page_at(page_starts, starts[i]), total, title))
+            if j >= n:
+                break
+            # Step back over whole sentences for the overlap, always advancing.
+            k = j
+            carried = 0
+            while k - 1 > i and carried + tokens[k - 1] <= overlap_tokens:
+                carried += tokens[k - 1]
+                k -= 1
+            i, fresh = k, j
+    return chunks
+
+
+__all__ = [
+    "Chunk",
+    "DEFAULT_MAX_TOKENS",
+    "DEFAULT_OVERLAP_TOKENS",
+    "PAGE_BREAK",
+    "chunk_text",
+    "find_page_starts",
+    "page_at",
+]
@@ -0,0 +1,314 @@
+"""Cross-document cache of per-clause work keyed by normalised clause text.
+
+Contracts are largely assembled from standard clauses (SCCs, IDTA addenda,
+template sub-processor language), so the same text is embedded, checked and
+sent to an LLM over and over.  :class:`ClauseCache` stores the results of that
+work once per clause:
+
+* clauses are fingerprinted by SHA-256 of their case-folded,
+  whitespace-collapsed text, so layout differences do not matter;
+* each entry also carries a 64-bit SimHash of the clause's word shingles; a
+  lookup with ``near=True`` accepts a clause within a small Hamming distance
+  when there is no exact match;
+* entries are namespaced by ``kind`` (``"embedding"``, ``"rules"``,
+  ``"verdict"``, ...) and a caller-defined ``key`` such as the model name or
+  rule id, because a verdict for one rule says nothing about another.
+
+Entries live in SQLite.  The shared :data:`clause_cache` uses the file named
+by ``RAG_CLAUSE_CACHE_PATH`` when it is set, so worker processes share it and
+it survives restarts, and an in-memory database otherwise.  Either way the
+least recently used entries are evicted once there are more than
+``RAG_CLAUSE_CACHE_MAX_ENTRIES``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+SIMHASH_BITS = 64
+_BANDS = 8
+_BAND_BITS = SIMHASH_BITS // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_SHINGLE = 3
+
+# A near hit must differ in fewer bits than there are bands, so at least one
+# band of a near-duplicate is identical and the band indexes find it.
+DEFAULT_NEAR_DISTANCE = 6
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# After an eviction the cache is trimmed to this fraction of its bound, so
+# that evictions happen in batches rather than on every write.
+_TRIM_TO = 0.9
+
+
+def normalise_clause(text: str) -> str:
+    """Case-fold ``text`` and collapse runs of whitespace."""
+
+    return _WS_RE.sub(" ", text.casefold()).strip()
+
+
+def clause_fingerprint(text: str) -> str:
+    """Return the SHA-256 hex digest of the normalised clause."""
+
+    return hashlib.sha256(normalise_clause(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """Return a 64-bit SimHash over the word 3-shingles of ``text``."""
+
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) < _SHINGLE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(h: int) -> List[int]:
+    return [(h >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit.
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+@dataclass
+class ClauseCacheStats:
+    """Hit/miss counters for a :class:`ClauseCache`."""
+
+    hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "lookups": lookups,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
+
+
+class ClauseCache:
+    """Thread-safe, size-bounded SQLite-backed cache of per-clause results.
+
+    Parameters
+    ----------
+    path:
+        SQLite database path; ``":memory:"`` keeps the cache in-process.
+        ``None`` reads ``RAG_CLAUSE_CACHE_PATH`` when the cache is first used
+        and falls back to memory when it is unset.
+    near_distance:
+        Maximum SimHash Hamming distance accepted by ``near`` lookups.
+    max_entries:
+        Upper bound on the number of entries; ``None`` reads
+        ``RAG_CLAUSE_CACHE_MAX_ENTRIES`` when the cache is first used.
+    """
+
+    def __init__(self, path: Optional[str] = ":memory:",
+                 near_distance: int = DEFAULT_NEAR_DISTANCE,
+                 max_entries: Optional[int] = None):
+        if near_distance >= _BANDS:
+            raise ValueError(f"near_distance must be below {_BANDS}")
+        self.path = path
+        self.near_distance = near_distance
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._stats = ClauseCacheStats()
+        self._db: Optional[sqlite3.Connection] = None
+        self._count = 0
+
+    def get(self, kind: str, text: str, key: str = "", near: bool = False) -> Optional[Any]:
+        """Return the cached value for ``text`` or ``None`` on a miss."""
+
+        fp = clause_fingerprint(text)
+        with self._lock:
+            db = self._connection()
+            row = db.execute(
+                "SELECT rowid, value FROM clauses WHERE kind = ? AND key = ? AND fp = ?",
+                (kind, key, fp),
+            ).fetchone()
+            if row is None and near:
+                row = self._nearest(kind, key, simhash(text))
+                if row is not None:
+                    self._stats.near_hits += 1
+            elif row is not None:
+                self._stats.hits += 1
+            if row is None:
+                self._stats.misses += 1
+                return None
+            db.execute("UPDATE clauses SET accessed = ? WHERE rowid = ?", (time.time(), row[0]))
+            return json.loads(row[1])
+
+    def get_many(self, kind: str, texts: Sequence[str], key: str = "",
+                 near: bool = False) -> List[Optional[Any]]:
+        """Look up several clauses; misses are ``None``."""
+
+        return [self.get(kind, text, key, near=near) for text in texts]
+
+    def put(self, kind: str, text: str, value: Any, key: str = "") -> None:
+        """Store the JSON-serialisable ``value`` for ``text``."""
+
+        h = simhash(text)
+        fp = clause_fingerprint(text)
+        with self._lock:
+            db = self._connection()
+            old = db.execute(
+                "SELECT 1 FROM clauses WHERE kind = ? AND key = ? AND fp = ?", (kind, key, fp)
+            ).fetchone()
+            db.execute(
+                f"INSERT OR REPLACE INTO clauses VALUES ({', '.join('?' * (_BANDS + 6))})",
+                (kind, key, fp, _signed(h), *_bands(h), json.dumps(value), time.time()),
+            )
+            self._count += old is None
+            self._stats.writes += 1
+            if self._count > self.max_entries:
+                self._evict(int(self.max_entries * _TRIM_TO))
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+
+        with self._lock:
+            self._connection().execute("DELETE FROM clauses")
+            self._count = 0
+            self._stats = ClauseCacheStats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate metrics and the current size."""
+
+        with self._lock:
+            data = self._stats.as_dict()
+            data["size"] = self._connection().execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+            return data
+
+    # ------------------------------------------------------------------
+    # internal helpers (callers must hold ``_lock``)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is not None:
+            return self._db
+        if self.path is None:
+            self.path = os.getenv("RAG_CLAUSE_CACHE_PATH") or ":memory:"
+        if self.max_entries is None:
+            self.max_entries = int(os.getenv("RAG_CLAUSE_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA busy_timeout=5000")
+        band_columns = ", ".join(f"b{i} INTEGER NOT NULL" for i in range(_BANDS))
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS clauses (kind TEXT NOT NULL, key TEXT NOT NULL, "
+            f"fp TEXT NOT NULL, simhash INTEGER NOT NULL, {band_columns}, "
+            "value TEXT NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (kind, key, fp))"
+        )
+        for i in range(_BANDS):
+            db.execute(f"CREATE INDEX IF NOT EXISTS clauses_b{i} ON clauses (kind, key, b{i})")
+        db.execute("CREATE INDEX IF NOT EXISTS clauses_accessed ON clauses (accessed)")
+        self._count = db.execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+        self._db = db
+        return db
+
+    def _evict(self, target: int) -> None:
+        # Other processes sharing the file also write to it.
+        self._count = self._db.execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+        excess = self._count - target
+        if excess <= 0:
+            return
+        self._db.execute(
+            "DELETE FROM clauses WHERE rowid IN "
+            "(SELECT rowid FROM clauses ORDER BY accessed LIMIT ?)",
+            (excess,),
+        )
+        self._count = target
+        self._stats.evictions += excess
+
+    def _nearest(self, kind: str, key: str, h: int) -> Optional[Tuple[int, str]]:
+        rows = self._db.execute(
+            "SELECT rowid, simhash, value FROM clauses WHERE kind = ? AND key = ? AND ("
+            + " OR ".join(f"b{i} = ?" for i in range(_BANDS)) + ")",
+            (kind, key, *_bands(h)),
+        ).fetchall()
+        best = None
+        best_distance = self.near_distance + 1
+        for rowid, stored, value in rows:
+            distance = bin((stored & (1 << 64) - 1) ^ h).count("1")
+            if distance < best_distance:
+                best, best_distance = (rowid, value), distance
+        return best
+
+    def _reset(self) -> None:
+        # SQLite connections must not be shared with a forked child.
+        self._db = None
+        self._lock = Lock()
+
+
+EmbedFn = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+
+def cached_embed_fn(embed_fn: EmbedFn, model: str, cache: Optional[ClauseCache] = None) -> EmbedFn:
+    """Wrap a batch embedding function so only uncached clauses are embedded.
+
+    Parameters
+    ----------
+    embed_fn:
+        Async function embedding a list of texts in one call.
+    model:
+        Embedding model name; cached vectors are only reused for the same model.
+    cache:
+        Cache to use, :data:`clause_cache` by default.
+    """
+
+    async def embed(texts: List[str]) -> List[Sequence[float]]:
+        store = cache if cache is not None else clause_cache
+        vectors: List[Optional[Sequence[float]]] = store.get_many("embedding", texts, key=model)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fresh = await embed_fn([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vector = [float(v) for v in vector]
+                store.put("embedding", texts[i], vector, key=model)
+                vectors[i] = vector
+        return vectors  # type: ignore[return-value]
+
+    return embed
+
+
+# Module-level cache shared by the analysis pipelines; its path and bound are
+# read from the environment on first use.
+clause_cache = ClauseCache(path=None)
+os.register_at_fork(after_in_child=clause_cache._reset)
+
+
+__all__ = [
+    "ClauseCache",
+    "ClauseCacheStats",
+    "cached_embed_fn",
+    "clause_cache",
+    "clause_fingerprint",
+    "normalise_clause",
+    "simhash",
+]
@@ -0,0 +1,212 @@
+"""Streaming text extraction from DOCX files.
+
+python-docx builds the whole document object model before the first
+paragraph can be read, and its callers then concatenate text with ``+=``.
+:func:`iter_docx` instead iterparses ``word/document.xml`` straight from the
+zip archive and yields one :class:`DocxBlock` per paragraph, heading or
+table cell, in document order, with its offsets in the document text.
+Parsed elements are cleared as soon as their block is emitted, so memory
+stays bounded by the largest paragraph or table row rather than the file.
+
+The document text is the concatenation of ``block.text + block.sep``:
+paragraphs end with a newline, the cells of a table row are separated by
+tabs and the row ends with a newline.  Text of nested tables and text boxes
+is folded into the enclosing cell or paragraph.
+
+Headings are paragraphs whose style (from ``word/styles.xml``) is named
+"Heading n" or "Title" or carries an outline level, or that set an outline
+level directly.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import IO, Iterator, List, Optional, Set, Union
+from xml.etree import ElementTree as ET
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_BODY = _W + "body"
+_P = _W + "p"
+_R = _W + "r"
+_T = _W + "t"
+_TAB = _W + "tab"
+_BR = _W + "br"
+_CR = _W + "cr"
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+_PSTYLE = _W + "pStyle"
+_OUTLINE = _W + "outlineLvl"
+_STYLE = _W + "style"
+_NAME = _W + "name"
+_VAL = _W + "val"
+_STYLE_ID = _W + "styleId"
+
+Source = Union[str, "os.PathLike[str]", bytes, IO[bytes]]
+
+
+@dataclass
+class DocxBlock:
+    """A paragraph, heading or table cell of a DOCX document.
+
+    Attributes
+    ----------
+    kind:
+        ``"paragraph"``, ``"heading"`` or ``"cell"``.
+    text:
+        The block's text.
+    start, end:
+        Offsets of ``text`` in the document text.
+    sep:
+        Separator that follows the block in the document text.
+    """
+
+    kind: str
+    text: str
+    start: int
+    end: int
+    sep: str = "\n"
+
+
+def _open(source: Source) -> zipfile.ZipFile:
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return zipfile.ZipFile(source)
+
+
+def heading_styles(archive: zipfile.ZipFile) -> Set[str]:
+    """Return the ids of the paragraph styles that mark headings."""
+
+    try:
+        xml = archive.open("word/styles.xml")
+    except KeyError:
+        return set()
+    headings: Set[str] = set()
+    with xml:
+        for _, elem in ET.iterparse(xml):
+            if elem.tag != _STYLE:
+                continue
+            name = elem.find(_NAME)
+            label = (name.get(_VAL, "") if name is not None else "").lower()
+            if label.startswith("heading") or label == "title" or elem.find(f".//{_OUTLINE}") is not None:
+                headings.add(elem.get(_STYLE_ID, ""))
+            elem.clear()
+    return headings
+
+
+def iter_docx(source: Source) -> Iterator[DocxBlock]:
+    """Yield the blocks of a DOCX file in document order.
+
+    Parameters
+    ----------
+    source:
+        Path, bytes or binary file object of the ``.docx`` archive.
+    """
+
+    with _open(source) as archive:
+        headings = heading_styles(archive)
+        with archive.open("word/document.xml") as xml:
+            yield from _blocks(xml, headings)
+
+
+def _blocks(xml: IO[bytes], headings: Set[str]) -> Iterator[DocxBlock]:
+    pos = 0
+    body: Optional[ET.Element] = None
+    # Open paragraphs (text boxes nest paragraphs in runs) and table cells
+    paragraphs: List[List[str]] = []
+    styles: List[Optional[str]] = []
+    outlined: List[bool] = []
+    cells: List[List[str]] = []
+    row: List[str] = []
+    runs = tables = fallback = 0
+
+    for event, elem in ET.iterparse(xml, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _P:
+                paragraphs.append([])
+                styles.append(None)
+                outlined.append(False)
+            elif tag == _R:
+                runs += 1
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _TBL:
+                tables += 1
+            elif tag == _MC_FALLBACK:
+                fallback += 1
+            elif tag == _BODY:
+                body = elem
+            continue
+
+        if tag == _MC_FALLBACK:
+            # Fallback content repeats the preferred choice
+            fallback -= 1
+            elem.clear()
+            continue
+        if fallback:
+            continue
+        if tag == _T and runs:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB and runs:
+            paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR) and runs:
+            paragraphs[-1].append("\n")
+        elif tag == _R:
+            runs -= 1
+        elif tag == _PSTYLE and paragraphs:
+            styles[-1] = elem.get(_VAL)
+        elif tag == _OUTLINE and paragraphs:
+            outlined[-1] = True
+        elif tag == _P:
+            text = "".join(paragraphs.pop())
+            style, outline = styles.pop(), outlined.pop()
+            elem.clear()
+            if paragraphs:
+                paragraphs[-1].append("\n" + text)
+            elif cells:
+                cells[-1].append(text)
+            else:
+                kind = "heading" if outline or style in headings else "paragraph"
+                yield DocxBlock(kind, text, pos, pos + len(text))
+                pos += len(text) + 1
+        elif tag == _TC:
+            text = "\n".join(cells.pop())
+            elem.clear()
+            if cells:
+                cells[-1].append(text)
+            else:
+                row.append(text)
+        elif tag == _TR:
+            elem.clear()
+            if not cells:
+                for i, text in enumerate(row):
+                    sep = "\n" if i == len(row) - 1 else "\t"
+                    yield DocxBlock("cell", text, pos, pos + len(text), sep)
+                    pos += len(text) + 1
+                row = []
+        elif tag == _TBL:
+            tables -= 1
+
+        # Drop finished top-level blocks so the tree never grows
+        if body is not None and tag in (_P, _TBL) and not paragraphs and not cells and not tables:
+            body.clear()
+
+
+def docx_text(source: Source) -> str:
+    """Return the text of a DOCX file, paragraphs and table rows one per line."""
+
+    return "".join(part for block in iter_docx(source) for part in (block.text, block.sep))
+
+
+__all__ = [
+    "DocxBlock",
+    "docx_text",
+    "heading_styles",
+    "iter_docx",
+]
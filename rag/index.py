@@ -1,3 +1,395 @@
-def index_documents(docs: list[str]) -> dict:
-    # Stub for PR#22 – no external deps; CI-safe.
-    return {"indexed": len(docs)}
+"""Bulk, incremental indexer for the Chroma stores read by :mod:`rag.query`.
+
+The input is the JSONL written by ``apps.ingest.cli`` (one ``ContractChunk``
+per line).  Chunks are streamed, compared against a manifest of
+``(chunk_id, content_hash)`` pairs and only new or changed chunks are
+upserted, ``batch_size`` at a time, with one embedding call per batch.
+Chunks of a re-ingested contract that no longer occur are deleted; with
+``prune_missing`` so are contracts absent from the input, which must then
+hold every contract (as ``apps.ingest.cli`` writes it).  Answers cached in
+:data:`rag.answer_cache` for a contract whose chunks change are invalidated.
+
+A chunk whose id is unknown but whose contract already has an indexed chunk
+with the same content hash is treated as unchanged, so re-runs stay cheap
+even when ingest assigns fresh ids.
+
+The manifest is a SQLite file next to the Chroma store and is updated after
+every batch, so an interrupted run resumes where it stopped.
+
+Usage: python -m rag.index chunks.jsonl [--db data/contracts] [--collection contracts]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import chromadb
+except Exception:  # pragma: no cover - chromadb optional for linting
+    chromadb = None  # type: ignore
+
+from .cache import AnswerCache, answer_cache
+
+DEFAULT_BATCH_SIZE = 512
+MANIFEST_NAME = "index_manifest.sqlite3"
+
+# Chunk fields stored as Chroma metadata; ``source`` is what ``rag.query`` reports.
+_METADATA_FIELDS = ("contract_id", "section", "page", "tokens")
+
+EmbedFn = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def content_hash(chunk: Dict[str, Any]) -> str:
+    """Return the SHA-256 of a chunk's text and indexed metadata."""
+
+    payload = json.dumps([chunk.get("text", "")] + [chunk.get(f) for f in _METADATA_FIELDS],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_chunks(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream chunk dicts from an ``apps.ingest`` JSONL file."""
+
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+class IndexManifest:
+    """SQLite record of the chunks indexed in each collection.
+
+    Parameters
+    ----------
+    path:
+        SQLite database path; ``":memory:"`` keeps the manifest in-process.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (collection TEXT NOT NULL, chunk_id TEXT NOT NULL, "
+            "contract_id TEXT, content_hash TEXT NOT NULL, indexed REAL NOT NULL, "
+            "PRIMARY KEY (collection, chunk_id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_contract ON chunks (collection, contract_id)")
+
+    def for_contract(self, collection: str, contract_id: Optional[str]) -> Dict[str, str]:
+        """Return ``{chunk_id: content_hash}`` for one contract."""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT chunk_id, content_hash FROM chunks WHERE collection = ? AND contract_id IS ?",
+                (collection, contract_id),
+            ).fetchall()
+        return dict(rows)
+
+    def record(self, collection: str, entries: Sequence[Tuple[str, Optional[str], str]]) -> None:
+        """Store ``(chunk_id, contract_id, content_hash)`` entries in one transaction."""
+
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                [(collection, chunk_id, contract_id, digest, now) for chunk_id, contract_id, digest in entries],
+            )
+            self._db.execute("COMMIT")
+
+    def contracts(self, collection: str) -> Set[Optional[str]]:
+        """Return the contract ids with indexed chunks in ``collection``."""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT contract_id FROM chunks WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def forget(self, collection: str, chunk_ids: Sequence[str]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM chunks WHERE collection = ? AND chunk_id = ?",
+                [(collection, chunk_id) for chunk_id in chunk_ids],
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+@dataclass
+class IndexStats:
+    """Counters reported by :func:`index_chunks`."""
+
+    documents: int = 0
+    chunks: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "indexed": self.upserted,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "documents_per_second": self.documents / self.seconds if self.seconds else 0.0,
+            "chunks_per_second": self.chunks / self.seconds if self.seconds else 0.0,
+        }
+
+
+def open_collection(db_path: str, name: str) -> Any:
+    """Return the Chroma collection ``name`` at ``db_path``, creating it if needed."""
+
+    if chromadb is None:  # pragma: no cover - runtime safeguard
+        raise RuntimeError("chromadb package not available")
+    client = chromadb.PersistentClient(path=db_path)
+    return client.get_or_create_collection(name)
+
+
+def _metadata(chunk: Dict[str, Any], digest: str) -> Dict[str, Any]:
+    # Chroma metadata values must be scalars; ``None`` is not allowed.
+    meta = {f: chunk[f] for f in _METADATA_FIELDS if chunk.get(f) is not None}
+    meta["source"] = chunk.get("source") or chunk.get("contract_id") or chunk["id"]
+    meta["content_hash"] = digest
+    return meta
+
+
+def index_chunks(
+    chunks: Iterable[Dict[str, Any]],
+    collection: Any,
+    manifest: IndexManifest,
+    *,
+    collection_name: str = "contracts",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embed_fn: Optional[EmbedFn] = None,
+    prune: bool = True,
+    prune_missing: bool = False,
+    cache: Optional[AnswerCache] = answer_cache,
+) -> IndexStats:
+    """Upsert new and changed chunks into ``collection``.
+
+    Parameters
+    ----------
+    chunks:
+        Chunk dicts with ``id``, ``contract_id``, ``text`` and optionally
+        ``section``, ``page`` and ``tokens``.  Chunks of different contracts
+        may be interleaved.
+    collection:
+        Chroma collection (anything with ``upsert`` and ``delete``).
+    manifest:
+        Record of what is already indexed.
+    collection_name:
+        Namespace of the collection in the manifest.
+    batch_size:
+        Chunks per upsert and per embedding call.
+    embed_fn:
+        Batch embedding function.  When omitted the collection's own
+        embedding function embeds each batch, which keeps index and query
+        embeddings consistent for :func:`rag.query.retrieve`.
+    prune:
+        Delete indexed chunks of the contracts seen that no longer occur
+        (chunks without a ``contract_id`` are never pruned).
+    prune_missing:
+        Also delete every indexed contract that does not occur in
+        ``chunks``.  Only for input holding the full set of contracts.
+    cache:
+        Answer cache whose answers grounded in a contract with upserted or
+        deleted chunks are invalidated; ``None`` leaves it alone.
+    """
+
+    stats = IndexStats()
+    start = time.perf_counter()
+    seen: Dict[Optional[str], Set[str]] = {}
+    pending: List[Tuple[Dict[str, Any], str]] = []
+    touched: Set[Optional[str]] = set()
+
+    def flush() -> None:
+        if not pending:
+            return
+        ids = [chunk["id"] for chunk, _ in pending]
+        documents = [chunk["text"] for chunk, _ in pending]
+        kwargs: Dict[str, Any] = {
+            "ids": ids,
+            "documents": documents,
+            "metadatas": [_metadata(chunk, digest) for chunk, digest in pending],
+        }
+        if embed_fn is not None:
+            kwargs["embeddings"] = [list(map(float, v)) for v in embed_fn(documents)]
+        collection.upsert(**kwargs)
+        manifest.record(collection_name, [(c["id"], c.get("contract_id"), d) for c, d in pending])
+        touched.update(c.get("contract_id") for c, _ in pending)
+        stats.upserted += len(pending)
+        stats.batches += 1
+        pending.clear()
+
+    # contract_id -> (indexed {chunk_id: hash}, {hash: [chunk_id]}), read
+    # from the manifest when the contract's first chunk arrives.
+    known: Dict[Optional[str], Tuple[Dict[str, str], Dict[str, List[str]]]] = {}
+    for chunk in chunks:
+        contract_id = chunk.get("contract_id")
+        if contract_id not in known:
+            stats.documents += 1
+            seen[contract_id] = set()
+            indexed = manifest.for_contract(collection_name, contract_id)
+            by_hash: Dict[str, List[str]] = {}
+            for chunk_id, digest in indexed.items():
+                by_hash.setdefault(digest, []).append(chunk_id)
+            known[contract_id] = (indexed, by_hash)
+        claimed = seen[contract_id]
+        indexed, by_hash = known[contract_id]
+
+        stats.chunks += 1
+        digest = content_hash(chunk)
+        if indexed.get(chunk["id"]) == digest and chunk["id"] not in claimed:
+            claimed.add(chunk["id"])
+            stats.unchanged += 1
+            continue
+        # Same content under another id: keep the indexed copy.
+        twin = next((i for i in by_hash.get(digest, ()) if i not in claimed), None)
+        if twin is not None and chunk["id"] not in indexed:
+            claimed.add(twin)
+            stats.unchanged += 1
+            continue
+        claimed.add(chunk["id"])
+        pending.append((chunk, digest))
+        if len(pending) >= batch_size:
+            flush()
+    flush()
+
+    def delete(contract_id: Optional[str], stale: List[str]) -> None:
+        if stale:
+            touched.add(contract_id)
+        for offset in range(0, len(stale), batch_size):
+            batch = stale[offset:offset + batch_size]
+            collection.delete(ids=batch)
+            manifest.forget(collection_name, batch)
+        stats.deleted += len(stale)
+
+    if prune:
+        for contract_id, claimed in seen.items():
+            if contract_id is None:
+                continue
+            delete(contract_id, [i for i in manifest.for_contract(collection_name, contract_id)
+                                 if i not in claimed])
+    if prune_missing:
+        for contract_id in manifest.contracts(collection_name) - seen.keys():
+            if contract_id is not None:
+                delete(contract_id, list(manifest.for_contract(collection_name, contract_id)))
+    if cache is not None:
+        for contract_id in touched - {None}:
+            cache.invalidate(contract_id)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _as_chunk(doc: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(doc, str):
+        return {"id": "doc_" + hashlib.sha1(doc.encode("utf-8")).hexdigest()[:16], "contract_id": None, "text": doc}
+    return doc
+
+
+def index_documents(
+    docs: Iterable[Union[str, Dict[str, Any]]],
+    *,
+    db_path: Optional[str] = None,
+    collection: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    embed_fn: Optional[EmbedFn] = None,
+    prune: bool = True,
+    prune_missing: bool = False,
+) -> Dict[str, Any]:
+    """Index raw texts or ``apps.ingest`` chunk dicts into a Chroma store.
+
+    Parameters
+    ----------
+    docs:
+        Chunk dicts (see :func:`index_chunks`) or plain strings, which are
+        given content-derived ids.
+    db_path, collection:
+        Chroma store and collection; default to ``CONTRACTS_DB_PATH`` and
+        ``CONTRACTS_COLLECTION`` as used by :func:`rag.query.retrieve`.
+    manifest_path:
+        Manifest database, ``index_manifest.sqlite3`` inside ``db_path`` by default.
+    batch_size, embed_fn, prune, prune_missing:
+        As for :func:`index_chunks`.
+
+    Returns
+    -------
+    dict
+        Throughput statistics; ``indexed`` is the number of chunks upserted.
+    """
+
+    db_path = db_path or os.getenv("CONTRACTS_DB_PATH", "data/contracts")
+    collection = collection or os.getenv("CONTRACTS_COLLECTION", "contracts")
+    os.makedirs(db_path, exist_ok=True)
+    manifest = IndexManifest(manifest_path or os.path.join(db_path, MANIFEST_NAME))
+    stats = index_chunks(
+        (_as_chunk(doc) for doc in docs),
+        open_collection(db_path, collection),
+        manifest,
+        collection_name=collection,
+        batch_size=batch_size,
+        embed_fn=embed_fn,
+        prune=prune,
+        prune_missing=prune_missing,
+    )
+    return stats.as_dict()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser(description="Index ingested contract chunks into a Chroma store")
+    parser.add_argument("jsonl", help="JSONL written by apps.ingest.cli")
+    parser.add_argument("--db", default=None, help="Chroma store path (default: $CONTRACTS_DB_PATH)")
+    parser.add_argument("--collection", default=None, help="Collection name (default: $CONTRACTS_COLLECTION)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--no-prune", action="store_true", help="Keep chunks that no longer occur")
+    parser.add_argument("--prune-missing", action="store_true",
+                        help="Delete contracts absent from the JSONL (it must hold every contract)")
+    args = parser.parse_args(argv)
+
+    stats = index_documents(
+        read_chunks(args.jsonl),
+        db_path=args.db,
+        collection=args.collection,
+        batch_size=args.batch_size,
+        prune=not args.no_prune,
+        prune_missing=args.prune_missing,
+    )
+    print(json.dumps(stats, indent=2))
+
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "IndexManifest",
+    "IndexStats",
+    "content_hash",
+    "index_chunks",
+    "index_documents",
+    "open_collection",
+    "read_chunks",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - manual use
+    main()
+
@@ -0,0 +1,178 @@
+"""Vectorised grouping of PDF words into lines.
+
+pdfplumber returns one dict per word.  :func:`group_lines` loads the word
+boxes into a :class:`WordTable` of NumPy columns and segments it into lines
+in a few array operations:
+
+* words are ordered (reading order, or by ``top`` then ``x0``);
+* a line starts wherever ``top`` jumps by more than ``tolerance`` from the
+  previous word (sort-and-diff);
+* line bounding boxes are ``minimum``/``maximum.reduceat`` over the columns.
+
+The result is a :class:`LineSpans`: the page text with one line per row
+and arrays of line offsets and boxes into it, rather than a list of
+per-line objects.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class WordTable:
+    """Words as NumPy columns over one string.
+
+    Attributes
+    ----------
+    text:
+        The words joined by single spaces, in table order.
+    x0, x1, top, bottom:
+        Word box columns.
+    start, end:
+        Offsets of each word in ``text``.
+    """
+
+    text: str
+    x0: np.ndarray
+    x1: np.ndarray
+    top: np.ndarray
+    bottom: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def from_words(cls, words: Sequence[Dict[str, Any]], order: Optional[np.ndarray] = None) -> "WordTable":
+        """Build a table from pdfplumber word dicts, optionally reordered."""
+
+        boxes = _boxes(words)
+        if order is None:
+            order = np.arange(len(words))
+        texts = list(map(_word_text, words))
+        return cls._build([texts[i] for i in order.tolist()], boxes[order])
+
+    @classmethod
+    def _build(cls, texts: List[str], boxes: np.ndarray) -> "WordTable":
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        start = np.cumsum(lengths + 1) - (lengths + 1)
+        return cls(" ".join(texts), boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3],
+                   start, start + lengths)
+
+
+@dataclass
+class LineSpans:
+    """Lines of a page as arrays over its text.
+
+    Attributes
+    ----------
+    text:
+        Line texts joined by ``"\\n"``.
+    start, end:
+        Offsets of each line in ``text``.
+    bbox:
+        ``(n, 4)`` array of ``(x0, top, x1, bottom)`` per line.
+    words:
+        The words in line order; ``words.start`` are offsets in ``text`` too.
+    """
+
+    text: str
+    start: np.ndarray
+    end: np.ndarray
+    bbox: np.ndarray
+    words: WordTable
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def line(self, i: int) -> str:
+        return self.text[self.start[i]:self.end[i]]
+
+    def __iter__(self) -> Iterator[Tuple[str, BBox]]:
+        """Yield ``(line text, bbox)`` pairs."""
+
+        for s, e, box in zip(self.start.tolist(), self.end.tolist(), self.bbox.tolist()):
+            yield self.text[s:e], tuple(box)
+
+
+_box_columns = itemgetter("x0", "x1", "top", "bottom")
+_word_text = itemgetter("text")
+
+
+def _boxes(words: Sequence[Dict[str, Any]]) -> np.ndarray:
+    if not words:
+        return np.zeros((0, 4))
+    flat = chain.from_iterable(map(_box_columns, words))
+    return np.fromiter(flat, dtype=np.float64, count=4 * len(words)).reshape(-1, 4)
+
+
+def _line_starts(top: np.ndarray, tolerance: float) -> np.ndarray:
+    return np.concatenate(([0], np.flatnonzero(np.abs(np.diff(top)) > tolerance) + 1))
+
+
+def group_lines(words: Sequence[Dict[str, Any]], tolerance: float = 3.0, sort: bool = False) -> LineSpans:
+    """Group pdfplumber words into lines.
+
+    Parameters
+    ----------
+    words:
+        Word dicts with ``text``, ``x0``, ``x1``, ``top`` and ``bottom``.
+    tolerance:
+        Largest vertical step between consecutive words of one line.
+    sort:
+        Order words by ``top`` and then ``x0`` instead of keeping their
+        reading order; words of each line are then ordered left to right.
+
+    Returns
+    -------
+    LineSpans
+    """
+
+    boxes = _boxes(words)
+    if not len(boxes):
+        empty = np.zeros(0, dtype=np.int64)
+        return LineSpans("", empty, empty, np.zeros((0, 4)), WordTable._build([], boxes))
+
+    if sort:
+        order = np.lexsort((boxes[:, 0], boxes[:, 2]))
+        line_of = np.zeros(len(order), dtype=np.int64)
+        line_of[_line_starts(boxes[order, 2], tolerance)[1:]] = 1
+        line_of = np.cumsum(line_of)
+        order = order[np.lexsort((boxes[order, 0], line_of))]
+    else:
+        order = np.arange(len(words))
+    boxes = boxes[order]
+    first = _line_starts(boxes[:, 2], tolerance)
+    last = np.concatenate((first[1:], [len(order)])) - 1
+
+    texts = list(map(_word_text, words))
+    if sort:
+        texts = [texts[i] for i in order.tolist()]
+    table = WordTable._build(texts, boxes)
+    # Lines are the same words with "\n" in place of the space between them,
+    # so the word offsets hold in the page text as well.
+    starts, ends = table.start[first], table.end[last]
+    text = "\n".join(map(table.text.__getitem__, map(slice, starts.tolist(), ends.tolist())))
+    bbox = np.column_stack((
+        np.minimum.reduceat(table.x0, first),
+        np.minimum.reduceat(table.top, first),
+        np.maximum.reduceat(table.x1, first),
+        np.maximum.reduceat(table.bottom, first),
+    ))
+    return LineSpans(text, starts, ends, bbox, table)
+
+
+__all__ = [
+    "LineSpans",
+    "WordTable",
+    "group_lines",
+]
@@ -0,0 +1,195 @@
+"""Disk-backed cache of OCR results keyed by the rendered page bitmap.
+
+Scanned exhibits, signature pages and standard schedules recur across
+contracts and across retries.  :class:`OCRCache` stores the OCR output of a
+page under a hash of its 8-bit greyscale bitmap together with the OCR mode,
+language and Tesseract config, so a repeated page costs a hash and a lookup.
+
+The key is a content hash rather than a perceptual one: two different pages
+of body text look alike to a perceptual hash, and returning another page's
+text would be silently wrong.  Re-rendering the same PDF page at the same
+resolution reproduces the bitmap exactly, which is the case that matters.
+
+Entries live in SQLite (``OCR_CACHE_PATH``, ``data/ocr_cache.sqlite3`` under
+the working directory by default; ``off`` disables the cache) and the least
+recently used ones are evicted once the stored results, counted across every
+process sharing the file, exceed ``OCR_CACHE_MAX_BYTES``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# After an eviction the cache is trimmed to this fraction of its budget, so
+# that evictions happen in batches rather than on every write.
+_TRIM_TO = 0.9
+
+
+def page_key(array: np.ndarray, mode: str, lang: str, config: str) -> str:
+    """Return the cache key of an 8-bit greyscale page bitmap and OCR settings."""
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((array.shape, mode, lang, config)).encode("utf-8"))
+    digest.update(np.ascontiguousarray(array, dtype=np.uint8).data)
+    return digest.hexdigest()
+
+
+@dataclass
+class OCRCacheStats:
+    """Hit/miss counters for an :class:`OCRCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "lookups": lookups,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class OCRCache:
+    """Thread-safe, size-bounded SQLite cache of per-page OCR results.
+
+    Parameters
+    ----------
+    path:
+        SQLite database path; ``":memory:"`` keeps the cache in-process.
+    max_bytes:
+        Upper bound on the total size of the stored results.
+    """
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = DEFAULT_MAX_BYTES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = OCRCacheStats()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for ``key`` or ``None`` on a miss."""
+
+        with self._lock:
+            row = self._db.execute("SELECT value FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+            self._db.execute("UPDATE pages SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._stats.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store the JSON-serialisable OCR ``value`` under ``key``."""
+
+        payload = json.dumps(value)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # Several processes write to the file, so the total is re-read
+            # inside the write transaction rather than tracked per process.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                                 (key, payload, size, time.time()))
+                self._stats.writes += 1
+                total = self._total_bytes()
+                if total > self.max_bytes:
+                    self._evict(total, int(self.max_bytes * _TRIM_TO))
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _evict(self, total: int, target: int) -> None:
+        rows = self._db.execute("SELECT key, size FROM pages ORDER BY accessed").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM pages WHERE key = ?", evicted)
+        self._stats.evictions += len(evicted)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+
+        with self._lock:
+            self._db.execute("DELETE FROM pages")
+            self._stats = OCRCacheStats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate metrics and the current size."""
+
+        with self._lock:
+            data = self._stats.as_dict()
+            data["entries"] = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            data["bytes"] = self._total_bytes()
+            return data
+
+
+_cache: Optional[OCRCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """Return the process-wide :class:`OCRCache`, or ``None`` when disabled."""
+
+    global _cache
+    path = os.getenv("OCR_CACHE_PATH", os.path.join("data", "ocr_cache.sqlite3"))
+    if path.lower() in {"off", "none", "false", "0"}:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRCache(path, int(os.getenv("OCR_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))))
+        return _cache
+
+
+def _reset_after_fork() -> None:
+    # SQLite connections must not be shared with a forked child.
+    global _cache, _cache_lock
+    _cache = None
+    _cache_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+__all__ = [
+    "OCRCache",
+    "OCRCacheStats",
+    "get_ocr_cache",
+    "page_key",
+]
@@ -0,0 +1,332 @@
+"""Persistent pool of Tesseract workers shared by the OCR paths.
+
+``pytesseract`` starts a new ``tesseract`` process for every call, and every
+process reloads the language data.  :class:`OCRPool` instead keeps one
+long-lived worker process per core, each holding a :class:`TesseractEngine`
+that is loaded once:
+
+* with ``tesserocr`` installed the engine wraps the C API and the model stays
+  in memory between pages;
+* otherwise it falls back to ``pytesseract`` inside the worker, which still
+  parallelises pages across cores.
+
+Page images are converted to 8-bit greyscale and handed to the workers
+through :mod:`multiprocessing.shared_memory`, so a 300 DPI page is copied
+once rather than pickled.  Calls return futures; ``a``-prefixed coroutines
+wrap them for FastAPI handlers and the blocking methods suit Celery tasks.
+Inside daemonic processes (Celery's prefork workers), which may not start
+children, the pool runs the engine in-process instead.
+
+Results are looked up in and stored to an :class:`~rag.ocr_cache.OCRCache`
+keyed by the page bitmap, so a repeated page is not OCR'd again.
+
+Set ``OCR_WORKERS`` to size the pool and ``OCR_LANG`` for the default language.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .ocr_cache import OCRCache, get_ocr_cache, page_key
+
+try:
+    import tesserocr  # type: ignore
+except Exception:  # pragma: no cover - tesserocr is optional
+    tesserocr = None  # type: ignore
+
+try:
+    import pytesseract  # type: ignore
+except Exception:  # pragma: no cover - pytesseract is optional
+    pytesseract = None  # type: ignore
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover - Pillow is optional for linting
+    Image = None  # type: ignore
+
+DEFAULT_LANG = os.getenv("OCR_LANG", "eng")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+
+# Keys of the ``image_to_data`` result, as in ``pytesseract.Output.DICT``
+DATA_KEYS = ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")
+
+_PSM_RE = re.compile(r"--psm\s+(\d+)")
+
+
+class TesseractEngine:
+    """A Tesseract instance loaded once and reused for many pages.
+
+    ``tesserocr`` APIs are not thread-safe, so calls on one engine are
+    serialised; in-process pools run pages on several threads.
+
+    Parameters
+    ----------
+    lang:
+        Tesseract language code(s), e.g. ``"eng"`` or ``"eng+fra"``.
+    """
+
+    def __init__(self, lang: str = DEFAULT_LANG):
+        self.lang = lang
+        self._api = None
+        self._lock = threading.Lock()
+        if tesserocr is not None:
+            self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        elif pytesseract is None:
+            raise RuntimeError("OCR requires tesserocr or pytesseract")
+
+    def _set_image(self, image: Any, config: str) -> None:
+        match = _PSM_RE.search(config or "")
+        self._api.SetPageSegMode(int(match.group(1)) if match else tesserocr.PSM.AUTO)
+        self._api.SetImage(image)
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        if self._api is None:
+            return pytesseract.image_to_string(image, lang=self.lang, config=config)
+        with self._lock:
+            self._set_image(image, config)
+            return self._api.GetUTF8Text()
+
+    def image_to_data(self, image: Any, config: str = "") -> Dict[str, List[Any]]:
+        """Return word boxes and confidences in ``pytesseract``'s dict layout."""
+
+        if self._api is None:
+            data = pytesseract.image_to_data(image, lang=self.lang, config=config,
+                                             output_type=pytesseract.Output.DICT)
+            return {key: list(data[key]) for key in DATA_KEYS}
+
+        with self._lock:
+            self._set_image(image, config)
+            self._api.Recognize()
+            data: Dict[str, List[Any]] = {key: [] for key in DATA_KEYS}
+            level = tesserocr.RIL.WORD
+            block = par = line = 0
+            for word in tesserocr.iterate_level(self._api.GetIterator(), level):
+                if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block, par = block + 1, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                box = word.BoundingBox(level)
+                if box is None:
+                    continue
+                x0, y0, x1, y1 = box
+                for key, value in zip(DATA_KEYS, (word.GetUTF8Text(level) or "", word.Confidence(level),
+                                                  x0, y0, x1 - x0, y1 - y0, block, par, line)):
+                    data[key].append(value)
+        return data
+
+
+# Engines of the current process, one per language.
+_engines: Dict[str, TesseractEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def _engine(lang: str) -> TesseractEngine:
+    with _engines_lock:
+        engine = _engines.get(lang)
+        if engine is None:
+            engine = _engines[lang] = TesseractEngine(lang)
+        return engine
+
+
+def _run(image: Any, mode: str, lang: str, config: str) -> Any:
+    engine = _engine(lang)
+    if mode == "data":
+        return engine.image_to_data(image, config)
+    return engine.image_to_string(image, config)
+
+
+def _tesseract_cmd() -> Optional[str]:
+    return pytesseract.pytesseract.tesseract_cmd if pytesseract is not None else None
+
+
+def _set_tesseract_cmd(cmd: Optional[str]) -> None:
+    # Spawned workers start with pytesseract's default command, and forked
+    # ones keep the command of when they started.
+    if cmd and pytesseract is not None:
+        pytesseract.pytesseract.tesseract_cmd = cmd
+
+
+def _init_worker(lang: str, tesseract_cmd: Optional[str] = None) -> None:
+    _set_tesseract_cmd(tesseract_cmd)
+    _engine(lang)
+
+
+def _run_shared(name: str, shape: Tuple[int, ...], mode: str, lang: str, config: str,
+                tesseract_cmd: Optional[str] = None) -> Any:
+    # Workers share the parent's resource tracker, so attaching does not
+    # take ownership; the parent unlinks the block when the future completes.
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        image = Image.fromarray(np.ndarray(shape, dtype=np.uint8, buffer=shm.buf).copy())
+    finally:
+        shm.close()
+    _set_tesseract_cmd(tesseract_cmd)
+    return _run(image, mode, lang, config)
+
+
+class OCRPool:
+    """Pool of persistent OCR worker processes.
+
+    Parameters
+    ----------
+    workers:
+        Number of worker processes (``OCR_WORKERS`` or the CPU count).
+    lang:
+        Default Tesseract language.
+    cache:
+        Cache of results by page bitmap and settings; ``None`` disables it.
+    """
+
+    def __init__(self, workers: Optional[int] = None, lang: str = DEFAULT_LANG,
+                 cache: Optional[OCRCache] = None):
+        self.workers = workers or OCR_WORKERS
+        self.lang = lang
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def in_process(self) -> bool:
+        # Daemonic processes (e.g. Celery prefork children) may not have
+        # children of their own; they already run one per core.
+        return self.workers <= 1 or multiprocessing.current_process().daemon
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker,
+                    initargs=(self.lang, _tesseract_cmd()),
+                )
+            return self._executor
+
+    def submit(self, image: Any, mode: str = "string", config: str = "",
+               lang: Optional[str] = None) -> "Future[Any]":
+        """Queue one page image; ``mode`` is ``"string"`` or ``"data"``."""
+
+        lang = lang or self.lang
+        future: "Future[Any]" = Future()
+        array = key = None
+        if self.cache is not None or not self.in_process:
+            array = np.asarray(image.convert("L"), dtype=np.uint8)
+        if self.cache is not None:
+            key = page_key(array, mode, lang, config)
+            cached = self.cache.get(key)
+            if cached is not None:
+                future.set_result(cached)
+                return future
+
+        if self.in_process:
+            try:
+                future.set_result(_run(image, mode, lang, config))
+            except Exception as exc:
+                future.set_exception(exc)
+        else:
+            future = self._submit_shared(array, mode, lang, config)
+        if key is not None:
+            future.add_done_callback(lambda done: self._store(key, done))
+        return future
+
+    def _submit_shared(self, array: np.ndarray, mode: str, lang: str, config: str) -> "Future[Any]":
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=np.uint8, buffer=shm.buf)[...] = array
+
+        def release(_: Any) -> None:
+            shm.close()
+            shm.unlink()
+
+        try:
+            future = self._get_executor().submit(_run_shared, shm.name, array.shape, mode, lang, config,
+                                                 _tesseract_cmd())
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        return future
+
+    def _store(self, key: str, future: "Future[Any]") -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    def image_to_string(self, image: Any, config: str = "", lang: Optional[str] = None) -> str:
+        return self.submit(image, "string", config, lang).result()
+
+    def image_to_data(self, image: Any, config: str = "", lang: Optional[str] = None) -> Dict[str, List[Any]]:
+        return self.submit(image, "data", config, lang).result()
+
+    def map_strings(self, images: Iterable[Any], config: str = "", lang: Optional[str] = None) -> List[str]:
+        """OCR several pages in parallel, returning their text in order."""
+
+        futures = [self.submit(image, "string", config, lang) for image in images]
+        return [future.result() for future in futures]
+
+    async def _asubmit(self, image: Any, mode: str, config: str, lang: Optional[str]) -> Any:
+        if self.in_process:
+            # Keep the event loop free while the engine runs.
+            return await asyncio.to_thread(lambda: self.submit(image, mode, config, lang).result())
+        return await asyncio.wrap_future(self.submit(image, mode, config, lang))
+
+    async def aimage_to_string(self, image: Any, config: str = "", lang: Optional[str] = None) -> str:
+        return await self._asubmit(image, "string", config, lang)
+
+    async def aimage_to_data(self, image: Any, config: str = "",
+                             lang: Optional[str] = None) -> Dict[str, List[Any]]:
+        return await self._asubmit(image, "data", config, lang)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_pool: Optional[OCRPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OCRPool:
+    """Return the process-wide :class:`OCRPool`, creating it on first use."""
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OCRPool(cache=get_ocr_cache())
+        return _pool
+
+
+def _reset_after_fork() -> None:
+    # A forked child must not reuse the parent's executor or engines.
+    global _pool, _pool_lock, _engines_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+    _engines.clear()
+    _engines_lock = threading.Lock()
+
+
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(_close_pool)
+
+
+__all__ = [
+    "DATA_KEYS",
+    "OCRPool",
+    "TesseractEngine",
+    "get_ocr_pool",
+]
@@ -0,0 +1,334 @@
+"""Token-budgeted packing of retrieved contexts into a prompt.
+
+Retrieved chunks overlap (``RAGStore.chunk_text`` uses a 200-character
+overlap), neighbouring chunks of the same page are often retrieved together
+and boilerplate is repeated across documents.  :func:`pack_contexts` turns a
+list of scored contexts into a smaller, non-redundant list that fits a
+per-model token budget:
+
+1. token counts come from a fast local tokenizer (``tiktoken`` when installed,
+   otherwise a regex word/punctuation split);
+2. text a passage shares with the previous passage of the same source is
+   stripped;
+3. adjacent passages from the same ``(source_id, page)`` are merged;
+4. near-identical passages are collapsed, keeping every citation tag;
+5. passages are added by descending score until the budget is spent.
+
+No citation is lost: a passage absorbed by a duplicate keeps its tag in
+:attr:`PackedContext.aliases`.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover - tiktoken is optional
+    tiktoken = None  # type: ignore
+
+# Context token budgets per model.  These leave head-room for the prompt
+# template, the question and the generated answer.
+MODEL_TOKEN_BUDGETS: Dict[str, int] = {
+    "gemini-2.0-flash": 8000,
+    "gemini-1.5-flash": 8000,
+    "gemini-1.5-pro": 16000,
+    "gpt-4o": 8000,
+    "gpt-4": 4000,
+    "llama3.1:8b": 3000,
+}
+DEFAULT_TOKEN_BUDGET = 3000
+
+DUPLICATE_THRESHOLD = 0.9
+_MIN_OVERLAP = 20
+_OVERLAP_PROBE = 32
+_SHINGLE = 3
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+
+_encoder: Any = None
+
+
+def _get_encoder() -> Any:
+    global _encoder
+    if _encoder is None and tiktoken is not None:
+        try:
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # pragma: no cover - encoding files unavailable
+            _encoder = False
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens in ``text`` using the local tokenizer."""
+
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of ``text`` containing at most ``max_tokens``."""
+
+    if max_tokens <= 0:
+        return ""
+    encoder = _get_encoder()
+    if encoder is not None:
+        ids = encoder.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else encoder.decode(ids[:max_tokens])
+    for i, match in enumerate(_TOKEN_RE.finditer(text)):
+        if i == max_tokens:
+            return text[: match.start()].rstrip()
+    return text
+
+
+def token_budget(model: Optional[str] = None) -> int:
+    """Return the context token budget for ``model``.
+
+    ``RAG_CONTEXT_TOKEN_BUDGET`` overrides the per-model table.
+    """
+
+    override = os.getenv("RAG_CONTEXT_TOKEN_BUDGET")
+    if override:
+        try:
+            return int(override)
+        except ValueError:
+            pass
+    return MODEL_TOKEN_BUDGETS.get(model or "", DEFAULT_TOKEN_BUDGET)
+
+
+@dataclass
+class PackedContext:
+    """A context passage selected for the prompt."""
+
+    source_id: Any
+    page: Any
+    content: str
+    score: float = 0.0
+    tokens: int = 0
+    start: Optional[int] = None
+    end: Optional[int] = None
+    aliases: List[Tuple[Any, Any]] = field(default_factory=list)
+
+    @property
+    def tag(self) -> str:
+        """Citation tags for the prompt, e.g. ``[A:1][B:3]``."""
+
+        keys = [(self.source_id, self.page)] + self.aliases
+        return "".join(f"[{s}:{p}]" for s, p in keys)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "source_id": self.source_id,
+            "page": self.page,
+            "content": self.content,
+            "score": self.score,
+            "aliases": list(self.aliases),
+        }
+
+
+@dataclass
+class PackResult:
+    """Outcome of :func:`pack_contexts`."""
+
+    contexts: List[PackedContext]
+    total_tokens: int
+    input_tokens: int
+    budget: int
+    dropped: int = 0
+
+    def prompt_lines(self) -> List[str]:
+        return [f"{c.tag} {c.content}" for c in self.contexts]
+
+
+def _overlap_length(prev: str, nxt: str) -> int:
+    """Length of the longest suffix of ``prev`` that is a prefix of ``nxt``."""
+
+    probe = nxt[:_OVERLAP_PROBE]
+    if len(probe) < _MIN_OVERLAP:
+        return 0
+    window_start = max(0, len(prev) - len(nxt))
+    idx = prev.find(probe, window_start)
+    while idx != -1:
+        tail = prev[idx:]
+        if nxt.startswith(tail):
+            return len(tail)
+        idx = prev.find(probe, idx + 1)
+    return 0
+
+
+def _shingles(text: str) -> frozenset:
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) < _SHINGLE:
+        return frozenset([" ".join(words)])
+    return frozenset(
+        " ".join(words[i : i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)
+    )
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _coerce(contexts: Iterable[Dict[str, Any]]) -> List[PackedContext]:
+    packed = []
+    for c in contexts:
+        packed.append(
+            PackedContext(
+                source_id=c.get("source_id"),
+                page=c.get("page"),
+                content=str(c.get("content", "")),
+                score=float(c.get("score", 0.0) or 0.0),
+                start=c.get("start"),
+                end=c.get("end"),
+            )
+        )
+    return packed
+
+
+def _strip_and_merge(passages: List[PackedContext]) -> List[PackedContext]:
+    """Strip overlaps between consecutive passages of a source and merge
+    passages that continue each other on the same page."""
+
+    by_source: Dict[Any, List[PackedContext]] = {}
+    order: List[Any] = []
+    for p in passages:
+        if p.source_id not in by_source:
+            order.append(p.source_id)
+        by_source.setdefault(p.source_id, []).append(p)
+
+    result: List[PackedContext] = []
+    for source in order:
+        group = by_source[source]
+        if all(p.start is not None for p in group):
+            group.sort(key=lambda p: p.start)
+        merged: List[PackedContext] = []
+        for p in group:
+            if not merged:
+                merged.append(p)
+                continue
+            prev = merged[-1]
+            overlap = _overlap_length(prev.content, p.content)
+            touching = overlap > 0 or (
+                prev.end is not None and p.start is not None and p.start <= prev.end
+            )
+            if overlap:
+                p.content = p.content[overlap:].lstrip()
+            if not p.content:
+                prev.score = max(prev.score, p.score)
+                continue
+            if touching and prev.page == p.page:
+                sep = "" if overlap else " "
+                prev.content = f"{prev.content}{sep}{p.content}"
+                prev.score = max(prev.score, p.score)
+                prev.end = p.end if p.end is not None else prev.end
+                continue
+            merged.append(p)
+        result.extend(merged)
+    return result
+
+
+def _deduplicate(
+    passages: List[PackedContext], threshold: float
+) -> Tuple[List[PackedContext], int]:
+    """Collapse near-identical passages into the highest-scoring one."""
+
+    kept: List[Tuple[PackedContext, frozenset]] = []
+    collapsed = 0
+    for p in sorted(passages, key=lambda p: p.score, reverse=True):
+        sig = _shingles(p.content)
+        for other, other_sig in kept:
+            if _jaccard(sig, other_sig) >= threshold:
+                key = (p.source_id, p.page)
+                if key != (other.source_id, other.page) and key not in other.aliases:
+                    other.aliases.append(key)
+                other.aliases.extend(a for a in p.aliases if a not in other.aliases)
+                collapsed += 1
+                break
+        else:
+            kept.append((p, sig))
+    return [p for p, _ in kept], collapsed
+
+
+def pack_contexts(
+    contexts: Sequence[Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    budget: Optional[int] = None,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD,
+    tokenizer: Callable[[str], int] = count_tokens,
+) -> PackResult:
+    """Pack ``contexts`` into a non-redundant list within a token budget.
+
+    Parameters
+    ----------
+    contexts:
+        Dicts with ``source_id``, ``page``, ``content`` and optionally
+        ``score`` plus character offsets ``start``/``end`` within the source.
+    model:
+        Model name used to look up the budget in :data:`MODEL_TOKEN_BUDGETS`.
+    budget:
+        Explicit token budget; overrides ``model``.
+    duplicate_threshold:
+        Shingle Jaccard similarity above which passages are considered
+        near-identical.
+    tokenizer:
+        Callable returning the token count of a string.
+
+    Returns
+    -------
+    PackResult
+        Selected passages in descending score order.
+    """
+
+    limit = budget if budget is not None else token_budget(model)
+    passages = _coerce(contexts)
+    input_tokens = sum(tokenizer(p.content) for p in passages)
+
+    passages = _strip_and_merge(passages)
+    passages, collapsed = _deduplicate(passages, duplicate_threshold)
+
+    selected: List[PackedContext] = []
+    used = 0
+    dropped = collapsed
+    for p in passages:
+        p.tokens = tokenizer(p.content)
+        remaining = limit - used
+        if p.tokens <= remaining:
+            selected.append(p)
+            used += p.tokens
+        elif not selected and remaining > 0:
+            # Always keep the best passage, trimmed to fit.
+            p.content = truncate_to_tokens(p.content, remaining)
+            p.tokens = tokenizer(p.content)
+            selected.append(p)
+            used += p.tokens
+        else:
+            dropped += 1
+
+    return PackResult(
+        contexts=selected,
+        total_tokens=used,
+        input_tokens=input_tokens,
+        budget=limit,
+        dropped=dropped,
+    )
+
+
+__all__ = [
+    "DEFAULT_TOKEN_BUDGET",
+    "MODEL_TOKEN_BUDGETS",
+    "PackResult",
+    "PackedContext",
+    "count_tokens",
+    "pack_contexts",
+    "token_budget",
+    "truncate_to_tokens",
+]
@@ -0,0 +1,220 @@
+"""Cheap per-page "text or scanned" classification of PDFs.
+
+The extraction paths used to decide whether a page needs OCR by extracting
+its text and checking ``len(text.strip()) < 50``.  That runs full layout
+analysis on every text page (which is then extracted a second time) and
+misses scanned pages that carry a short text header.
+
+:func:`classify_pdf` instead reads signals straight from each page's
+content stream and resources, without layout analysis:
+
+* the characters shown by text operators inside ``BT``/``ET`` blocks;
+* the fonts in the page resources (no font, no extractable text);
+* the images drawn with ``cm ... Do`` or inline (``BI ... ID ... EI``) and
+  the fraction of the page they cover.
+
+A page with little text and an image is ``"scanned"``; one whose text is
+short next to a large image (a header over a scanned body) is ``"mixed"``;
+both need OCR.  So does a page that shows no text but draws something no
+image was found for (an image in a deeply nested form, say): only a page
+whose content stream is empty is ``"blank"``.  Large documents are classified in parallel, a range of
+pages per worker process.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from pypdf import PdfReader
+
+# Pages with fewer shown characters than this hold no useful text layer
+MIN_TEXT_CHARS = 50
+# Pages whose images cover at least this fraction of the page and whose
+# text is shorter than ``MIXED_MAX_CHARS`` are OCR'd despite the text.
+IMAGE_COVERAGE = 0.5
+MIXED_MAX_CHARS = 500
+# Documents with fewer pages are classified in the calling process.
+PARALLEL_MIN_PAGES = 64
+
+# Form XObjects nested deeper than this are not inspected.
+_MAX_FORM_DEPTH = 2
+
+_TEXT_BLOCK_RE = re.compile(rb"\bBT\b(.*?)\bET\b", re.S)
+_LITERAL_RE = re.compile(rb"\((?:\\.|[^\\()])*\)", re.S)
+_HEX_RE = re.compile(rb"<([0-9A-Fa-f\s]*)>")
+_NUM = rb"([-+]?(?:\d+\.?\d*|\.\d+))"
+_MATRIX = rb"\s+".join([_NUM] * 6) + rb"\s+cm\s*"
+_DRAW_RE = re.compile(_MATRIX + rb"/([^\s/\[\]()<>{}%]+)\s+Do\b")
+# An inline image, with the matrix that usually precedes it
+_INLINE_RE = re.compile(rb"(?:" + _MATRIX + rb")?\bBI\s")
+
+
+@dataclass
+class PageClass:
+    """Signals and classification of one PDF page.
+
+    Attributes
+    ----------
+    page_num:
+        1-based page number.
+    kind:
+        ``"text"``, ``"scanned"``, ``"mixed"`` or ``"blank"``.
+    char_count:
+        Characters shown by the page's text operators.
+    font_count:
+        Fonts in the page (and form XObject) resources.
+    image_count:
+        Image XObjects in the page resources and inline images.
+    image_coverage:
+        Fraction of the page area covered by drawn images, capped at 1.
+    """
+
+    page_num: int
+    kind: str
+    char_count: int = 0
+    font_count: int = 0
+    image_count: int = 0
+    image_coverage: float = 0.0
+
+    @property
+    def needs_ocr(self) -> bool:
+        return self.kind in ("scanned", "mixed")
+
+
+def _resource(resources: Any, name: str) -> Any:
+    value = resources.get(name) if resources is not None else None
+    return value.get_object() if value is not None else {}
+
+
+def _shown_chars(stream: bytes) -> int:
+    chars = 0
+    for block in _TEXT_BLOCK_RE.finditer(stream):
+        body = block.group(1)
+        for literal in _LITERAL_RE.finditer(body):
+            chars += len(literal.group()) - 2 - literal.group().count(b"\\")
+        for hexstr in _HEX_RE.finditer(body):
+            chars += len(re.sub(rb"\s", b"", hexstr.group(1))) // 2
+    return chars
+
+
+def _scan(stream: bytes, resources: Any, depth: int = 0) -> Tuple[int, int, int, List[Tuple[str, float]]]:
+    """Return ``(chars, fonts, images, [(image name, drawn area)])`` of a stream."""
+
+    chars = _shown_chars(stream)
+    fonts = len(_resource(resources, "/Font"))
+    xobjects = _resource(resources, "/XObject")
+    images = 0
+    image_names = set()
+    for name, ref in xobjects.items():
+        xobject = ref.get_object()
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            images += 1
+            image_names.add(name[1:])
+        elif subtype == "/Form" and depth < _MAX_FORM_DEPTH:
+            sub = _scan(xobject.get_data(), xobject.get("/Resources"), depth + 1)
+            chars += sub[0]
+            fonts += sub[1]
+            images += sub[2]
+    draws = []
+    for match in _DRAW_RE.finditer(stream):
+        name = match.group(7).decode("latin-1")
+        if name in image_names:
+            draws.append((name, _area(match)))
+    for match in _INLINE_RE.finditer(stream):
+        images += 1
+        if match.group(1) is not None:
+            draws.append(("inline", _area(match)))
+    return chars, fonts, images, draws
+
+
+def _area(match: "re.Match[bytes]") -> float:
+    """Area of the unit square under the ``cm`` matrix of ``match``."""
+
+    a, b, c, d = (float(match.group(i)) for i in range(1, 5))
+    return abs(a * d - b * c)
+
+
+def classify_page(page: Any, page_num: int) -> PageClass:
+    """Classify one :mod:`pypdf` page."""
+
+    contents = page.get_contents()
+    stream = contents.get_data() if contents is not None else b""
+    chars, fonts, images, draws = _scan(stream, page.get("/Resources"))
+    if fonts == 0:
+        chars = 0
+
+    box = page.mediabox
+    area = float(box.width) * float(box.height)
+    coverage = min(1.0, sum(drawn for _, drawn in draws) / area) if area > 0 else 0.0
+
+    if chars < MIN_TEXT_CHARS:
+        if images or (chars == 0 and stream.strip()):
+            kind = "scanned"
+        else:
+            kind = "blank" if chars == 0 else "text"
+    elif coverage >= IMAGE_COVERAGE and chars < MIXED_MAX_CHARS:
+        kind = "mixed"
+    else:
+        kind = "text"
+    return PageClass(page_num, kind, chars, fonts, images, round(coverage, 4))
+
+
+def _classify_range(data: bytes, start: int, stop: int) -> List[PageClass]:
+    reader = PdfReader(io.BytesIO(data))
+    return [classify_page(reader.pages[i], i + 1) for i in range(start, stop)]
+
+
+def _ranges(pages: int, workers: int) -> Iterable[Tuple[int, int]]:
+    size = math.ceil(pages / workers)
+    return ((start, min(pages, start + size)) for start in range(0, pages, size))
+
+
+def classify_pdf(source: Union[str, bytes], workers: Optional[int] = None) -> List[PageClass]:
+    """Classify every page of a PDF.
+
+    Parameters
+    ----------
+    source:
+        PDF path or bytes.
+    workers:
+        Worker processes for documents of at least ``PARALLEL_MIN_PAGES``
+        pages; defaults to the CPU count.
+
+    Returns
+    -------
+    list of PageClass
+        One entry per page, in page order.
+    """
+
+    if not isinstance(source, (bytes, bytearray)):
+        with open(source, "rb") as f:
+            source = f.read()
+    data = bytes(source)
+    reader = PdfReader(io.BytesIO(data))
+    pages = len(reader.pages)
+    workers = workers or os.cpu_count() or 1
+    # Daemonic processes (e.g. Celery prefork children) may not start workers.
+    if pages < PARALLEL_MIN_PAGES or workers <= 1 or multiprocessing.current_process().daemon:
+        return [classify_page(page, num) for num, page in enumerate(reader.pages, 1)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_classify_range, data, start, stop) for start, stop in _ranges(pages, workers)]
+        return [page for future in futures for page in future.result()]
+
+
+__all__ = [
+    "IMAGE_COVERAGE",
+    "MIN_TEXT_CHARS",
+    "MIXED_MAX_CHARS",
+    "PageClass",
+    "classify_page",
+    "classify_pdf",
+]
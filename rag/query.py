@@ -1,6 +1,7 @@
 import os
 import json
-from typing import List, Dict, Optional
+import hashlib
+from typing import Any, List, Dict, Optional
 
 try:
     import chromadb
@@ -50,13 +51,17 @@ def _query_collection(db_path: str, collection_name: str, query: str, n_results:
 
 
 def _rrf(result_sets: List[List[Dict]], top_k: int) -> List[Dict]:
-    """Fuse rankings using reciprocal rank fusion and deduplicate by source."""
+    """Fuse rankings using reciprocal rank fusion and deduplicate by chunk.
+
+    Results are keyed by chunk ``id``; ``source`` names the contract or
+    authority document, which many chunks share.
+    """
     scores: Dict[str, float] = {}
     best_meta: Dict[str, Dict] = {}
 
     for results in result_sets:
         for item in results:
-            key = item["source"]
+            key = item.get("id") or item["source"]
             score = 1.0 / (RRF_K + item["rank"])
             scores[key] = scores.get(key, 0.0) + score
             if key not in best_meta or item["rank"] < best_meta[key]["rank"]:
@@ -66,7 +71,8 @@ def _rrf(result_sets: List[List[Dict]], top_k: int) -> List[Dict]:
     for key, score in scores.items():
         meta = best_meta[key]
         fused.append({
-            "source": key,
+            "id": meta.get("id"),
+            "source": meta["source"],
             "text": meta.get("text"),
             "score": score,
             "page": meta.get("page"),
@@ -78,9 +84,28 @@ def _rrf(result_sets: List[List[Dict]], top_k: int) -> List[Dict]:
     return fused[:top_k]
 
 
+def _rerank_key(text: str) -> str:
+    """Key a passage in the reranker's score cache.
+
+    Scores depend only on the query and the passage, and chunk ids survive a
+    re-index with new text, so the key is a hash of the text itself.
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _rerank(query: str, results: List[Dict], reranker: Any, top_n: int) -> List[Dict]:
+    """Re-score fused results with a cross-encoder style ``reranker``."""
+    candidates = [(_rerank_key(item.get("text") or ""), item.get("text") or "", item) for item in results]
+    reranked = []
+    for item, score in reranker.rerank(query, candidates, top_n=top_n):
+        reranked.append({**item, "rerank_score": score})
+    return reranked
+
+
 def retrieve(query: str, k_contracts: int = 4, k_authority: int = 6,
              contract_id: Optional[str] = None, ruleset: Optional[str] = None,
-             severity: Optional[str] = None) -> Dict:
+             severity: Optional[str] = None, reranker: Any = None,
+             rerank_top_n: Optional[int] = None, overfetch: int = 3) -> Dict:
     """Retrieve contexts for a query from contract and authority stores.
 
     Parameters
@@ -93,6 +118,15 @@ def retrieve(query: str, k_contracts: int = 4, k_authority: int = 6,
         Number of authority contexts to retrieve.
     contract_id, ruleset, severity: Optional[str]
         Filters applied to the underlying vector stores.
+    reranker: optional
+        Object with ``rerank(query, [(id, text, payload)], top_n)``, e.g. the
+        backend ``CrossEncoderReranker``. When given, ``overfetch`` times more
+        candidates are retrieved and only the best ``rerank_top_n`` are kept.
+    rerank_top_n: Optional[int]
+        Results to keep after re-ranking (defaults to ``k_contracts +
+        k_authority``).
+    overfetch: int
+        Candidate multiplier used when re-ranking.
 
     Returns
     -------
@@ -113,12 +147,17 @@ def retrieve(query: str, k_contracts: int = 4, k_authority: int = 6,
     authority_path = os.getenv("AUTHORITY_DB_PATH", "data/authority")
     authority_collection = os.getenv("AUTHORITY_COLLECTION", "authority")
 
+    factor = max(1, overfetch) if reranker is not None else 1
     contract_results = _query_collection(contracts_path, contracts_collection,
-                                         query, k_contracts, filters)
+                                         query, k_contracts * factor, filters)
     authority_results = _query_collection(authority_path, authority_collection,
-                                          query, k_authority, filters)
+                                          query, k_authority * factor, filters)
 
-    fused = _rrf([contract_results, authority_results], k_contracts + k_authority)
+    fused = _rrf([contract_results, authority_results],
+                 (k_contracts + k_authority) * factor)
+    if reranker is not None:
+        fused = _rerank(query, fused, reranker,
+                        rerank_top_n or (k_contracts + k_authority))
     return {"query": query, "results": fused}
 
 
@@ -0,0 +1,61 @@
+"""Throughput benchmark for the shared sentence-aware chunker.
+
+Chunks a synthetic contract of ``n_pages`` pages (form-feed separated) with
+``rag.chunking.chunk_text`` and, for comparison, with the legacy
+character-window chunker that ``RAGStore`` falls back to.
+
+Usage: python scripts/benchmark_chunking.py [n_pages]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from backend.app.services.rag_store import RAGStore  # noqa: E402
+from rag.chunking import PAGE_BREAK, chunk_text  # noqa: E402
+
+_WORDS = (
+    "the supplier shall process personal data only on documented instructions "
+    "from the controller including with regard to transfers unless required by law"
+).split()
+
+
+def _make_contract(n_pages: int, rng: random.Random) -> str:
+    pages = []
+    for page in range(n_pages):
+        paragraphs = []
+        for clause in range(6):
+            sentences = [
+                " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 30))).capitalize() + "."
+                for _ in range(rng.randint(2, 5))
+            ]
+            paragraphs.append(f"{page + 1}.{clause + 1} " + " ".join(sentences))
+        pages.append("\n\n".join(paragraphs))
+    return PAGE_BREAK.join(pages)
+
+
+def benchmark(n_pages: int = 500, repeats: int = 3) -> None:
+    text = _make_contract(n_pages, random.Random(0))
+    print(f"{n_pages} pages, {len(text) / 1e6:.2f}M characters")
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = chunk_text(text)
+        best = min(best, time.perf_counter() - start)
+    print(f"{'shared chunker':<18}{len(chunks):>8} chunks{best * 1000:>10.1f} ms"
+          f"  pages {chunks[0].page}-{chunks[-1].page}")
+
+    best = float("inf")
+    for _ in range(repeats):
+        store = RAGStore()
+        start = time.perf_counter()
+        legacy = store._chunk_by_characters(text, "bench")
+        best = min(best, time.perf_counter() - start)
+    print(f"{'legacy windows':<18}{len(legacy):>8} chunks{best * 1000:>10.1f} ms"
+          f"  pages {legacy[0].page}-{legacy[-1].page} (estimated)")
+
+
+if __name__ == "__main__":
+    benchmark(*[int(a) for a in sys.argv[1:2]])
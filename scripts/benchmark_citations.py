@@ -0,0 +1,90 @@
+"""Citation extraction and validation benchmark for ``src/backend``.
+
+Builds a synthetic judgment of ``size_mb`` megabytes: long sentences of
+prose with UK case, statute and EU case citations every few sentences.
+Times ``extract_citations`` against the three pattern scans it replaced
+(``re.finditer`` over the public ``*_PATTERN`` strings), then times
+``validate_citations`` against a linear scan of ``n_sources`` known
+sources, using the citations found.
+
+Usage: python scripts/benchmark_citations.py [size_mb] [n_sources]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.backend.app.core.citations import (  # noqa: E402
+    EU_CASE_PATTERN, UK_CASE_PATTERN, UK_STATUTE_PATTERN, extract_citations, validate_citations,
+)
+
+WORDS = ("the", "court", "held", "that", "supplier", "shall", "duty", "of", "care", "was", "owed", "to",
+         "claimant", "in", "respect", "contract", "and", "reasonable", "notice", "termination", "whether")
+PARTIES = ("Smith", "Jones", "Caparo Industries", "Dickman", "Donoghue", "Stevenson", "Miller", "Hadley",
+           "Baxendale", "Photo Production", "Securicor", "Robinson", "Chief Constable")
+
+
+def _judgment(size: int, rng: random.Random) -> str:
+    parts, length = [], 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))).capitalize()
+        kind = rng.randrange(6)
+        if kind == 0:
+            a, b = rng.sample(PARTIES, 2)
+            sentence += f" in {a} v {b} [{rng.randint(1990, 2024)}] UKSC {rng.randint(1, 60)}, para {rng.randint(1, 99)}"
+        elif kind == 1:
+            sentence += f" under the Data Protection Act 2018, s. {rng.randint(1, 215)}"
+        elif kind == 2:
+            a, b = rng.sample(PARTIES, 2)
+            sentence += f" following Case C-{rng.randint(1, 999)}/{rng.randint(10, 24)} {a} v {b}"
+        parts.append(sentence + ". ")
+        length += len(parts[-1])
+    return "".join(parts)
+
+
+def _pattern_scan(text: str) -> int:
+    return sum(1 for pattern in (UK_CASE_PATTERN, UK_STATUTE_PATTERN, EU_CASE_PATTERN)
+               for _ in re.finditer(pattern, text))
+
+
+def _linear_validate(citations, sources) -> int:
+    return sum(1 for c in citations
+               if any(c.case_id.lower() in s["title"].lower() for s in sources))
+
+
+def benchmark(size_mb: float = 1.0, n_sources: int = 5000) -> None:
+    rng = random.Random(0)
+    text = _judgment(int(size_mb * 1024 * 1024), rng)
+    print(f"{len(text) / 1024 / 1024:.2f} MB judgment")
+
+    start = time.perf_counter()
+    citations = extract_citations(text)
+    elapsed = time.perf_counter() - start
+    print(f"{'pivot scanner':<24}{elapsed * 1000:>12.1f} ms  {len(citations)} citations")
+
+    start = time.perf_counter()
+    found = _pattern_scan(text)
+    elapsed = time.perf_counter() - start
+    print(f"{'pattern scans':<24}{elapsed * 1000:>12.1f} ms  {found} citations")
+
+    sources = [{"id": f"src-{i}", "title": f"{rng.choice(PARTIES)} {i} v {rng.choice(PARTIES)} [2020] UKSC {i}"}
+               for i in range(n_sources)]
+    sources += [{"id": f"case-{a}-{b}", "title": f"{a} v {b}"} for a in PARTIES for b in PARTIES if a != b]
+    sources.append({"id": "dpa", "title": "Data Protection Act 2018"})
+    sample = citations[:2000]
+
+    start = time.perf_counter()
+    valid = sum(v["valid"] for v in validate_citations(sample, sources))
+    elapsed = time.perf_counter() - start
+    print(f"{'indexed validation':<24}{elapsed * 1000:>12.1f} ms  {valid}/{len(sample)} valid")
+
+    start = time.perf_counter()
+    valid = _linear_validate(sample, sources)
+    elapsed = time.perf_counter() - start
+    print(f"{'linear validation':<24}{elapsed * 1000:>12.1f} ms  {valid}/{len(sample)} valid")
+
+
+if __name__ == "__main__":
+    benchmark(*(float(arg) for arg in sys.argv[1:2]), *(int(arg) for arg in sys.argv[2:3]))
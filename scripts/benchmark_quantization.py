@@ -0,0 +1,69 @@
+"""Recall/latency benchmark for quantized RAGStore retrieval.
+
+Compares exact float32 search with the int8 and product-quantized first pass
+(re-ranked against exact vectors in a memory-mapped file) on synthetic
+clustered embeddings.
+
+Usage: python scripts/benchmark_quantization.py [n_chunks] [dim] [n_queries]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from backend.app.services.rag_store import RAGStore, TextChunk  # noqa: E402
+
+
+def _make_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.normal(size=(max(1, n // 50), dim))
+    assign = rng.integers(0, len(centres), size=n)
+    return (centres[assign] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _build_store(vectors: np.ndarray) -> RAGStore:
+    store = RAGStore(embedding_dim=vectors.shape[1])
+    chunks = [
+        TextChunk(id=f"c{i}", doc_id=f"d{i // 100}", text="", start_pos=i, end_pos=i)
+        for i in range(len(vectors))
+    ]
+    for chunk in chunks:
+        store._add_chunk(chunk)
+    store.embed_chunks(chunks, vectors)
+    return store
+
+
+def _run(store: RAGStore, queries: np.ndarray, top_k: int):
+    start = time.perf_counter()
+    results = [
+        [chunk.id for chunk, _ in store.retrieve_similar(q, top_k=top_k)] for q in queries
+    ]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def benchmark(n_chunks: int = 20000, dim: int = 768, n_queries: int = 50, top_k: int = 10) -> None:
+    rng = np.random.default_rng(0)
+    vectors = _make_vectors(n_chunks, dim, rng)
+    queries = vectors[rng.choice(n_chunks, n_queries, replace=False)] + 0.1 * rng.normal(size=(n_queries, dim))
+
+    exact_store = _build_store(vectors)
+    exact, exact_latency = _run(exact_store, queries, top_k)
+    print(f"{'mode':<8}{'recall@' + str(top_k):>12}{'ms/query':>12}{'MB in RAM':>12}")
+    print(f"{'float32':<8}{1.0:>12.3f}{exact_latency * 1000:>12.2f}"
+          f"{exact_store.memory_usage() / 2**20:>12.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in ("int8", "pq"):
+            store = _build_store(vectors)
+            store.enable_quantization(kind, mmap_path=os.path.join(tmp, f"{kind}.f32"))
+            results, latency = _run(store, queries, top_k)
+            recall = np.mean([len(set(a) & set(b)) / top_k for a, b in zip(results, exact)])
+            print(f"{kind:<8}{recall:>12.3f}{latency * 1000:>12.2f}"
+                  f"{store.memory_usage() / 2**20:>12.1f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    benchmark(*args)
@@ -23,21 +23,25 @@ def _mock_genai():
         return FakeGeminiModel()
 
     os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+    rag.clear_caches()
     if hasattr(rag, "genai") and rag.genai is not None:
         rag.genai.configure = lambda api_key: None  # type: ignore
         rag.genai.GenerativeModel = fake_GenerativeModel  # type: ignore
 
 
-def benchmark(iterations: int = 10) -> float:
+def benchmark(iterations: int = 10, use_cache: bool = True) -> float:
     """Run the benchmark and return average runtime."""
     _mock_genai()
     ctx = [{"source_id": "A", "page": 1, "content": "text", "score": 0.9}]
+    cache = rag.answer_cache if use_cache else None
     start = time.perf_counter()
     for _ in range(iterations):
-        rag.generate_answer("question", ctx)
+        rag.generate_answer("question", ctx, cache=cache)
     end = time.perf_counter()
     avg = (end - start) / iterations
     print(f"Average execution time over {iterations} runs: {avg:.4f}s")
+    if use_cache:
+        print(f"Answer cache: {rag.answer_cache.stats()}")
     return avg
 
 
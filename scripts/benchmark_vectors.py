@@ -0,0 +1,76 @@
+"""Throughput benchmark for the embedded vector store in ``src/backend``.
+
+Inserts ``n_docs`` random unit vectors into a temporary ``VectorStore`` in
+batches and one at a time, then measures unfiltered and filtered search
+latency and the query rate of several concurrent reader threads. Embedding
+time is excluded: the vectors are generated up front.
+
+Usage: python scripts/benchmark_vectors.py [n_docs] [dim]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.backend.app.core.vectors import VectorStore  # noqa: E402
+
+SOURCE_TYPES = ("contract", "statute", "case", "guidance")
+
+
+def _rows(n: int, offset: int = 0):
+    return [
+        {"id": f"doc-{offset + i}", "text": f"chunk {offset + i}", "source": f"file-{(offset + i) % 200}.pdf",
+         "source_type": SOURCE_TYPES[(offset + i) % len(SOURCE_TYPES)], "page": i % 40 + 1, "paragraph": i}
+        for i in range(n)
+    ]
+
+
+def benchmark(n_docs: int = 50000, dim: int = 384, batch_size: int = 1000, queries: int = 200) -> None:
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((n_docs, dim), dtype=np.float32)
+    rows = _rows(n_docs)
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VectorStore(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        for i in range(0, n_docs, batch_size):
+            store.upsert(rows[i:i + batch_size], embeddings[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"{n_docs} docs, dim {dim}")
+        print(f"{'batched insert':<24}{n_docs / elapsed:>12,.0f} docs/s")
+
+        single = min(1000, n_docs)
+        single_store = VectorStore(os.path.join(tmp, "single.db"))
+        start = time.perf_counter()
+        for i in range(single):
+            single_store.upsert(rows[i:i + 1], embeddings[i:i + 1])
+        elapsed = time.perf_counter() - start
+        print(f"{'one-at-a-time insert':<24}{single / elapsed:>12,.0f} docs/s")
+
+        start = time.perf_counter()
+        store.search(query_vectors[0], limit=10)
+        print(f"{'snapshot load':<24}{(time.perf_counter() - start) * 1000:>12.1f} ms")
+
+        for label, filters in (("search", {}), ("search source_type", {"source_type": "statute"}),
+                               ("search source", {"source": "file-7.pdf"})):
+            start = time.perf_counter()
+            for q in query_vectors:
+                store.search(q, limit=10, **filters)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24}{elapsed / queries * 1000:>12.2f} ms/query")
+
+        for threads in (1, 4, 8):
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                start = time.perf_counter()
+                list(pool.map(lambda q: store.search(q, limit=10), query_vectors))
+                elapsed = time.perf_counter() - start
+            print(f"{f'{threads} reader threads':<24}{queries / elapsed:>12,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    benchmark(*(int(arg) for arg in sys.argv[1:3]))
@@ -17,6 +17,7 @@ Usage:
 """
 
 import re
+from bisect import bisect_right
 from typing import Dict, List, Optional, Tuple, Union, Any
 import logging
 
@@ -30,6 +31,27 @@ UK_STATUTE_PATTERN = r"([A-Za-z\s]+)\s+Act\s+(\d{4}),?\s+(?:section|s\.?)\s+(\d+
 EU_CASE_PATTERN = r"Case\s+(?:No\.\s+)?([CT]-\d+/\d+)\s+([A-Za-z\s\-']+)\s+v\.?\s+([A-Za-z\s\-']+)"
 PARAGRAPH_PATTERN = r"(?:paragraph|para\.?|p\.?)\s+(\d+)"
 
+# The patterns above scan party names first, which backtracks over every
+# long run of prose.  The extractor instead finds the literal pivots
+# (" v ", "Act", "Case") and parses outward from them; names are the runs
+# of name characters next to a pivot, located by bisecting the positions
+# of the characters that end a run.
+_V_RE = re.compile(r"(?<=\s)v\.?(?=\s)")
+_UK_CASE_TAIL_RE = re.compile(r"\[?(\d{4})\]?\s+([A-Z]+)\s+(\d+)")
+_STATUTE_RE = re.compile(r"(?<=\s)Act\s+(\d{4}),?\s+(?:section|s\.?)\s+(\d+)")
+_EU_CASE_RE = re.compile(EU_CASE_PATTERN)
+_PARAGRAPH_RE = re.compile(PARAGRAPH_PATTERN)
+_CASE_NAME_BREAK_RE = re.compile(r"[^A-Za-z\s\-']")
+_STATUTE_NAME_BREAK_RE = re.compile(r"[^A-Za-z\s]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TITLE_NAME_RE = re.compile(r"[^\[(\d]+")
+
+# Characters after a citation searched for a paragraph reference
+PARAGRAPH_WINDOW = 50
+
+# Leading words of a party name dropped, at most, when looking it up
+MAX_PARTY_WORDS = 8
+
 class Citation:
     """Represents a legal citation"""
     def __init__(
@@ -52,80 +74,116 @@ class Citation:
         self.source_type = source_type
         self.source_id = source_id
 
-def extract_citations(text: str) -> List[Citation]:
-    """
-    Extract legal citations from text.
-    
-    Args:
-        text: The text to extract citations from
-        
-    Returns:
-        List[Citation]: List of extracted citations
-    """
+def _run_bounds(breaks: List[int], length: int, pos: int) -> Tuple[int, int]:
+    """Return the (start, end) of the run of name characters containing ``pos``."""
+    i = bisect_right(breaks, pos)
+    return (breaks[i - 1] + 1 if i else 0), (breaks[i] if i < len(breaks) else length)
+
+def _paragraph(text: str, end: int) -> Tuple[Optional[int], str]:
+    para_match = _PARAGRAPH_RE.search(text, end, end + PARAGRAPH_WINDOW)
+    para = int(para_match.group(1)) if para_match else None
+    return para, (f" {para_match.group(0)}" if para else "")
+
+def _uk_case_citations(text: str) -> List[Citation]:
+    pivots = [m.span() for m in _V_RE.finditer(text)]
+    if not pivots:
+        return []
+    breaks = [m.start() for m in _CASE_NAME_BREAK_RE.finditer(text)]
     citations = []
-    
-    # Extract UK case citations
-    uk_case_matches = re.finditer(UK_CASE_PATTERN, text)
-    for match in uk_case_matches:
-        claimant, defendant, year, court, number = match.groups()
-        case_id = f"{claimant.strip()} v {defendant.strip()}"
-        
-        # Look for paragraph references
-        citation_text = match.group(0)
-        para_match = re.search(PARAGRAPH_PATTERN, text[match.end():match.end() + 50])
-        para = int(para_match.group(1)) if para_match else None
-        
-        if para:
-            citation_text += f" {para_match.group(0)}"
-        
-        citations.append(Citation(
-            text=citation_text,
-            case_id=case_id,
-            para=para,
-            year=year,
-            court=court,
-            number=number,
-            source_type="case"
-        ))
-    
-    # Extract UK statute citations
-    statute_matches = re.finditer(UK_STATUTE_PATTERN, text)
-    for match in statute_matches:
-        name, year, section = match.groups()
-        case_id = f"{name.strip()} Act {year}"
-        
+    last_end = 0
+    i = 0
+    while i < len(pivots):
+        # Pivots sharing the run before them compete for one citation; like
+        # the greedy pattern, the last one that parses wins.
+        run_start, run_end = _run_bounds(breaks, len(text), pivots[i][0])
+        j = i
+        while j + 1 < len(pivots) and pivots[j + 1][0] < run_end:
+            j += 1
+        group, i = pivots[i:j + 1], j + 1
+        start = max(run_start, last_end)
+        for pivot_start, pivot_end in reversed(group):
+            if pivot_start < last_end:
+                break
+            # A name and the whitespace around it take two characters or more
+            if pivot_start - start < 2:
+                continue
+            defendant_end = _run_bounds(breaks, len(text), pivot_end)[1]
+            defendant = text[pivot_end:defendant_end]
+            if len(defendant) < 3 or not defendant[-1].isspace():
+                continue
+            tail = _UK_CASE_TAIL_RE.match(text, defendant_end)
+            if not tail:
+                continue
+            year, court, number = tail.groups()
+            para, para_text = _paragraph(text, tail.end())
+            citations.append(Citation(
+                text=text[start:tail.end()] + para_text,
+                case_id=f"{text[start:pivot_start].strip()} v {defendant.strip()}",
+                para=para,
+                year=year,
+                court=court,
+                number=number,
+                source_type="case"
+            ))
+            last_end = tail.end()
+            break
+    return citations
+
+def _statute_citations(text: str) -> List[Citation]:
+    pivots = list(_STATUTE_RE.finditer(text))
+    if not pivots:
+        return []
+    breaks = [m.start() for m in _STATUTE_NAME_BREAK_RE.finditer(text)]
+    citations = []
+    last_end = 0
+    for match in pivots:
+        if match.start() < last_end:
+            continue
+        start = max(_run_bounds(breaks, len(text), match.start() - 1)[0], last_end)
+        if match.start() - start < 2:
+            continue
+        year, section = match.groups()
         citations.append(Citation(
-            text=match.group(0),
-            case_id=case_id,
+            text=text[start:match.end()],
+            case_id=f"{text[start:match.start()].strip()} Act {year}",
             para=int(section),
             year=year,
             source_type="statute"
         ))
-    
-    # Extract EU case citations
-    eu_case_matches = re.finditer(EU_CASE_PATTERN, text)
-    for match in eu_case_matches:
+        last_end = match.end()
+    return citations
+
+def _eu_case_citations(text: str) -> List[Citation]:
+    citations = []
+    for match in _EU_CASE_RE.finditer(text):
         case_number, claimant, defendant = match.groups()
-        case_id = f"{claimant.strip()} v {defendant.strip()}"
-        
-        # Look for paragraph references
-        citation_text = match.group(0)
-        para_match = re.search(PARAGRAPH_PATTERN, text[match.end():match.end() + 50])
-        para = int(para_match.group(1)) if para_match else None
-        
-        if para:
-            citation_text += f" {para_match.group(0)}"
-        
+        para, para_text = _paragraph(text, match.end())
         citations.append(Citation(
-            text=citation_text,
-            case_id=case_id,
+            text=match.group(0) + para_text,
+            case_id=f"{claimant.strip()} v {defendant.strip()}",
             para=para,
             number=case_number,
             source_type="eu_case"
         ))
-    
     return citations
 
+def extract_citations(text: str) -> List[Citation]:
+    """
+    Extract legal citations from text.
+    
+    Runs in time linear in the length of ``text``: each citation type is
+    found from its literal pivot and party names are located by bisection,
+    so long prose without citations costs one scan per type.
+    
+    Args:
+        text: The text to extract citations from
+        
+    Returns:
+        List[Citation]: UK case, then UK statute, then EU case citations,
+        each in order of appearance
+    """
+    return _uk_case_citations(text) + _statute_citations(text) + _eu_case_citations(text)
+
 def format_citation(
     case_id: str,
     year: Optional[str] = None,
@@ -174,20 +232,90 @@ def format_citation(
     
     return citation
 
+def normalise_case_name(name: str) -> str:
+    """
+    Normalise a case or statute name for lookup.
+    
+    Lower-cases the name, drops punctuation and spells "vs", "versus" and
+    "v." as "v", so "Smith v. Jones" and "SMITH vs JONES" normalise alike.
+    
+    Args:
+        name: The case or statute name
+        
+    Returns:
+        str: The normalised name, words separated by single spaces
+    """
+    return " ".join("v" if word in ("vs", "versus") else word for word in _WORD_RE.findall(name.lower()))
+
+class KnownSourceIndex:
+    """Hash index of known sources by normalised case name"""
+    def __init__(self, known_sources: List[Dict[str, Any]]):
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        for source in known_sources:
+            title = source.get("title", "")
+            names = [title, source.get("case_id") or ""]
+            # "Smith v Jones [2020] UKSC 1" is also known as "Smith v Jones"
+            prefix = _TITLE_NAME_RE.match(title)
+            if prefix:
+                names.append(prefix.group(0))
+            names.extend(citation.case_id for citation in extract_citations(title))
+            for name in names:
+                key = normalise_case_name(name)
+                if key:
+                    # The first source with a name wins, as in a linear scan
+                    self._sources.setdefault(key, source)
+    
+    def __len__(self) -> int:
+        return len(self._sources)
+    
+    def find(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the known source of a citation.
+        
+        Extracted claimants and statute names may start with the words of
+        the sentence they were cited in ("As held in Smith v Jones"), so up
+        to MAX_PARTY_WORDS leading words are dropped, one at a time, while
+        a name remains before the "v" or "Act".
+        
+        Args:
+            case_id: The case identifier of the citation
+            
+        Returns:
+            Optional[Dict[str, Any]]: The matching source, or None
+        """
+        words = normalise_case_name(case_id).split(" ")
+        pivot = len(words)
+        for marker in ("v", "act"):
+            if marker in words:
+                pivot = len(words) - 1 - words[::-1].index(marker)
+                break
+        for drop in range(min(MAX_PARTY_WORDS, pivot - 1) + 1):
+            source = self._sources.get(" ".join(words[drop:]))
+            if source is not None:
+                return source
+        return None
+
 def validate_citations(
     citations: List[Dict[str, Any]],
-    known_sources: List[Dict[str, Any]]
+    known_sources: Union[List[Dict[str, Any]], KnownSourceIndex]
 ) -> List[Dict[str, Any]]:
     """
     Validate citations against known sources.
     
+    A citation is valid when its normalised case name is the normalised
+    title of a known source, or the case name in that title.  Lookups go
+    through a KnownSourceIndex, built here unless one is passed in, so
+    validation takes time linear in the citations plus the sources.
+    
     Args:
         citations: List of citation dictionaries
-        known_sources: List of known source dictionaries
+        known_sources: List of known source dictionaries, or an index of them
         
     Returns:
         List[Dict[str, Any]]: List of validated citations with additional metadata
     """
+    if not isinstance(known_sources, KnownSourceIndex):
+        known_sources = KnownSourceIndex(known_sources)
     validated_citations = []
     
     for citation in citations:
@@ -196,11 +324,7 @@ def validate_citations(
             citation = Citation(**citation)
         
         # Look for matching source
-        matching_source = None
-        for source in known_sources:
-            if citation.case_id.lower() in source.get("title", "").lower():
-                matching_source = source
-                break
+        matching_source = known_sources.find(citation.case_id)
         
         # Create validated citation
         validated = {
@@ -21,7 +21,7 @@ Usage:
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 import logging
 
 # Import OpenAI library
@@ -34,6 +34,7 @@ logger = logging.getLogger(__name__)
 # Environment configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 DEFAULT_MODEL = "gpt-4o"
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
 # Client instance
 _openai_client = None
@@ -83,4 +84,28 @@ async def generate(
         return response.choices[0].message.content
     except Exception as e:
         logger.error(f"Error generating text with OpenAI: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+async def embed(
+    texts: List[str],
+    model: Optional[str] = None
+) -> List[List[float]]:
+    """
+    Embed texts using OpenAI in a single request.
+    
+    Args:
+        texts: Texts to embed
+        model: Optional embedding model (defaults to text-embedding-3-small)
+        
+    Returns:
+        List[List[float]]: One embedding per input text, in order
+    """
+    client = _get_openai_client()
+    model = model or DEFAULT_EMBEDDING_MODEL
+    
+    try:
+        response = await client.embeddings.create(model=model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    except Exception as e:
+        logger.error(f"Error embedding text with OpenAI: {str(e)}")
+        raise
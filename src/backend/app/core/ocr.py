@@ -5,8 +5,16 @@ This module provides functionality for extracting text from PDF documents using:
 - pdfplumber for direct text extraction
 - pytesseract for OCR when needed
 
+Each document is parsed once: ``extract_document`` returns the plain text,
+line spans with bounding boxes and character offsets, page offsets and
+per-page OCR confidence together, and caches the result by content hash so
+every consumer of the same document reuses it.
+
 Usage:
-    from app.core.ocr import extract_text, extract_text_with_locations
+    from app.core.ocr import extract_document, extract_text, extract_text_with_locations
+    
+    # Extract text, spans and the page map in one pass
+    document = extract_document("path/to/document.pdf")
     
     # Extract plain text from a PDF
     text = extract_text("path/to/document.pdf")
@@ -17,9 +25,13 @@ Usage:
 
 import os
 import io
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union, Any
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import pdfplumber
 from pypdf import PdfReader
@@ -27,10 +39,31 @@ import pytesseract
 from PIL import Image
 import numpy as np
 
+try:
+    from rag.ocr_pool import get_ocr_pool
+    from rag.ocr_preprocess import ocr_page_adaptive
+    from rag.page_classifier import classify_pdf
+    from rag.layout import group_lines
+except ImportError:  # pragma: no cover - root ``rag`` package not on the path
+    get_ocr_pool = None
+    ocr_page_adaptive = None
+    classify_pdf = None
+    group_lines = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Separator between pages in extracted text; the form feed lets chunkers
+# report exact page numbers.
+PAGE_SEPARATOR = "\n\f\n"
+
+# Number of extracted documents kept in memory, keyed by content hash
+DOCUMENT_CACHE_SIZE = int(os.getenv("OCR_DOCUMENT_CACHE_SIZE", "16"))
+
+# Pages with fewer extractable characters than this are OCR'd
+MIN_PAGE_CHARS = 50
+
 @dataclass
 class TextSpan:
     """Text span with location information"""
@@ -38,22 +71,93 @@ class TextSpan:
     page_num: int
     bbox: Optional[Tuple[float, float, float, float]] = None  # (x0, y0, x1, y1)
     confidence: Optional[float] = None
+    start: Optional[int] = None  # offset of the span in the document text
+    end: Optional[int] = None
+
+@dataclass
+class ExtractedDocument:
+    """Result of a single extraction pass over a document
+    
+    Spans are kept as arrays of offsets into ``text``, page numbers and
+    bounding boxes (NaN when unknown); ``spans`` builds ``TextSpan``
+    objects from them on first use.
+    """
+    text: str
+    page_offsets: List[int] = field(default_factory=list)  # offset of each page in ``text``
+    page_confidence: List[Optional[float]] = field(default_factory=list)  # None for text pages
+    span_start: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    span_end: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    span_page: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    span_bbox: np.ndarray = field(default_factory=lambda: np.zeros((0, 4)))
+    _spans: Optional[List[TextSpan]] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def spans(self) -> List[TextSpan]:
+        """Located spans, in document order."""
+        if self._spans is None:
+            spans = []
+            for start, end, page_num, bbox in zip(self.span_start.tolist(), self.span_end.tolist(),
+                                                  self.span_page.tolist(), self.span_bbox.tolist()):
+                spans.append(TextSpan(
+                    text=self.text[start:end],
+                    page_num=page_num,
+                    bbox=None if np.isnan(bbox[0]) else tuple(bbox),
+                    confidence=self.page_confidence[page_num - 1],
+                    start=start,
+                    end=end
+                ))
+            self._spans = spans
+        return self._spans
+    
+    def set_spans(
+        self,
+        starts: List[np.ndarray],
+        ends: List[np.ndarray],
+        pages: List[np.ndarray],
+        bboxes: List[np.ndarray]
+    ) -> None:
+        """Concatenate per-page span arrays into the document's arrays."""
+        if starts:
+            self.span_start = np.concatenate(starts)
+            self.span_end = np.concatenate(ends)
+            self.span_page = np.concatenate(pages)
+            self.span_bbox = np.concatenate(bboxes)
+        self._spans = None
+    
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+    
+    def page_at(self, offset: int) -> int:
+        """Return the 1-based page containing ``offset``."""
+        return max(1, bisect_right(self.page_offsets, offset))
+    
+    def page_text(self, page_num: int) -> str:
+        """Return the text of the 1-based page ``page_num``."""
+        start = self.page_offsets[page_num - 1]
+        if page_num < len(self.page_offsets):
+            return self.text[start:self.page_offsets[page_num] - len(PAGE_SEPARATOR)]
+        return self.text[start:]
 
-def _is_scanned_page(page: Any) -> bool:
+_document_cache: "OrderedDict[str, ExtractedDocument]" = OrderedDict()
+_document_cache_lock = threading.Lock()
+
+def _is_scanned_page(page: Any, text: Optional[str] = None) -> bool:
     """
     Check if a page is likely scanned (has few or no text elements).
     
     Args:
         page: A pdfplumber page object
+        text: The page text if it has already been extracted
         
     Returns:
         bool: True if the page is likely scanned, False otherwise
     """
-    # Extract text from the page
-    text = page.extract_text()
+    if text is None:
+        text = page.extract_text()
     
     # If there's very little text, it's likely a scanned page
-    if not text or len(text.strip()) < 50:
+    if not text or len(text.strip()) < MIN_PAGE_CHARS:
         return True
     
     return False
@@ -69,14 +173,19 @@ def _process_with_tesseract(image: Image.Image, dpi: int = 300) -> Tuple[str, fl
     Returns:
         Tuple[str, float]: Extracted text and confidence score
     """
-    # Convert to higher DPI if needed
-    if hasattr(image, 'info') and image.info.get('dpi', (72, 72))[0] < dpi:
-        scale_factor = dpi / image.info.get('dpi', (72, 72))[0]
+    # Upscale only images that declare a lower DPI; rendered pages carry no
+    # DPI and are already at the resolution they were rendered at
+    if 'dpi' in getattr(image, 'info', {}) and image.info['dpi'][0] < dpi:
+        scale_factor = dpi / image.info['dpi'][0]
         new_size = (int(image.width * scale_factor), int(image.height * scale_factor))
         image = image.resize(new_size, Image.LANCZOS)
     
-    # Use Tesseract to extract text with confidence data
-    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    # Use Tesseract to extract text with confidence data, through the
+    # persistent worker pool when available
+    if get_ocr_pool is not None:
+        data = get_ocr_pool().image_to_data(image)
+    else:
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
     
     # Combine text and calculate average confidence
     text_parts = []
@@ -92,51 +201,223 @@ def _process_with_tesseract(image: Image.Image, dpi: int = 300) -> Tuple[str, fl
     
     return text, avg_confidence
 
-def extract_text(file_path_or_bytes: Union[str, bytes, io.BytesIO]) -> str:
+def _group_lines(
+    words: List[Dict[str, Any]],
+    y_threshold: float = 3
+) -> Tuple[str, np.ndarray, np.ndarray, np.ndarray]:
     """
-    Extract text from a PDF document using pdfplumber and pytesseract as needed.
+    Group pdfplumber words into lines based on their y-position.
+    
+    A new line starts wherever ``top`` moves by more than ``y_threshold``
+    from the previous word.
     
     Args:
-        file_path_or_bytes: Path to PDF file or PDF bytes
+        words: Words from ``page.extract_words()``, in reading order
+        y_threshold: Threshold for considering words on the same line
         
     Returns:
-        str: Extracted text content
+        Tuple[str, np.ndarray, np.ndarray, np.ndarray]: Page text with one
+        line per row, and the start offsets, end offsets and
+        ``(x0, top, x1, bottom)`` boxes of the lines in it
     """
-    text_parts = []
+    if group_lines is not None:
+        lines = group_lines(words, tolerance=y_threshold)
+        return lines.text, lines.start, lines.end, lines.bbox
+    
+    texts: List[str] = []
+    boxes: List[Tuple[float, float, float, float]] = []
+    current_line: List[Dict[str, Any]] = []
+    
+    def close_line():
+        texts.append(' '.join(w['text'] for w in current_line))
+        boxes.append((min(w['x0'] for w in current_line), min(w['top'] for w in current_line),
+                      max(w['x1'] for w in current_line), max(w['bottom'] for w in current_line)))
+    
+    for word in words:
+        if current_line and abs(word['top'] - current_line[-1]['top']) > y_threshold:
+            close_line()
+            current_line = []
+        current_line.append(word)
+    if current_line:
+        close_line()
+    
+    lengths = np.array([len(t) for t in texts], dtype=np.int64)
+    starts = np.cumsum(lengths + 1) - (lengths + 1)
+    return "\n".join(texts), starts, starts + lengths, np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+def _read_bytes(file_path_or_bytes: Union[str, bytes, io.BytesIO]) -> bytes:
+    if isinstance(file_path_or_bytes, (bytes, bytearray)):
+        return bytes(file_path_or_bytes)
+    if isinstance(file_path_or_bytes, (str, os.PathLike)):
+        with open(file_path_or_bytes, "rb") as f:
+            return f.read()
+    if isinstance(file_path_or_bytes, io.BytesIO):
+        return file_path_or_bytes.getvalue()
+    return file_path_or_bytes.read()
+
+def _classify_pages(data: bytes) -> Optional[List[bool]]:
+    """
+    Decide which pages need OCR from their content streams, before extraction.
     
+    Args:
+        data: PDF bytes
+        
+    Returns:
+        Optional[List[bool]]: Per page, whether it needs OCR; None when the
+        classifier is unavailable or cannot parse the file
+    """
+    if classify_pdf is None:
+        return None
     try:
-        # Open the PDF file
-        with pdfplumber.open(file_path_or_bytes) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                logger.info(f"Processing page {page_num} of {len(pdf.pages)}")
-                
-                # Try direct text extraction first
-                page_text = page.extract_text()
-                
-                # If little or no text is extracted, it might be a scanned page
-                if _is_scanned_page(page):
-                    logger.info(f"Page {page_num} appears to be scanned, using OCR")
-                    # Convert page to image and use OCR
+        return [page.needs_ocr for page in classify_pdf(data)]
+    except Exception as e:
+        logger.warning(f"Page classification failed, checking extracted text instead: {e}")
+        return None
+
+def _extract_pages(data: bytes, document: ExtractedDocument) -> None:
+    """Parse ``data`` once with pdfplumber, OCR'ing scanned pages."""
+    parts: List[str] = []
+    starts: List[np.ndarray] = []
+    ends: List[np.ndarray] = []
+    pages: List[np.ndarray] = []
+    bboxes: List[np.ndarray] = []
+    offset = 0
+    needs_ocr = _classify_pages(data)
+    
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page_num, page in enumerate(pdf.pages, 1):
+            logger.info(f"Processing page {page_num} of {len(pdf.pages)}")
+            if page_num > 1:
+                offset += len(PAGE_SEPARATOR)
+            document.page_offsets.append(offset)
+            
+            if needs_ocr is not None:
+                # Scanned pages skip word extraction altogether
+                scanned = needs_ocr[page_num - 1]
+                words = [] if scanned else page.extract_words()
+            else:
+                words = page.extract_words()
+            # Lines from one word extraction give both the page text and its spans
+            page_text, line_starts, line_ends, line_boxes = _group_lines(words)
+            if needs_ocr is None:
+                scanned = _is_scanned_page(page, page_text)
+            
+            if scanned:
+                logger.info(f"Page {page_num} appears to be scanned, using OCR")
+                if ocr_page_adaptive is not None:
+                    # Preprocessed, low resolution first; re-rendered at a
+                    # higher DPI only when the confidence is low
+                    page_text, confidence, dpi = ocr_page_adaptive(
+                        lambda dpi: page.to_image(resolution=dpi).original, get_ocr_pool()
+                    )
+                    logger.info(f"OCR confidence: {confidence:.2f} at {dpi} DPI")
+                else:
                     img = page.to_image(resolution=300)
-                    ocr_text, confidence = _process_with_tesseract(img.original)
+                    page_text, confidence = _process_with_tesseract(img.original)
                     logger.info(f"OCR confidence: {confidence:.2f}")
-                    text_parts.append(ocr_text)
-                else:
-                    text_parts.append(page_text)
+                # One span for the whole page since we don't have precise coordinates
+                line_starts = np.zeros(1, dtype=np.int64)
+                line_ends = np.array([len(page_text)], dtype=np.int64)
+                line_boxes = np.array([[0, 0, page.width, page.height]], dtype=np.float64)
+                document.page_confidence.append(confidence)
+            else:
+                document.page_confidence.append(None)
+            
+            starts.append(line_starts + offset)
+            ends.append(line_ends + offset)
+            pages.append(np.full(len(line_starts), page_num, dtype=np.int64))
+            bboxes.append(line_boxes)
+            parts.append(page_text)
+            offset += len(page_text)
+    
+    document.text = PAGE_SEPARATOR.join(parts)
+    document.set_spans(starts, ends, pages, bboxes)
+
+def _extract_pages_with_pypdf(data: bytes, document: ExtractedDocument) -> None:
+    """Basic extraction without locations, used when pdfplumber fails."""
+    reader = PdfReader(io.BytesIO(data))
+    parts: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    pages: List[int] = []
+    offset = 0
+    for page_num, page in enumerate(reader.pages, 1):
+        if page_num > 1:
+            offset += len(PAGE_SEPARATOR)
+        text = page.extract_text() or ""
+        document.page_offsets.append(offset)
+        document.page_confidence.append(None)
+        if text:
+            starts.append(offset)
+            ends.append(offset + len(text))
+            pages.append(page_num)
+        parts.append(text)
+        offset += len(text)
+    document.text = PAGE_SEPARATOR.join(parts)
+    document.set_spans(
+        [np.array(starts, dtype=np.int64)],
+        [np.array(ends, dtype=np.int64)],
+        [np.array(pages, dtype=np.int64)],
+        [np.full((len(starts), 4), np.nan)]
+    )
+
+def extract_document(file_path_or_bytes: Union[str, bytes, io.BytesIO]) -> ExtractedDocument:
+    """
+    Extract text, line spans, page offsets and OCR confidence in one pass.
+    
+    Results are cached by content hash, so extracting the same document
+    again (e.g. for text and then for locations) does not re-parse or re-OCR it.
+    
+    Args:
+        file_path_or_bytes: Path to PDF file or PDF bytes
+        
+    Returns:
+        ExtractedDocument: The extraction result; treat it as read-only
+    """
+    data = _read_bytes(file_path_or_bytes)
+    key = hashlib.sha256(data).hexdigest()
+    with _document_cache_lock:
+        cached = _document_cache.get(key)
+        if cached is not None:
+            _document_cache.move_to_end(key)
+            return cached
     
+    document = ExtractedDocument(text="")
+    try:
+        _extract_pages(data, document)
     except Exception as e:
         logger.error(f"Error extracting text: {str(e)}")
         # Fallback to pypdf for basic extraction
         try:
             logger.info("Falling back to pypdf for text extraction")
-            reader = PdfReader(file_path_or_bytes)
-            for page in reader.pages:
-                text_parts.append(page.extract_text() or "")
+            document = ExtractedDocument(text="")
+            _extract_pages_with_pypdf(data, document)
         except Exception as fallback_error:
             logger.error(f"Fallback extraction failed: {str(fallback_error)}")
             raise
     
-    return "\n\n".join(text_parts)
+    with _document_cache_lock:
+        _document_cache[key] = document
+        while len(_document_cache) > DOCUMENT_CACHE_SIZE:
+            _document_cache.popitem(last=False)
+    return document
+
+def clear_document_cache() -> None:
+    """Drop all cached extraction results."""
+    with _document_cache_lock:
+        _document_cache.clear()
+
+def extract_text(file_path_or_bytes: Union[str, bytes, io.BytesIO]) -> str:
+    """
+    Extract text from a PDF document using pdfplumber and pytesseract as needed.
+    
+    Args:
+        file_path_or_bytes: Path to PDF file or PDF bytes
+        
+    Returns:
+        str: Extracted text content, pages separated by ``PAGE_SEPARATOR``
+    """
+    return extract_document(file_path_or_bytes).text
 
 def extract_text_with_locations(
     file_path_or_bytes: Union[str, bytes, io.BytesIO]
@@ -150,94 +431,7 @@ def extract_text_with_locations(
     Returns:
         List[TextSpan]: List of text spans with location information
     """
-    spans = []
-    
-    try:
-        # Open the PDF file
-        with pdfplumber.open(file_path_or_bytes) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                logger.info(f"Processing page {page_num} of {len(pdf.pages)}")
-                
-                # Check if it's a scanned page
-                if _is_scanned_page(page):
-                    logger.info(f"Page {page_num} appears to be scanned, using OCR")
-                    # Convert page to image and use OCR
-                    img = page.to_image(resolution=300)
-                    ocr_text, confidence = _process_with_tesseract(img.original)
-                    
-                    # Create a span for the whole page since we don't have precise coordinates
-                    spans.append(TextSpan(
-                        text=ocr_text,
-                        page_num=page_num,
-                        bbox=(0, 0, page.width, page.height),
-                        confidence=confidence
-                    ))
-                else:
-                    # Extract text with character information
-                    words = page.extract_words()
-                    
-                    # Group words into paragraphs based on y-position
-                    if words:
-                        y_threshold = 3  # Threshold for considering words on the same line
-                        current_y = words[0]['top']
-                        current_line = []
-                        
-                        for word in words:
-                            # If the word is on a new line
-                            if abs(word['top'] - current_y) > y_threshold:
-                                # Save the current line
-                                if current_line:
-                                    line_text = ' '.join(w['text'] for w in current_line)
-                                    x0 = min(w['x0'] for w in current_line)
-                                    y0 = min(w['top'] for w in current_line)
-                                    x1 = max(w['x1'] for w in current_line)
-                                    y1 = max(w['bottom'] for w in current_line)
-                                    
-                                    spans.append(TextSpan(
-                                        text=line_text,
-                                        page_num=page_num,
-                                        bbox=(x0, y0, x1, y1)
-                                    ))
-                                
-                                # Start a new line
-                                current_y = word['top']
-                                current_line = [word]
-                            else:
-                                # Add to current line
-                                current_line.append(word)
-                        
-                        # Don't forget the last line
-                        if current_line:
-                            line_text = ' '.join(w['text'] for w in current_line)
-                            x0 = min(w['x0'] for w in current_line)
-                            y0 = min(w['top'] for w in current_line)
-                            x1 = max(w['x1'] for w in current_line)
-                            y1 = max(w['bottom'] for w in current_line)
-                            
-                            spans.append(TextSpan(
-                                text=line_text,
-                                page_num=page_num,
-                                bbox=(x0, y0, x1, y1)
-                            ))
-    
-    except Exception as e:
-        logger.error(f"Error extracting text with locations: {str(e)}")
-        # Fallback to basic extraction without locations
-        try:
-            logger.info("Falling back to basic text extraction")
-            reader = PdfReader(file_path_or_bytes)
-            for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text() or ""
-                if text:
-                    spans.append(TextSpan(
-                        text=text,
-                        page_num=page_num
-                    ))
-        except Exception as fallback_error:
-            logger.error(f"Fallback extraction failed: {str(fallback_error)}")
-            raise
-    
-    return spans
+    return extract_document(file_path_or_bytes).spans
 
 def detect_clauses(
     text_spans: List[TextSpan], 
@@ -1,44 +1,432 @@
 """
 Vector database adapter for Blackletter Systems.
 
-This is a simplified version that provides the same interface but doesn't require weaviate.
-Vector functionality is disabled to focus on core contract review features.
+This module provides an embedded vector store backed by SQLite:
+- Documents (text, source, source_type, page, paragraph, metadata) and their
+  normalised float32 embeddings live in one table of a local database file
+- Inserts are batched: one embedding request and one transaction per batch
+- Searches score a NumPy snapshot of the embedding matrix, restricted to the
+  rows matching the ``source_type``/``source`` filters
+- The database runs in WAL mode and each thread reads through its own
+  connection, so searches run concurrently with each other and with writes
+
+The snapshot is patched in place by this store's writes and reloaded only
+when another connection, e.g. another process sharing the file, commits.
+
+Embeddings come from OpenAI when ``OPENAI_API_KEY`` is set and from a local
+feature-hashing embedder otherwise; ``EMBEDDING_BACKEND`` overrides the choice
+and ``set_embedder`` installs any async ``texts -> vectors`` function.
 
 Usage:
     from app.core.vectors import get_vector_client, add_document, search_documents
-    
-    # These functions will raise NotImplementedError
-    # Vector functionality has been disabled
+
+    # Add a document
+    doc_id = await add_document("The processor shall...", source="dpa.pdf", source_type="contract")
+
+    # Search, optionally filtered by source_type and/or source
+    results = await search_documents("processor obligations", limit=5, source_type="contract")
 """
 
 import os
+import re
 import uuid
-from typing import Dict, List, Optional, Tuple, Union, Any
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 import logging
 import json
 import hashlib
 
+import numpy as np
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_vector_client():
+# Environment configuration
+VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", os.path.join("data", "vectors.db"))
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai" if os.getenv("OPENAI_API_KEY") else "hashing")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+HASHING_DIM = 512
+
+EmbedFn = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+# Namespace for deterministic document ids, so re-ingesting a chunk replaces it
+_ID_NAMESPACE = uuid.UUID("8f0b54c6-3c1e-4a49-9d7b-3f4c1b0e6a21")
+_TOKEN_RE = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    source TEXT,
+    source_type TEXT,
+    page INTEGER,
+    paragraph INTEGER,
+    metadata TEXT,
+    dim INTEGER NOT NULL,
+    embedding BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_source_type ON documents (source_type);
+CREATE INDEX IF NOT EXISTS documents_source ON documents (source);
+"""
+
+# Client instance and embedding function
+_vector_store = None
+_embedder: Optional[EmbedFn] = None
+
+
+class _Snapshot:
+    """In-memory copy of the embedding matrix used by searches.
+
+    This store's own writes are applied in place: rows are appended into
+    spare capacity and replaced or deleted rows are tombstoned, so a search
+    working on an earlier :meth:`view` never sees its rows change.  Growth
+    and compaction allocate new arrays.  Callers hold the store's snapshot
+    lock.
+    """
+
+    def __init__(self) -> None:
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.live = np.empty(0, dtype=bool)
+        # ``source_type``/``source`` of each row as codes into ``_codes``; -1 is None
+        self.source_types = np.empty(0, dtype=np.int32)
+        self.sources = np.empty(0, dtype=np.int32)
+        self._codes: Dict[str, int] = {}
+        self.dead = 0
+
+    def append(self, ids: Sequence[str], vectors: np.ndarray, source_types: Sequence[Optional[str]],
+               sources: Sequence[Optional[str]]) -> None:
+        """Add rows, replacing any rows with the same ids."""
+        last = {doc_id: i for i, doc_id in enumerate(ids)}
+        keep = [i for i, doc_id in enumerate(ids) if last[doc_id] == i]
+        for doc_id in last:
+            self.discard(doc_id)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)
+        start = len(self.ids)
+        end = start + len(keep)
+        if end > len(self.matrix):
+            self._resize(max(end, 2 * len(self.matrix), 64))
+        self.matrix[start:end] = vectors[keep]
+        self.live[start:end] = True
+        self.source_types[start:end] = [self._code(source_types[i]) for i in keep]
+        self.sources[start:end] = [self._code(sources[i]) for i in keep]
+        for position, i in enumerate(keep, start):
+            self.ids.append(ids[i])
+            self.positions[ids[i]] = position
+
+    def discard(self, doc_id: str) -> None:
+        position = self.positions.pop(doc_id, None)
+        if position is None:
+            return
+        self.live[position] = False
+        self.dead += 1
+        if self.dead > 1024 and self.dead * 2 > len(self.ids):
+            self._compact()
+
+    def view(self, source_type: Optional[str], source: Optional[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Return ``(ids, matrix, rows)`` for the live rows matching the filters."""
+        n = len(self.ids)
+        mask = self.live[:n]
+        for value, codes in ((source_type, self.source_types), (source, self.sources)):
+            if value is not None:
+                mask = mask & (codes[:n] == self._codes.get(value, -2))
+        return self.ids, self.matrix[:n], np.flatnonzero(mask)
+
+    def _code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        return self._codes.setdefault(value, len(self._codes))
+
+    def _resize(self, capacity: int) -> None:
+        n = len(self.ids)
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[:n] = self.matrix[:n]
+        self.matrix = matrix
+        for name in ("live", "source_types", "sources"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self.live[: len(self.ids)])
+        self.ids = [self.ids[i] for i in keep]
+        self.positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        for name in ("matrix", "live", "source_types", "sources"):
+            setattr(self, name, getattr(self, name)[keep])
+        self.dead = 0
+
+
+class VectorStore:
+    """
+    Embedded SQLite vector table with a NumPy search snapshot.
+
+    Writes go through a single connection guarded by a lock; each reading
+    thread has its own connection.
+    """
+
+    def __init__(self, path: str = VECTOR_DB_PATH):
+        if path == ":memory:":
+            # A shared in-memory database, so per-thread connections see the same data
+            self._uri = f"file:vectors-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._uri = f"file:{os.path.abspath(path)}"
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._snapshot_version: Optional[int] = None
+        self._writer = self._connect()
+        if path != ":memory:":
+            self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def upsert(self, rows: Sequence[Dict[str, Any]], embeddings: np.ndarray) -> List[str]:
+        """
+        Insert or replace documents with their embeddings in one transaction.
+
+        Args:
+            rows: Documents with ``id``, ``text``, ``source``, ``source_type``,
+                ``page``, ``paragraph`` and ``metadata``
+            embeddings: Matrix with one embedding per row
+
+        Returns:
+            List[str]: The document IDs
+        """
+        vectors = _normalise(embeddings)
+        dim = vectors.shape[1]
+        with self._write_lock:
+            existing = self._writer.execute("SELECT dim FROM documents LIMIT 1").fetchone()
+            if existing is not None and existing[0] != dim:
+                raise ValueError(f"Embedding dimension {dim} does not match the stored dimension {existing[0]}")
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                self._writer.executemany(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (row["id"], row["text"], row.get("source"), row.get("source_type"),
+                         row.get("page"), row.get("paragraph"),
+                         json.dumps(row["metadata"]) if row.get("metadata") is not None else None,
+                         dim, vector.tobytes())
+                        for row, vector in zip(rows, vectors)
+                    ),
+                )
+                self._writer.execute("COMMIT")
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+            ids = [row["id"] for row in rows]
+            self._patch_snapshot(lambda snapshot: snapshot.append(
+                ids, vectors, [row.get("source_type") for row in rows], [row.get("source") for row in rows]
+            ))
+        return ids
+
+    def delete(self, doc_id: str) -> bool:
+        """Delete a document; returns whether it existed."""
+        with self._write_lock:
+            deleted = self._writer.execute("DELETE FROM documents WHERE id = ?", (doc_id,)).rowcount > 0
+            if deleted:
+                self._patch_snapshot(lambda snapshot: snapshot.discard(doc_id))
+        return deleted
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def search(self, query_vector: Sequence[float], limit: int = 10,
+               source_type: Optional[str] = None, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the ``limit`` documents most similar to ``query_vector``.
+
+        Args:
+            query_vector: Query embedding
+            limit: Maximum number of results
+            source_type: Only return documents of this source type
+            source: Only return documents from this source
+
+        Returns:
+            List[Dict[str, Any]]: Documents with their cosine similarity as ``score``, best first
+        """
+        if limit <= 0:
+            return []
+        snapshot = self._current_snapshot()
+        with self._snapshot_lock:
+            snapshot_ids, matrix, positions = snapshot.view(source_type, source)
+        if not snapshot_ids:
+            return []
+        query = _normalise(np.asarray([query_vector], dtype=np.float32))[0]
+        if query.shape[0] != matrix.shape[1]:
+            raise ValueError(
+                f"Query dimension {query.shape[0]} does not match the stored dimension {matrix.shape[1]}"
+            )
+        if positions.size == 0:
+            return []
+        if positions.size == len(matrix):
+            scores = matrix @ query
+        else:
+            scores = matrix[positions] @ query
+        if limit < scores.size:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(scores.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        ids = [snapshot_ids[positions[i]] for i in top]
+        placeholders = ", ".join("?" * len(ids))
+        records = {
+            record[0]: record
+            for record in self._reader().execute(
+                "SELECT id, text, source, source_type, page, paragraph, metadata "
+                f"FROM documents WHERE id IN ({placeholders})",
+                ids,
+            )
+        }
+        results = []
+        for doc_id, i in zip(ids, top):
+            record = records.get(doc_id)
+            if record is None:  # deleted since the snapshot was taken
+                continue
+            results.append({
+                "id": doc_id,
+                "content": record[1],
+                "source": record[2],
+                "sourceType": record[3],
+                "page": record[4],
+                "paragraph": record[5],
+                "metadata": json.loads(record[6]) if record[6] else {},
+                "score": float(scores[i]),
+            })
+        return results
+
+    def _current_snapshot(self) -> _Snapshot:
+        # The writer's ``data_version`` changes only when another connection
+        # (e.g. another process) commits; this store's own writes patch the
+        # snapshot in place instead of reloading it.
+        with self._write_lock:
+            version = self._writer.execute("PRAGMA data_version").fetchone()[0]
+        with self._snapshot_lock:
+            if self._snapshot is None or version != self._snapshot_version:
+                self._snapshot = self._load_snapshot()
+                self._snapshot_version = version
+            return self._snapshot
+
+    def _patch_snapshot(self, patch: Callable[[_Snapshot], None]) -> None:
+        with self._snapshot_lock:
+            if self._snapshot is not None:
+                patch(self._snapshot)
+
+    def _load_snapshot(self) -> _Snapshot:
+        snapshot = _Snapshot()
+        rows = self._reader().execute(
+            "SELECT id, source_type, source, dim, embedding FROM documents ORDER BY rowid"
+        ).fetchall()
+        if rows:
+            dim = rows[0][3]
+            matrix = np.frombuffer(b"".join(row[4] for row in rows), dtype=np.float32).reshape(len(rows), dim)
+            snapshot.append([row[0] for row in rows], matrix, [row[1] for row in rows], [row[2] for row in rows])
+        return snapshot
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2:
+        raise ValueError("Embeddings must be a 2-D matrix")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def hashing_embed(texts: Sequence[str], dim: int = HASHING_DIM) -> np.ndarray:
     """
-    Get or initialize the vector database client.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
+    Embed texts locally by hashing their words into ``dim`` signed buckets.
+
+    Args:
+        texts: Texts to embed
+        dim: Embedding dimension
+
+    Returns:
+        np.ndarray: One row per text
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in _TOKEN_RE.findall(text.casefold()):
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            matrix[row, h % dim] += 1.0 if h >> 63 else -1.0
+    return matrix
+
+
+async def _hashing_embedder(texts: List[str]) -> np.ndarray:
+    return hashing_embed(texts)
+
+
+async def _openai_embedder(texts: List[str]) -> List[List[float]]:
+    from app.core.llm_adapter import embed
+    return await embed(texts)
+
+
+def set_embedder(embed_fn: Optional[EmbedFn]) -> None:
+    """
+    Install the async function used to embed documents and queries.
+
+    Args:
+        embed_fn: Function mapping a list of texts to their embeddings, or
+            ``None`` to restore the ``EMBEDDING_BACKEND`` default
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    global _embedder
+    _embedder = embed_fn
+
+
+async def _embed(texts: List[str]) -> np.ndarray:
+    embed_fn = _embedder or (_openai_embedder if EMBEDDING_BACKEND == "openai" else _hashing_embedder)
+    batches = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batches.append(np.asarray(await embed_fn(texts[start:start + EMBEDDING_BATCH_SIZE]), dtype=np.float32))
+    return np.vstack(batches)
+
+
+def _document_id(text: str, source: Optional[str], page: Optional[int], paragraph: Optional[int]) -> str:
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(_ID_NAMESPACE, f"{source}|{page}|{paragraph}|{digest}"))
+
+
+def get_vector_client() -> VectorStore:
+    """
+    Get or initialize the vector store.
+
+    Returns:
+        VectorStore: The store at ``VECTOR_DB_PATH``
+    """
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = VectorStore(VECTOR_DB_PATH)
+    return _vector_store
 
 def ensure_schema_exists():
     """
     Ensure that the vector database schema exists.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    store = get_vector_client()
+    with store._write_lock:
+        store._writer.executescript(_SCHEMA)
 
 async def add_document(
     text: str,
@@ -51,11 +439,29 @@ async def add_document(
 ) -> str:
     """
     Add a document to the vector database.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
+
+    Args:
+        text: Document text
+        source: Source name (e.g. file name)
+        source_type: Type of source
+        page: Page number
+        paragraph: Paragraph number
+        metadata: Additional metadata
+        doc_id: Document ID; derived from the content and position when omitted
+
+    Returns:
+        str: The document ID
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    doc_ids = await batch_add_documents([{
+        "id": doc_id,
+        "text": text,
+        "source": source,
+        "source_type": source_type,
+        "page": page,
+        "paragraph": paragraph,
+        "metadata": metadata
+    }])
+    return doc_ids[0]
 
 async def search_documents(
     query: str,
@@ -65,28 +471,55 @@ async def search_documents(
 ) -> List[Dict[str, Any]]:
     """
     Search for documents similar to the query.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
+
+    Args:
+        query: Search query
+        limit: Maximum number of results
+        source_type: Only return documents of this source type
+        source: Only return documents from this source
+
+    Returns:
+        List[Dict[str, Any]]: Matching documents with ``id``, ``content``,
+        ``source``, ``sourceType``, ``page``, ``paragraph``, ``metadata`` and ``score``
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    query_vector = (await _embed([query]))[0]
+    return await asyncio.to_thread(get_vector_client().search, query_vector, limit, source_type, source)
 
 async def delete_document(doc_id: str) -> bool:
     """
     Delete a document from the vector database.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
+
+    Args:
+        doc_id: Document ID
+
+    Returns:
+        bool: True if the document existed
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    return await asyncio.to_thread(get_vector_client().delete, doc_id)
 
 async def batch_add_documents(
     documents: List[Dict[str, Any]]
 ) -> List[str]:
     """
     Add multiple documents to the vector database in a batch.
-    
-    Raises:
-        NotImplementedError: Vector functionality has been disabled
+
+    All texts are embedded in batches of ``EMBEDDING_BATCH_SIZE`` and the rows
+    are written in a single transaction.
+
+    Args:
+        documents: Dicts with ``text`` and optional ``source``, ``source_type``,
+            ``page``, ``paragraph``, ``metadata`` and ``id``
+
+    Returns:
+        List[str]: Document IDs, in input order
     """
-    raise NotImplementedError("Vector database functionality has been disabled. Focus is on core contract review features.")
+    if not documents:
+        return []
+    rows = []
+    for doc in documents:
+        row = dict(doc)
+        if not row.get("id"):
+            row["id"] = _document_id(row["text"], row.get("source"), row.get("page"), row.get("paragraph"))
+        rows.append(row)
+    embeddings = await _embed([row["text"] for row in rows])
+    return await asyncio.to_thread(get_vector_client().upsert, rows, embeddings)
@@ -14,16 +14,29 @@ from typing import Dict, List, Optional, Any
 import logging
 import yaml
 
-from app.core.ocr import extract_text, extract_text_with_locations, detect_clauses
+from app.core.ocr import extract_document, detect_clauses
 from app.core.storage import download_file, upload_file
 from app.core.redact import create_redlined_document, create_summary_markdown
 from app.core.llm_adapter import generate
 from app.models.schemas import DocumentType, IssueSeverity
 
+try:
+    from rag.packing import truncate_to_tokens
+except ImportError:  # pragma: no cover - root ``rag`` package not on the path
+    truncate_to_tokens = None
+
+try:
+    from rag.clause_cache import clause_cache
+except ImportError:  # pragma: no cover - root ``rag`` package not on the path
+    clause_cache = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Token budget for the contract excerpt sent with summary requests
+SUMMARY_EXCERPT_TOKENS = 800
+
 # Default clause patterns
 DEFAULT_CLAUSE_PATTERNS = {
     "termination": [
@@ -162,10 +175,10 @@ async def review_contract(
         
         # Extract text from the document
         logger.info(f"Extracting text from document {document_key}")
-        text = extract_text(document_bytes)
-        
-        # Extract text with locations
-        text_spans = extract_text_with_locations(document_bytes)
+        # One parse gives the text, the located spans and the page map
+        document = extract_document(document_bytes)
+        text = document.text
+        text_spans = document.spans
         
         # Load the playbook
         playbook_config = await load_playbook(playbook)
@@ -321,10 +334,22 @@ async def enhance_issues_with_llm(
     Returns:
         List[Dict[str, Any]]: Enhanced issues with suggestions
     """
+    # Suggestions for standard clause text are shared across contracts; only
+    # issues without a cached suggestion go to the LLM.
+    pending = []
+    for issue in issues:
+        cached = _cached_suggestion(issue)
+        if cached is not None:
+            issue["suggestion"] = cached
+        else:
+            pending.append(issue)
+    if not pending:
+        return issues
+    
     # Prepare context for LLM
     context = "I have detected the following issues in a legal contract:\n\n"
     
-    for i, issue in enumerate(issues, 1):
+    for i, issue in enumerate(pending, 1):
         context += f"Issue {i}:\n"
         context += f"Text: \"{issue['text']}\"\n"
         context += f"Rule: {issue['rule_name']}\n"
@@ -346,8 +371,8 @@ async def enhance_issues_with_llm(
             # Add suggestions to issues
             for suggestion in suggestions:
                 issue_number = suggestion.get("issue_number")
-                if 1 <= issue_number <= len(issues):
-                    issues[issue_number - 1]["suggestion"] = suggestion.get("suggestion")
+                if 1 <= issue_number <= len(pending):
+                    pending[issue_number - 1]["suggestion"] = suggestion.get("suggestion")
         
         except json.JSONDecodeError:
             logger.warning("Failed to parse LLM response as JSON")
@@ -360,14 +385,28 @@ async def enhance_issues_with_llm(
                 issue_number = int(match.group(1))
                 suggestion = match.group(2).strip()
                 
-                if 1 <= issue_number <= len(issues):
-                    issues[issue_number - 1]["suggestion"] = suggestion
+                if 1 <= issue_number <= len(pending):
+                    pending[issue_number - 1]["suggestion"] = suggestion
     
     except Exception as e:
         logger.error(f"Error enhancing issues with LLM: {str(e)}")
     
+    if clause_cache is not None:
+        for issue in pending:
+            if issue.get("suggestion"):
+                clause_cache.put("suggestion", issue["text"], issue["suggestion"], key=_suggestion_key(issue))
+    
     return issues
 
+def _suggestion_key(issue: Dict[str, Any]) -> str:
+    return f"{issue.get('rule_id')}:{issue.get('severity')}"
+
+def _cached_suggestion(issue: Dict[str, Any]) -> Optional[str]:
+    """Return a suggestion previously generated for the same clause text and rule."""
+    if clause_cache is None:
+        return None
+    return clause_cache.get("suggestion", issue["text"], key=_suggestion_key(issue))
+
 async def generate_contract_summary(
     text: str,
     clauses: Dict[str, List[Any]],
@@ -406,9 +445,13 @@ async def generate_contract_summary(
         if count > 0:
             context += f"- {severity.title()}: {count} issues\n"
     
-    # Add the first part of the contract text
-    max_chars = 3000  # Limit text to avoid token limits
-    context += f"\nContract text (excerpt):\n{text[:max_chars]}...\n"
+    # Add the first part of the contract text, bounded by tokens rather than
+    # characters so dense clauses are not cut mid-budget
+    if truncate_to_tokens is not None:
+        excerpt = truncate_to_tokens(text, SUMMARY_EXCERPT_TOKENS)
+    else:
+        excerpt = text[:3000]  # Limit text to avoid token limits
+    context += f"\nContract text (excerpt):\n{excerpt}...\n"
     
     # Generate summary with LLM
     prompt = f"{context}\nPlease provide a concise summary of this contract, highlighting key provisions and potential risks. Format your response as markdown."
@@ -22,6 +22,11 @@ from app.core.storage import upload_file, download_file
 from app.core.ocr import extract_text
 from app.core.citations import extract_citations, Citation
 
+try:
+    from rag.chunking import chunk_text
+except ImportError:  # pragma: no cover - root ``rag`` package not on the path
+    chunk_text = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -195,18 +200,27 @@ async def ingest_document(
         logger.error(f"Error ingesting document: {str(e)}")
         raise
 
-def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Dict[str, Any]]:
+def split_text_into_chunks(text: str, max_tokens: int = 256, overlap_tokens: int = 48) -> List[Dict[str, Any]]:
     """
-    Split text into overlapping chunks.
+    Split text into overlapping, sentence-aligned chunks.
     
     Args:
-        text: Text to split
-        chunk_size: Maximum chunk size in characters
-        overlap: Overlap between chunks in characters
+        text: Text to split (pages separated by form feeds)
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens of whole sentences repeated between chunks
         
     Returns:
         List[Dict[str, Any]]: List of text chunks with metadata
     """
+    if chunk_text is not None:
+        return [
+            {"text": chunk.text, "page": chunk.page, "start": chunk.start, "end": chunk.end}
+            for chunk in chunk_text(text, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        ]
+    return _split_paragraphs(text)
+
+def _split_paragraphs(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Dict[str, Any]]:
+    """Paragraph packing used when the shared ``rag`` chunker is unavailable."""
     chunks = []
     
     # Split by paragraphs first
@@ -13,9 +13,14 @@ are not installed.  When the required libraries are missing a
 ``RuntimeError`` is raised with a helpful message.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 import io
+import math
+import multiprocessing
+import os
 
 # OCR service from the existing module
 from .ocr import ocr_available
@@ -41,6 +46,41 @@ except Exception:  # pragma: no cover - handled gracefully
     pytesseract = None  # type: ignore
     Image = None  # type: ignore
 
+# Optional: persistent Tesseract worker pool from the shared ``rag`` package
+try:  # pragma: no cover - optional dependency
+    from rag.ocr_cache import get_ocr_cache  # type: ignore
+    from rag.ocr_pool import OCRPool, get_ocr_pool  # type: ignore
+    from rag.ocr_preprocess import ocr_page_adaptive  # type: ignore
+except Exception:  # pragma: no cover - handled gracefully
+    get_ocr_cache = None  # type: ignore
+    OCRPool = None  # type: ignore
+    get_ocr_pool = None  # type: ignore
+    ocr_page_adaptive = None  # type: ignore
+
+# Optional: content-stream page classifier and vectorised line grouping
+# from the shared ``rag`` package
+try:  # pragma: no cover - optional dependency
+    from rag.page_classifier import classify_pdf  # type: ignore
+except Exception:  # pragma: no cover - handled gracefully
+    classify_pdf = None  # type: ignore
+try:  # pragma: no cover - optional dependency
+    from rag.layout import group_lines  # type: ignore
+except Exception:  # pragma: no cover - handled gracefully
+    group_lines = None  # type: ignore
+
+
+# Extraction profiles, from cheapest to most complete:
+#   ``text-only``  text and heading lines, which is all ``to_rag_chunks`` uses
+#   ``layout``     plus images, and tables on pages that have ruling lines
+#   ``full``       plus tables looked for on every page
+PROFILES = ("text-only", "layout", "full")
+
+# Documents with at least this many pages are analysed in worker processes.
+PARALLEL_MIN_PAGES = 32
+
+# Lines and rects thinner than this (in points) are ruling lines.
+RULE_THICKNESS = 2.0
+
 
 @dataclass
 class DocumentElement:
@@ -72,71 +112,160 @@ class Document:
 class DocumentAnalyzer:
     """High level multi-modal PDF processor."""
 
-    def __init__(self, nlp_engine: Optional["NLPEngine"] = None) -> None:
+    def __init__(
+        self,
+        nlp_engine: Optional["NLPEngine"] = None,
+        profile: str = "full",
+        workers: Optional[int] = None,
+    ) -> None:
         self.nlp = nlp_engine
+        self.profile = self._check_profile(profile)
+        self.workers = workers
+        # Returns the OCR pool for scanned pages, called on the first one;
+        # the process-wide pool unless set
+        self.ocr_pool_factory: Optional[Callable[[], "OCRPool"]] = None
 
     # ------------------------------------------------------------------
     # public API
     # ------------------------------------------------------------------
-    def analyze(self, pdf_bytes: bytes) -> Document:
+    def analyze(self, pdf_bytes: bytes, profile: Optional[str] = None) -> Document:
         """Analyse a PDF and return a :class:`Document`.
 
+        Large documents are split into page ranges analysed in parallel
+        worker processes; elements keep page order.
+
         Args:
             pdf_bytes: Raw bytes of the PDF file.
+            profile: One of :data:`PROFILES`; defaults to the analyzer's.
         """
         if pdfplumber is None:  # pragma: no cover - import guard
             raise RuntimeError(
                 "pdfplumber is required for document analysis."
             )
 
-        elements: List[DocumentElement] = []
+        profile = self._check_profile(profile or self.profile)
+        needs_ocr = self._classify_pages(pdf_bytes)
+        workers = self.workers or os.cpu_count() or 1
         with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                elements.extend(self._extract_page_elements(page, page_num))
-
-        return Document(elements=elements)
+            page_count = len(pdf.pages)
+            # Daemonic processes (e.g. Celery prefork children) may not start workers
+            if page_count < PARALLEL_MIN_PAGES or workers <= 1 or multiprocessing.current_process().daemon:
+                return Document(elements=self._extract_pages(pdf.pages, 1, needs_ocr, profile))
+
+        size = math.ceil(page_count / workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_analyze_range, pdf_bytes, start, min(page_count, start + size), needs_ocr, profile)
+                for start in range(0, page_count, size)
+            ]
+            return Document(elements=[elem for future in futures for elem in future.result()])
 
     def to_rag_chunks(self, document: Document) -> List[str]:
         """Convert :class:`Document` into text chunks for RAG indexing."""
         return [elem.text for elem in document.elements if elem.text]
 
+    def rag_chunks(self, pdf_bytes: bytes) -> List[str]:
+        """Analyse a PDF with the ``text-only`` profile and return its RAG chunks."""
+        return self.to_rag_chunks(self.analyze(pdf_bytes, profile="text-only"))
+
     # ------------------------------------------------------------------
     # helpers
     # ------------------------------------------------------------------
-    def _extract_page_elements(self, page: "pdfplumber.page.Page", page_num: int) -> List[DocumentElement]:  # type: ignore[name-defined]
+    @staticmethod
+    def _check_profile(profile: str) -> str:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown extraction profile {profile!r}; expected one of {PROFILES}")
+        return profile
+
+    def _extract_pages(
+        self,
+        pages: Sequence["pdfplumber.page.Page"],  # type: ignore[name-defined]
+        first_page: int,
+        needs_ocr: Optional[List[bool]],
+        profile: str,
+    ) -> List[DocumentElement]:
+        elements: List[DocumentElement] = []
+        for page_num, page in enumerate(pages, start=first_page):
+            scanned = needs_ocr[page_num - 1] if needs_ocr is not None else None
+            elements.extend(self._extract_page_elements(page, page_num, scanned, profile))
+        return elements
+
+    def _has_ruling_lines(self, page: "pdfplumber.page.Page") -> bool:  # type: ignore[name-defined]
+        """Whether ``page`` has the horizontal and vertical rules a table needs.
+
+        pdfplumber's default table finder builds cells from ruling lines,
+        so a page with fewer than two of each cannot yield a table.
+        Filled rects count for their edges.
+        """
+        horizontal = vertical = 0
+        for obj in chain(getattr(page, "lines", []), getattr(page, "rects", [])):
+            width = float(obj["x1"]) - float(obj["x0"])
+            height = float(obj["bottom"]) - float(obj["top"])
+            if height <= RULE_THICKNESS:
+                horizontal += 1
+            elif width <= RULE_THICKNESS:
+                vertical += 1
+            else:
+                horizontal += 2
+                vertical += 2
+            if horizontal >= 2 and vertical >= 2:
+                return True
+        return False
+
+    def _classify_pages(self, pdf_bytes: bytes) -> Optional[List[bool]]:
+        """Return per page whether it needs OCR, judged from its content stream.
+
+        ``None`` when the classifier is unavailable or cannot parse the
+        file; pages are then judged by their extracted text.
+        """
+        if classify_pdf is None:
+            return None
+        try:
+            return [page.needs_ocr for page in classify_pdf(pdf_bytes)]
+        except Exception:
+            return None
+
+    def _extract_page_elements(
+        self,
+        page: "pdfplumber.page.Page",  # type: ignore[name-defined]
+        page_num: int,
+        scanned: Optional[bool] = None,
+        profile: str = "full",
+    ) -> List[DocumentElement]:
         elems: List[DocumentElement] = []
 
         # --- text & structural elements ---
-        text = page.extract_text() or ""
-        if text.strip():
+        if scanned is None:
+            scanned = not (page.extract_text() or "").strip()
+        if not scanned:
             # Use word-level boxes to preserve spatial layout
             try:
                 words = page.extract_words(use_text_flow=True)
             except Exception:  # pragma: no cover - pdfplumber internal errors
                 words = []
 
-            lines = self._group_words_by_line(words)
-            for line_words in lines:
-                line_text = " ".join(w["text"] for w in line_words).strip()
-                x0 = min(float(w["x0"]) for w in line_words)
-                x1 = max(float(w["x1"]) for w in line_words)
-                top = min(float(w["top"]) for w in line_words)
-                bottom = max(float(w["bottom"]) for w in line_words)
+            for line_text, bbox in self._lines(words):
+                line_text = line_text.strip()
                 elem_type = "header" if self._is_heading(line_text) else "text"
                 elems.append(
                     DocumentElement(
                         type=elem_type,
                         text=line_text,
-                        bbox=(x0, top, x1, bottom),
+                        bbox=bbox,
                         page=page_num,
                     )
                 )
         else:
             # OCR fallback for image-based pages
             if ocr_available() and pytesseract and Image:  # pragma: no cover - requires OCR deps
-                img = page.to_image(resolution=150)
-                pil = img.original.convert("RGB")
-                ocr_text = pytesseract.image_to_string(pil) or ""
+                if ocr_page_adaptive is not None:
+                    pool = (self.ocr_pool_factory or get_ocr_pool)()
+                    ocr_text, _, _ = ocr_page_adaptive(
+                        lambda dpi: page.to_image(resolution=dpi).original, pool
+                    )
+                else:
+                    pil = page.to_image(resolution=150).original.convert("RGB")
+                    ocr_text = pytesseract.image_to_string(pil) or ""
                 elems.append(
                     DocumentElement(
                         type="text",
@@ -146,11 +275,18 @@ class DocumentAnalyzer:
                     )
                 )
 
+        if profile == "text-only":
+            return elems
+
         # --- tables ---
-        try:
-            tables = page.extract_tables()
-        except Exception:  # pragma: no cover - pdfplumber internal errors
-            tables = []
+        # Table detection is slow; the layout profile only runs it on pages
+        # with ruling lines
+        tables: List[List[List[Optional[str]]]] = []
+        if profile == "full" or self._has_ruling_lines(page):
+            try:
+                tables = page.extract_tables()
+            except Exception:  # pragma: no cover - pdfplumber internal errors
+                tables = []
         for table in tables:
             table_text = "\n".join("\t".join(cell or "" for cell in row) for row in table)
             elems.append(
@@ -181,6 +317,26 @@ class DocumentAnalyzer:
 
         return elems
 
+    def _lines(self, words: List[Dict[str, Any]], tolerance: float = 2.0) -> Iterator[Tuple[str, Tuple[float, float, float, float]]]:
+        """Yield ``(line text, (x0, top, x1, bottom))`` for the lines of ``words``.
+
+        Uses the vectorised :func:`rag.layout.group_lines` when available
+        and :meth:`_group_words_by_line` otherwise.
+        """
+        if group_lines is not None:
+            yield from group_lines(words, tolerance=tolerance, sort=True)
+            return
+        for line_words in self._group_words_by_line(words, tolerance):
+            yield (
+                " ".join(w["text"] for w in line_words),
+                (
+                    min(float(w["x0"]) for w in line_words),
+                    min(float(w["top"]) for w in line_words),
+                    max(float(w["x1"]) for w in line_words),
+                    max(float(w["bottom"]) for w in line_words),
+                ),
+            )
+
     def _group_words_by_line(self, words: List[Dict[str, Any]], tolerance: float = 2.0) -> List[List[Dict[str, Any]]]:
         """Group word boxes into lines.
 
@@ -224,4 +380,35 @@ class DocumentAnalyzer:
         return False
 
 
-__all__ = ["Document", "DocumentElement", "DocumentAnalyzer"]
+def _analyze_range(
+    pdf_bytes: bytes,
+    start: int,
+    stop: int,
+    needs_ocr: Optional[List[bool]],
+    profile: str,
+) -> List[DocumentElement]:
+    """Analyse pages ``start`` to ``stop`` (0-based, exclusive) in a worker process."""
+    analyzer = DocumentAnalyzer()
+    analyzer.ocr_pool_factory = _range_ocr_pool
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return analyzer._extract_pages(pdf.pages[start:stop], start + 1, needs_ocr, profile)
+
+
+_range_pool: Optional["OCRPool"] = None
+
+
+def _range_ocr_pool() -> Optional["OCRPool"]:
+    """Return this worker's in-process OCR pool, creating it on first use.
+
+    Range workers are not daemonic, so the process-wide pool would start
+    ``OCR_WORKERS`` Tesseract processes in each of them.  The ranges already
+    use every core; each OCRs its own pages in-process, sharing the on-disk
+    OCR cache.
+    """
+    global _range_pool
+    if _range_pool is None and OCRPool is not None:
+        _range_pool = OCRPool(workers=1, cache=get_ocr_cache())
+    return _range_pool
+
+
+__all__ = ["PROFILES", "Document", "DocumentElement", "DocumentAnalyzer"]
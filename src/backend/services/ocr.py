@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 
 # Enable with: ENABLE_OCR=true
 ENABLE_OCR = os.getenv("ENABLE_OCR", "false").lower() in {"1", "true", "yes"}
@@ -8,6 +8,30 @@ def ocr_available() -> bool:
     """Return True if OCR functionality is enabled by flag."""
     return ENABLE_OCR
 
+def _ocr_pool():
+    """Return the shared persistent Tesseract pool, or None if unavailable."""
+    try:
+        from rag.ocr_pool import get_ocr_pool  # type: ignore
+    except Exception:
+        return None
+    return get_ocr_pool()
+
+def _ocr_pages_adaptive():
+    """Return the adaptive-resolution page OCR helper, or None if unavailable."""
+    try:
+        from rag.ocr_preprocess import ocr_pages_adaptive  # type: ignore
+    except Exception:
+        return None
+    return ocr_pages_adaptive
+
+def _pages_needing_ocr(pdf_bytes: bytes) -> Optional[List[bool]]:
+    """Classify pages from their content streams, or None if unavailable."""
+    try:
+        from rag.page_classifier import classify_pdf  # type: ignore
+        return [page.needs_ocr for page in classify_pdf(pdf_bytes)]
+    except Exception:
+        return None
+
 def extract_text_from_image(image_bytes: bytes, lang: Optional[str] = None) -> str:
     """
     Extract text using Tesseract OCR. Requires:
@@ -23,6 +47,9 @@ def extract_text_from_image(image_bytes: bytes, lang: Optional[str] = None) -> s
     import pytesseract  # type: ignore
 
     img = Image.open(io.BytesIO(image_bytes))
+    pool = _ocr_pool()
+    if pool is not None:
+        return pool.image_to_string(img, lang=lang).strip()
     config = f"-l {lang}" if lang else ""
     return pytesseract.image_to_string(img, config=config).strip()
 
@@ -46,25 +73,52 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
             f"OCR dependencies not installed. Run: pip install -r src/backend/requirements-ocr.txt. Missing: {e}"
         )
 
+    pool = _ocr_pool()
+    ocr_pages = _ocr_pages_adaptive() if pool is not None else None
     with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
         text_content = []
+        # Image-based pages are OCR'd together at the end, each at the lowest
+        # resolution that gives a confident result
+        pending = {}
+        needs_ocr = _pages_needing_ocr(pdf_bytes)
 
-        for page in pdf.pages:
-            # First try to extract text directly
-            text = page.extract_text() or ""
+        for page_num, page in enumerate(pdf.pages):
+            if needs_ocr is not None:
+                # Scanned pages are known up front and not text-extracted
+                scanned = needs_ocr[page_num]
+                text = "" if scanned else page.extract_text() or ""
+            else:
+                # First try to extract text directly
+                text = page.extract_text() or ""
+                # If we get very little text, the page might be image-based
+                scanned = len(text.strip()) < 50  # Arbitrary threshold
             
-            # If we get very little text, the page might be image-based
-            if len(text.strip()) < 50:  # Arbitrary threshold
+            if scanned:
                 try:
-                    # Convert page to image and run OCR
-                    img = page.to_image(resolution=150)
-                    pil_image = img.original.convert('RGB')
-                    ocr_text = pytesseract.image_to_string(pil_image) or ""
-                    text = ocr_text
+                    if ocr_pages is not None:
+                        pending[page_num] = page
+                    else:
+                        # Convert page to image and run OCR
+                        img = page.to_image(resolution=150)
+                        pil_image = img.original.convert('RGB')
+                        text = pytesseract.image_to_string(pil_image) or ""
                 except Exception:
                     # If OCR fails, keep the original text
                     pass
 
             text_content.append(text.strip())
 
+        if pending:
+            try:
+                results = ocr_pages(
+                    [lambda dpi, page=page: page.to_image(resolution=dpi).original
+                     for page in pending.values()],
+                    pool,
+                )
+            except Exception:
+                # If OCR fails, keep the original text
+                results = []
+            for page_num, (text, _, _) in zip(pending, results):
+                text_content[page_num] = text.strip()
+
         return "\n\n".join(text_content)
\ No newline at end of file
@@ -21,6 +21,7 @@ def _mock_genai():
         return FakeGeminiModel()
 
     os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+    rag.clear_caches()
     if hasattr(rag, "genai") and rag.genai is not None:
         rag.genai.configure = lambda api_key: None
         rag.genai.GenerativeModel = fake_GenerativeModel
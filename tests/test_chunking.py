@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag.chunking import PAGE_BREAK, chunk_text, find_page_starts  # noqa: E402
+
+
+def _words(text):
+    return len(text.split())
+
+
+def test_chunks_end_on_sentences_and_respect_budget():
+    text = " ".join(f"Sentence number {i} ends here." for i in range(200))
+    chunks = chunk_text(text, max_tokens=60, overlap_tokens=12, tokenizer=_words)
+
+    assert len(chunks) > 1
+    assert all(c.tokens <= 60 for c in chunks)
+    assert all(c.text.startswith("Sentence") and c.text.endswith("here.") for c in chunks)
+    # Consecutive chunks share whole trailing sentences.
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.start < nxt.start < prev.end
+        assert text[nxt.start:prev.end].endswith("here.")
+    assert chunks[-1].end == len(text)
+
+
+def test_chunks_are_offset_views_with_exact_pages():
+    pages = ["Page one text. More of page one.", "Page two text.", "Page three starts. It ends."]
+    text = PAGE_BREAK.join(pages)
+    chunks = chunk_text(text, max_tokens=4, overlap_tokens=0, tokenizer=_words)
+
+    assert find_page_starts(text) == [0, len(pages[0]) + 1, len(pages[0]) + len(pages[1]) + 2]
+    assert [c.page for c in chunks] == [1, 1, 2, 3, 3]
+    assert all(c.text == text[c.start:c.end] for c in chunks)
+
+
+def test_over_long_sentence_is_split_and_sections_are_not_crossed():
+    text = "word " * 50 + "\n\nTail clause."
+    sections = [(0, 250, "A"), (250, len(text), "B")]
+    chunks = chunk_text(text, max_tokens=20, overlap_tokens=5, sections=sections, tokenizer=_words)
+
+    assert [c.section for c in chunks] == ["A", "A", "A", "B"]
+    assert all(c.tokens <= 20 for c in chunks)
+    assert chunks[-1].text == "Tail clause."
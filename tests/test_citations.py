@@ -0,0 +1,91 @@
+import os
+import random
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.backend.app.core import citations  # noqa: E402
+from src.backend.app.core.citations import KnownSourceIndex, extract_citations, validate_citations  # noqa: E402
+
+JUDGMENT = (
+    "As stated in Smith v. Jones [2020] UKSC 1, paragraph 15, the duty is strict. "
+    "The Court of Appeal agreed in Miller v Secretary of State [2019] UKSC 41. "
+    "See the Data Protection Act 2018, s. 170 and Case C-131/12 Google Spain v AEPD, para 94."
+)
+
+
+def _fields(found):
+    return [(c.text, c.case_id, c.para, c.year, c.court, c.number, c.source_type) for c in found]
+
+
+def _pattern_scan(text):
+    """The three backtracking scans the pivot scanner replaced."""
+    found = []
+    for pattern, kind in ((citations.UK_CASE_PATTERN, "case"), (citations.UK_STATUTE_PATTERN, "statute"),
+                          (citations.EU_CASE_PATTERN, "eu_case")):
+        for match in re.finditer(pattern, text):
+            groups = match.groups()
+            text_ = match.group(0)
+            para_match = re.search(citations.PARAGRAPH_PATTERN, text[match.end():match.end() + 50])
+            para = int(para_match.group(1)) if para_match else None
+            if kind == "statute":
+                found.append((text_, f"{groups[0].strip()} Act {groups[1]}", int(groups[2]), groups[1],
+                              None, None, kind))
+                continue
+            if para:
+                text_ += f" {para_match.group(0)}"
+            if kind == "case":
+                found.append((text_, f"{groups[0].strip()} v {groups[1].strip()}", para, *groups[2:], kind))
+            else:
+                found.append((text_, f"{groups[1].strip()} v {groups[2].strip()}", para, None, None,
+                              groups[0], kind))
+    return found
+
+
+def test_extracts_cases_statutes_and_eu_cases():
+    found = extract_citations(JUDGMENT)
+    assert [(c.source_type, c.case_id, c.para) for c in found] == [
+        ("case", "As stated in Smith v Jones", 15),
+        ("case", "The Court of Appeal agreed in Miller v Secretary of State", None),
+        ("statute", "See the Data Protection Act 2018", 170),
+        ("eu_case", "Google Spain v AEPD", 94),
+    ]
+    assert found[0].text == "As stated in Smith v. Jones [2020] UKSC 1 paragraph 15"
+    assert (found[0].year, found[0].court, found[0].number) == ("2020", "UKSC", "1")
+    assert found[3].number == "C-131/12"
+
+
+def test_pivot_scanner_matches_pattern_scan():
+    tokens = ["Smith", "Jones", "O'Brien", "v", "v.", "vs", "[2020]", "2019", "UKSC", "EWCA", "1", "12",
+              ",", ".", "Act", "Data Protection", "section", "s.", "para", "p.", "Case", "C-131/12", "No.",
+              "held", "\n", "(", ")"]
+    rng = random.Random(0)
+    for _ in range(3000):
+        text = "".join(rng.choice(tokens) + rng.choice([" ", " ", "  ", "\n", ""])
+                       for _ in range(rng.randint(1, 25)))
+        assert _fields(extract_citations(text)) == _pattern_scan(text), text
+    assert _fields(extract_citations(JUDGMENT)) == _pattern_scan(JUDGMENT)
+
+
+def test_later_pivot_in_a_name_wins_like_greedy_pattern():
+    found = extract_citations("Smith v Jones v Brown [2020] UKSC 1 and Smith v Jones v [2021] EWCA 2")
+    assert [c.case_id for c in found] == ["Smith v Jones v Brown", "and Smith v Jones v"]
+
+
+def test_validation_uses_normalised_names():
+    sources = [
+        {"id": "s1", "title": "SMITH v JONES [2020] UKSC 1", "url": "https://example.com/s1"},
+        {"id": "s2", "title": "Data Protection Act 2018"},
+        {"id": "s3", "title": "Smith v Jones (costs)"},
+    ]
+    validated = validate_citations(extract_citations(JUDGMENT), sources)
+    assert [v["valid"] for v in validated] == [True, False, True, False]
+    assert validated[0]["source_id"] == "s1" and validated[0]["source_url"] == "https://example.com/s1"
+    assert validated[2]["source_id"] == "s2"
+
+    index = KnownSourceIndex(sources)
+    assert index.find("Smith vs. Jones")["id"] == "s1"
+    assert index.find("Jones") is None
+    # Leading words are only dropped while a claimant remains
+    assert index.find("held in v Jones") is None
+    assert validate_citations([{"text": "x", "case_id": "smith v jones"}], index)[0]["valid"]
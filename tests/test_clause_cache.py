@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from backend.app.services import gemini_judge  # noqa: E402
+from rag.clause_cache import ClauseCache, cached_embed_fn, clause_fingerprint, simhash  # noqa: E402
+
+SCC = (
+    "The data importer shall process the personal data only on documented instructions "
+    "from the data exporter, including with regard to transfers to a third country."
+)
+
+
+def test_fingerprint_ignores_case_and_layout():
+    assert clause_fingerprint(SCC) == clause_fingerprint("  " + SCC.upper().replace(" ", "\n  "))
+    assert clause_fingerprint(SCC) != clause_fingerprint(SCC + " Additional wording.")
+
+
+def test_exact_and_near_duplicate_lookups_are_namespaced():
+    cache = ClauseCache()
+    cache.put("verdict", SCC, {"verdict": "compliant"}, key="R01")
+
+    assert cache.get("verdict", SCC.upper(), key="R01") == {"verdict": "compliant"}
+    assert cache.get("verdict", SCC, key="R02") is None
+    assert cache.get("embedding", SCC, key="R01") is None
+
+    variant = SCC.replace("third country", "third countries")
+    assert bin(simhash(SCC) ^ simhash(variant)).count("1") <= cache.near_distance
+    assert cache.get("verdict", variant, key="R01") is None
+    assert cache.get("verdict", variant, key="R01", near=True) == {"verdict": "compliant"}
+    assert cache.get("verdict", "Completely unrelated governing law clause.", key="R01", near=True) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"]) == (1, 1)
+
+
+def test_file_backed_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "clauses.db")
+    ClauseCache(path).put("rules", SCC, ["R01", "R07"], key="gdpr-v1")
+    assert ClauseCache(path).get("rules", SCC, key="gdpr-v1") == ["R01", "R07"]
+
+
+def test_least_recently_used_clauses_are_evicted():
+    cache = ClauseCache(max_entries=10)
+    for i in range(10):
+        cache.put("rules", f"Clause {i}.", [i])
+    assert cache.get("rules", "Clause 0.") == [0]
+    cache.put("rules", "Clause 10.", [10])
+
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"]) == (9, 2)
+    assert cache.get("rules", "Clause 0.") == [0]
+    assert cache.get("rules", "Clause 1.") is None and cache.get("rules", "Clause 2.") is None
+
+
+def test_default_cache_uses_configured_shared_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.db")
+    cache = ClauseCache(path=None)
+    monkeypatch.setenv("RAG_CLAUSE_CACHE_PATH", path)
+    cache.put("rules", SCC, ["R01"], key="gdpr-v1")
+    assert cache.path == path
+    assert ClauseCache(path).get("rules", SCC, key="gdpr-v1") == ["R01"]
+
+
+def test_cached_embed_fn_only_embeds_unseen_clauses():
+    cache = ClauseCache()
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    embed_cached = cached_embed_fn(embed, "test-model", cache)
+    first = asyncio.run(embed_cached([SCC, "Clause two."]))
+    second = asyncio.run(embed_cached(["Clause three.", SCC.lower()]))
+
+    assert calls == [[SCC, "Clause two."], ["Clause three."]]
+    assert second[1] == first[0]
+
+
+def test_gemini_judge_reuses_verdicts_for_known_clauses(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    cache = ClauseCache()
+    monkeypatch.setattr(gemini_judge, "clause_cache", cache)
+    judge = gemini_judge.GeminiJudge()
+    calls = []
+    original = judge._mock_gemini_response
+    monkeypatch.setattr(judge, "_mock_gemini_response", lambda rule, snippet: calls.append(rule) or original(rule, snippet))
+    rule = {"id": "R01", "name": "Lawful basis", "description": "...", "severity": "high", "required": True}
+
+    first = asyncio.run(judge.judge_rule_compliance(rule, SCC, "", []))
+    citation = {"doc_id": "contract-2", "page": 3, "start": 10, "end": 90}
+    second = asyncio.run(judge.judge_rule_compliance(rule, SCC, "", [citation]))
+
+    assert len(calls) == 1
+    assert second.verdict == first.verdict
+    assert second.quotes[0]["citation"] == citation
@@ -6,14 +6,30 @@ from unittest.mock import patch
 # Ensure project root is on path for "src" package
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import pytest
+
+from src.backend.services import document_analysis
 from src.backend.services.document_analysis import DocumentAnalyzer
 
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                       "src", "backend", "tests", "fixtures", "uk_nda.pdf")
+
 
 class StubPage:
     width = 100
     height = 100
     images = [{"x0": 10, "top": 10, "x1": 20, "bottom": 20}]
 
+    def __init__(self, ruled: bool = False) -> None:
+        self.table_calls = 0
+        self.lines = []
+        if ruled:
+            self.lines = [
+                {"x0": 0, "x1": 100, "top": y, "bottom": y} for y in (40, 60)
+            ] + [
+                {"x0": x, "x1": x, "top": 40, "bottom": 60} for x in (0, 100)
+            ]
+
     def extract_text(self) -> str:
         return "HEADER\nClause 1: Hello"
 
@@ -26,12 +42,13 @@ class StubPage:
         ]
 
     def extract_tables(self) -> List[List[List[str]]]:
+        self.table_calls += 1
         return [[["A", "B"], ["1", "2"]]]
 
 
 class StubPDF:
-    def __init__(self) -> None:
-        self.pages = [StubPage()]
+    def __init__(self, *pages: StubPage) -> None:
+        self.pages = list(pages) or [StubPage()]
 
     def __enter__(self):
         return self
@@ -49,3 +66,55 @@ def test_document_analyzer_extracts_elements() -> None:
     assert {"header", "text", "table", "image"}.issubset(types)
     text_elem = next(e for e in doc.elements if e.type == "text" and e.text.startswith("Clause"))
     assert text_elem.bbox is not None
+
+
+def test_profiles_skip_tables_and_images() -> None:
+    plain, ruled = StubPage(), StubPage(ruled=True)
+    with patch("src.backend.services.document_analysis.pdfplumber.open",
+               side_effect=lambda _: StubPDF(plain, ruled)):
+        analyzer = DocumentAnalyzer(profile="text-only")
+        text_only = analyzer.analyze(b"pdf")
+        layout = analyzer.analyze(b"pdf", profile="layout")
+
+    assert {e.type for e in text_only.elements} == {"header", "text"}
+    assert analyzer.to_rag_chunks(text_only) == ["HEADER", "Clause 1: Hello"] * 2
+    # Only the page with ruling lines is searched for tables
+    assert (plain.table_calls, ruled.table_calls) == (0, 1)
+    assert [e.page for e in layout.elements if e.type == "table"] == [2]
+    assert sum(e.type == "image" for e in layout.elements) == 2
+
+    with pytest.raises(ValueError):
+        DocumentAnalyzer(profile="everything")
+
+
+def test_large_documents_are_analysed_in_parallel(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("OCR_CACHE_PATH", str(tmp_path / "ocr_cache.sqlite3"))
+    with open(FIXTURE, "rb") as f:
+        data = f.read()
+    sequential = DocumentAnalyzer(profile="layout").analyze(data)
+    monkeypatch.setattr(document_analysis, "PARALLEL_MIN_PAGES", 2)
+    parallel = DocumentAnalyzer(profile="layout", workers=2).analyze(data)
+
+    assert parallel == sequential
+    assert [e.page for e in parallel.elements] == sorted(e.page for e in parallel.elements)
+    assert {1, 2} <= {e.page for e in parallel.elements}
+    # No page needed OCR, so no worker opened the OCR cache
+    assert not (tmp_path / "ocr_cache.sqlite3").exists()
+
+
+def test_range_workers_ocr_in_process(monkeypatch) -> None:
+    pools = []
+
+    def fake_ocr(render, pool, **kwargs):
+        pools.append(pool)
+        return "scanned text", 90.0, 150
+
+    monkeypatch.setenv("OCR_CACHE_PATH", "off")
+    monkeypatch.setattr(document_analysis, "_range_pool", None)
+    monkeypatch.setattr(document_analysis, "ocr_available", lambda: True)
+    monkeypatch.setattr(document_analysis, "ocr_page_adaptive", fake_ocr)
+    with open(FIXTURE, "rb") as f:
+        elements = document_analysis._analyze_range(f.read(), 0, 2, [True, True], "text-only")
+
+    assert [e.text for e in elements] == ["scanned text", "scanned text"]
+    assert pools[0] is pools[1] and pools[0].in_process and pools[0].cache is None
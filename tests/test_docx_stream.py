@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+import tracemalloc
+import zipfile
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag.docx_stream import docx_text, iter_docx  # noqa: E402
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _docx(body: str) -> bytes:
+    """Minimal DOCX archive around a ``w:body`` fragment."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>")
+        archive.writestr("word/styles.xml", f'<w:styles {W}><w:style w:styleId="Kop1">'
+                                            f'<w:name w:val="heading 1"/></w:style></w:styles>')
+    return buf.getvalue()
+
+
+def _p(text: str, style: str = "") -> str:
+    props = f'<w:pPr><w:pStyle w:val="{style}"/><w:tabs><w:tab w:pos="720"/></w:tabs></w:pPr>' if style else ""
+    return f"<w:p>{props}<w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _cell(*paragraphs: str) -> str:
+    return "<w:tc>" + "".join(paragraphs) + "</w:tc>"
+
+
+def test_blocks_in_document_order_with_offsets():
+    nested = "<w:tbl><w:tr>" + _cell(_p("inner")) + "</w:tr></w:tbl>"
+    body = (
+        _p("Schedule 1", style="Kop1")
+        + '<w:p><w:r><w:t xml:space="preserve">Fees </w:t><w:tab/><w:t>due</w:t><w:br/>'
+          "<w:delText>deleted</w:delText><w:t>monthly</w:t></w:r></w:p>"
+        + "<w:tbl><w:tr>" + _cell(_p("A1")) + _cell(_p("B1"), nested) + "</w:tr>"
+        + "<w:tr>" + _cell(_p("A2")) + _cell(_p("B2")) + "</w:tr></w:tbl>"
+        + _p("End")
+    )
+    data = _docx(body)
+    blocks = list(iter_docx(data))
+    assert [(b.kind, b.text) for b in blocks] == [
+        ("heading", "Schedule 1"),
+        ("paragraph", "Fees \tdue\nmonthly"),
+        ("cell", "A1"), ("cell", "B1\ninner"), ("cell", "A2"), ("cell", "B2"),
+        ("paragraph", "End"),
+    ]
+    text = docx_text(data)
+    assert text == "Schedule 1\nFees \tdue\nmonthly\nA1\tB1\ninner\nA2\tB2\nEnd\n"
+    assert all(text[b.start:b.end] == b.text for b in blocks)
+
+
+def test_memory_stays_bounded_by_the_largest_block():
+    def peak(paragraphs: int) -> int:
+        data = _docx(_p("The Supplier shall keep the Confidential Information secret.") * paragraphs)
+        tracemalloc.start()
+        try:
+            for _ in iter_docx(data):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(2_000), peak(20_000)
+    assert large < 2 * small
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag.layout import group_lines  # noqa: E402
+
+
+def _word(text, x0, top, height=10):
+    return {"text": text, "x0": x0, "x1": x0 + 6 * len(text), "top": top, "bottom": top + height}
+
+
+WORDS = [
+    _word("1.", 10, 100), _word("Definitions", 25, 100.5),
+    _word("The", 10, 120), _word("Supplier", 40, 121), _word("shall", 100, 120),
+    _word("Page", 10, 700, height=8),
+]
+
+
+def test_lines_in_reading_order_with_offsets_and_boxes():
+    lines = group_lines(WORDS, tolerance=3)
+    assert lines.text == "1. Definitions\nThe Supplier shall\nPage"
+    assert [lines.line(i) for i in range(len(lines))] == lines.text.split("\n")
+    assert lines.bbox.tolist() == [[10, 100, 91, 110.5], [10, 120, 130, 131], [10, 700, 34, 708]]
+    assert [lines.text[s:e] for s, e in zip(lines.words.start, lines.words.end)] == [w["text"] for w in WORDS]
+    assert list(lines)[1] == ("The Supplier shall", (10.0, 120.0, 130.0, 131.0))
+
+
+def test_sorted_grouping_orders_words_left_to_right():
+    shuffled = [WORDS[i] for i in (5, 4, 1, 3, 0, 2)]
+    lines = group_lines(shuffled, tolerance=2, sort=True)
+    assert lines.text == "1. Definitions\nThe Supplier shall\nPage"
+    assert np.array_equal(lines.words.x0, [10, 25, 10, 40, 100, 10])
+
+
+def test_empty_page():
+    lines = group_lines([])
+    assert lines.text == "" and len(lines) == 0 and lines.bbox.shape == (0, 4)
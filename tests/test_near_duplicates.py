@@ -0,0 +1,94 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from backend.services.near_duplicates import (  # noqa: E402
+    LSHIndex,
+    changed_regions,
+    estimate_jaccard,
+    minhash_signature,
+    partition_for_reuse,
+    segment_hashes,
+)
+
+CLAUSES = [
+    "The processor shall process personal data only on documented instructions from the controller.",
+    "The processor shall ensure that persons authorised to process the personal data have committed "
+    "themselves to confidentiality.",
+    "The processor shall not engage another processor without prior specific or general written "
+    "authorisation of the controller.",
+    "Taking into account the nature of the processing, the processor shall assist the controller by "
+    "appropriate technical and organisational measures.",
+    "At the choice of the controller, the processor shall delete or return all the personal data after "
+    "the end of the provision of services.",
+] * 4
+
+
+def _contract(party: str, date: str, extra: str = "") -> str:
+    header = f"This agreement is made on {date} between {party} and Example Controller Ltd."
+    return "\n\n".join([header, *CLAUSES, extra]).strip()
+
+
+def _issue(rule_id, compliant, citation=None):
+    return SimpleNamespace(rule_id=rule_id, compliant=compliant, citation=citation)
+
+
+def test_template_variants_are_near_duplicates():
+    a = minhash_signature(_contract("Acme Corp", "1 March 2024"))
+    b = minhash_signature(_contract("Globex Inc", "7 June 2025"))
+    unrelated = minhash_signature("Sale of goods. The buyer pays on delivery. Title passes on payment. " * 20)
+
+    index = LSHIndex()
+    index.add("job-a", a)
+    index.add("job-x", unrelated)
+
+    assert estimate_jaccard(a, b) > 0.85
+    assert [key for key, _ in index.query(b)] == ["job-a"]
+    index.remove("job-a")
+    assert index.query(b) == []
+
+
+def test_changed_regions_are_paragraph_diffs():
+    prior = _contract("Acme Corp", "1 March 2024")
+    new = _contract("Acme Corp", "1 March 2024", extra="Sub-processors may be engaged at will.")
+    assert changed_regions(new, segment_hashes(prior)) == "Sub-processors may be engaged at will."
+
+
+def test_partition_inherits_follow_ups_of_unchanged_findings():
+    prior = [
+        _issue("instructions", True, '"documented instructions..."'),
+        _issue("instructions_adequacy_check", False),
+        _issue("sub_processors", True, '"written authorisation..."'),
+        _issue("sub_processors_adequacy_check", False),
+        _issue("breach_notice", False),
+        _issue("breach_notice_llm_enhanced", False),
+    ]
+    current = [
+        _issue("instructions", True, '"documented instructions..."'),
+        _issue("sub_processors", True, '"written authorisation..."'),
+        _issue("breach_notice", True, '"notify without undue delay..."'),
+        _issue("audits", False),
+    ]
+    changed = "Sub-processors require written authorisation in all cases.\n\nWe notify without undue delay."
+
+    inherited, to_analyse = partition_for_reuse(current, prior, changed)
+
+    assert [i.rule_id for i in inherited] == ["instructions_adequacy_check"]
+    assert [i.rule_id for i in to_analyse] == ["sub_processors", "breach_notice", "audits"]
+
+
+def test_partition_reanalyses_findings_whose_prior_follow_up_failed():
+    prior = [
+        _issue("instructions", True, '"documented instructions..."'),
+        _issue("breach_notice", False),
+    ]
+    current = [
+        _issue("instructions", True, '"documented instructions..."'),
+        _issue("breach_notice", False),
+    ]
+
+    inherited, to_analyse = partition_for_reuse(current, prior, "", failed=["breach_notice"])
+
+    assert inherited == []
+    assert [i.rule_id for i in to_analyse] == ["breach_notice"]
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.backend.app.core import ocr  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                       "src", "backend", "tests", "fixtures", "uk_nda.pdf")
+
+
+def test_extract_document_parses_once_and_maps_spans(monkeypatch):
+    ocr.clear_document_cache()
+    calls = []
+    extract_pages = ocr._extract_pages
+    monkeypatch.setattr(ocr, "_extract_pages", lambda data, doc: calls.append(1) or extract_pages(data, doc))
+
+    with open(FIXTURE, "rb") as f:
+        data = f.read()
+    document = ocr.extract_document(data)
+    assert ocr.extract_text(data) == document.text
+    assert ocr.extract_text_with_locations(FIXTURE) is document.spans
+    assert calls == [1]
+
+    assert document.page_count == 2 and document.page_confidence == [None, None]
+    assert document.text.count(ocr.PAGE_SEPARATOR) == 1
+    assert all(document.text[s.start:s.end] == s.text for s in document.spans)
+    assert all(document.page_at(s.start) == s.page_num for s in document.spans)
+    assert document.page_text(1).startswith("MUTUAL NON-DISCLOSURE AGREEMENT")
+    assert ocr.PAGE_SEPARATOR not in document.page_text(1)
@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag import ocr_pool  # noqa: E402
+
+
+class FakeEngine:
+    """Reports the image it received instead of running Tesseract."""
+
+    instances = 0
+
+    def __init__(self, lang):
+        FakeEngine.instances += 1
+        self.lang = lang
+
+    def image_to_string(self, image, config=""):
+        return f"{self.lang}:{image.mode}:{image.size}:{int(np.asarray(image).sum())}:{os.getpid()}"
+
+    def image_to_data(self, image, config=""):
+        return {"text": ["word"], "conf": [91.0], "left": [0], "top": [0], "width": [image.width],
+                "height": [image.height], "block_num": [1], "par_num": [1], "line_num": [1]}
+
+
+def _page(value):
+    return Image.fromarray(np.full((40, 30, 3), value, dtype=np.uint8))
+
+
+def test_pool_streams_pages_through_shared_memory(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "TesseractEngine", FakeEngine)
+    pool = ocr_pool.OCRPool(workers=2, lang="eng")
+    try:
+        texts = pool.map_strings([_page(1), _page(2), _page(3)])
+        assert [t.split(":")[:4] for t in texts] == [
+            ["eng", "L", "(30, 40)", str(v * 1200)] for v in (1, 2, 3)
+        ]
+        assert all(int(t.split(":")[4]) != os.getpid() for t in texts)
+        assert pool.image_to_data(_page(0), lang="deu")["width"] == [30]
+    finally:
+        pool.close()
+
+
+async def test_pool_runs_in_process_with_one_worker(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "TesseractEngine", FakeEngine)
+    monkeypatch.setattr(ocr_pool, "_engines", {})
+    FakeEngine.instances = 0
+    pool = ocr_pool.OCRPool(workers=1, lang="eng")
+    assert pool.in_process
+    first = await pool.aimage_to_string(_page(5))
+    await pool.aimage_to_string(_page(6))
+    assert first.split(":")[1] == "RGB" and int(first.split(":")[4]) == os.getpid()
+    assert FakeEngine.instances == 1
+
+
+class SlowTessAPI:
+    """Stand-in for ``tesserocr.PyTessBaseAPI`` that yields between calls."""
+
+    def SetPageSegMode(self, mode):
+        pass
+
+    def SetImage(self, image):
+        self.image = image
+        time.sleep(0.01)
+
+    def GetUTF8Text(self):
+        return str(int(np.asarray(self.image).sum()))
+
+
+def test_engine_serialises_concurrent_pages(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "tesserocr", SimpleNamespace(PSM=SimpleNamespace(AUTO=3)))
+    engine = ocr_pool.TesseractEngine.__new__(ocr_pool.TesseractEngine)
+    engine.lang, engine._api, engine._lock = "eng", SlowTessAPI(), threading.Lock()
+    with ThreadPoolExecutor(max_workers=8) as threads:
+        texts = list(threads.map(lambda v: engine.image_to_string(_page(v)), range(8)))
+    assert texts == [str(v * 3600) for v in range(8)]
+
+
+def test_pool_serves_repeated_pages_from_cache(monkeypatch, tmp_path):
+    from rag.ocr_cache import OCRCache
+
+    monkeypatch.setattr(ocr_pool, "TesseractEngine", FakeEngine)
+    monkeypatch.setattr(ocr_pool, "_engines", {})
+    FakeEngine.instances = 0
+    cache = OCRCache(str(tmp_path / "ocr.sqlite3"))
+    pool = ocr_pool.OCRPool(workers=1, cache=cache)
+
+    first = pool.image_to_string(_page(7))
+    assert pool.image_to_string(_page(7)) == first
+    assert pool.image_to_string(_page(7), config="--psm 6") == first  # different key, re-run
+    assert pool.image_to_data(_page(7))["width"] == [30]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+
+    reopened = OCRCache(str(tmp_path / "ocr.sqlite3"))
+    assert reopened.stats()["entries"] == 3 and reopened.stats()["bytes"] == stats["bytes"]
+
+
+def test_cache_evicts_least_recently_used_pages():
+    from rag.ocr_cache import OCRCache
+
+    cache = OCRCache(max_bytes=100)
+    for i in range(4):
+        cache.put(f"k{i}", "x" * 28)  # 30 bytes as JSON
+        cache.get("k0")
+    assert cache.get("k0") is not None and cache.get("k1") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= 100
+
+
+def test_cache_bound_holds_across_processes_sharing_the_file(tmp_path):
+    from rag.ocr_cache import OCRCache
+
+    path = str(tmp_path / "ocr.sqlite3")
+    caches = [OCRCache(path, max_bytes=100) for _ in range(3)]
+    for i in range(9):
+        caches[i % 3].put(f"k{i}", "x" * 28)  # 30 bytes as JSON; 90 per instance
+    assert caches[0].stats()["bytes"] <= 100
+    assert caches[1].get("k8") is not None and caches[1].get("k0") is None
+
+
+class CommandEngine(FakeEngine):
+    def image_to_string(self, image, config=""):
+        return ocr_pool.pytesseract.pytesseract.tesseract_cmd
+
+
+def test_workers_use_the_current_tesseract_command(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "TesseractEngine", CommandEngine)
+    monkeypatch.setattr(ocr_pool.pytesseract.pytesseract, "tesseract_cmd", "/opt/tesseract-a")
+    pool = ocr_pool.OCRPool(workers=2, lang="eng")
+    try:
+        assert pool.image_to_string(_page(1)) == "/opt/tesseract-a"
+        # Set after the workers started, as OCRProcessor may do
+        ocr_pool.pytesseract.pytesseract.tesseract_cmd = "/opt/tesseract-b"
+        assert pool.map_strings([_page(2), _page(3)]) == ["/opt/tesseract-b"] * 2
+    finally:
+        pool.close()
+
+    monkeypatch.setattr(ocr_pool, "_engines", {})
+    ocr_pool._init_worker("eng", "/opt/tesseract-c")
+    assert ocr_pool.pytesseract.pytesseract.tesseract_cmd == "/opt/tesseract-c"
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag import ocr_pool, ocr_preprocess  # noqa: E402
+
+
+def _text_page(width=400, height=300, angle=0.0):
+    """White page with dark horizontal bars standing in for text lines."""
+    page = np.full((height, width), 230, dtype=np.uint8)
+    for top in range(60, 240, 30):
+        page[top:top + 8, 60:340] = 20
+    image = Image.fromarray(page)
+    return image.rotate(angle, fillcolor=230) if angle else image
+
+
+def test_otsu_separates_ink_from_paper():
+    grey = np.asarray(_text_page())
+    threshold = ocr_preprocess.otsu_threshold(grey)
+    assert 20 <= threshold < 230
+    assert ocr_preprocess.ink_mask(grey).sum() == 6 * 8 * 280
+
+
+def test_skew_is_estimated_by_projection_profile():
+    for angle in (0.0, 2.0, -3.0):
+        ink = ocr_preprocess.ink_mask(np.asarray(_text_page(angle=angle)))
+        assert abs(ocr_preprocess.estimate_skew(ink) - angle) <= 0.5
+
+
+def test_preprocess_crops_binarises_and_skips_blank_pages():
+    page = ocr_preprocess.preprocess(_text_page().convert("RGB"))
+    assert page.mode == "L"
+    assert set(np.unique(np.asarray(page))) == {0, 255}
+    assert page.size == (280 + 2 * ocr_preprocess.CROP_MARGIN, 158 + 2 * ocr_preprocess.CROP_MARGIN)
+    assert ocr_preprocess.preprocess(Image.new("L", (50, 50), 255)) is None
+
+
+class ConfidenceEngine:
+    """Confidence grows with the page width, i.e. with the render DPI."""
+
+    def __init__(self, lang):
+        self.lang = lang
+
+    def image_to_data(self, image, config=""):
+        conf = 90.0 if image.width > 200 else 40.0
+        return {"text": ["Clause", "one", ""], "conf": [conf, conf, -1], "left": [0, 0, 0],
+                "top": [0, 0, 0], "width": [1, 1, 1], "height": [1, 1, 1],
+                "block_num": [1, 1, 1], "par_num": [1, 1, 1], "line_num": [1, 2, 2]}
+
+
+def test_adaptive_ocr_only_rerenders_low_confidence_pages(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "TesseractEngine", ConfidenceEngine)
+    monkeypatch.setattr(ocr_pool, "_engines", {})
+    pool = ocr_pool.OCRPool(workers=1)
+    rendered = []
+
+    def renderer(scale):
+        def render(dpi):
+            rendered.append((scale, dpi))
+            return _text_page(width=int(400 * scale * dpi / 150), height=300)
+        return render
+
+    blank = lambda dpi: Image.new("L", (100, 100), 255)  # noqa: E731
+    results = ocr_preprocess.ocr_pages_adaptive([renderer(1.0), renderer(0.5), blank], pool,
+                                                min_confidence=75)
+    assert results[0] == ("Clause\none", 90.0, 150)
+    assert results[1] == ("Clause\none", 90.0, 300)
+    assert results[2] == ("", 0.0, 150)
+    assert rendered == [(1.0, 150), (0.5, 150), (0.5, 300)]
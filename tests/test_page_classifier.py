@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag import page_classifier  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                       "src", "backend", "tests", "fixtures", "uk_nda.pdf")
+
+TITLE = "SCHEDULE 2 - SIGNED COUNTERPART OF THE SUPPLY AGREEMENT DATED 1 MAY 2025"
+HEADER = f"BT /F1 12 Tf 72 750 Td ({TITLE}) Tj ET\n"
+BODY = "".join(f"BT /F1 11 Tf 72 {700 - 14 * i} Td (Clause {i}. The Supplier shall keep all "
+               f"information confidential.) Tj ET\n" for i in range(20))
+
+
+def _pdf(pages):
+    """Build a PDF from ``(content stream, image (width, height) drawn or None)`` pairs."""
+    writer = PdfWriter()
+    for content, drawn in pages:
+        page = writer.add_blank_page(612, 792)
+        font = DictionaryObject({NameObject("/Type"): NameObject("/Font"),
+                                 NameObject("/Subtype"): NameObject("/Type1"),
+                                 NameObject("/BaseFont"): NameObject("/Helvetica")})
+        resources = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        if drawn:
+            image = DecodedStreamObject()
+            image.set_data(bytes(16))
+            image.update({NameObject("/Type"): NameObject("/XObject"),
+                          NameObject("/Subtype"): NameObject("/Image"),
+                          NameObject("/Width"): NumberObject(4), NameObject("/Height"): NumberObject(4),
+                          NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                          NameObject("/BitsPerComponent"): NumberObject(8)})
+            resources[NameObject("/XObject")] = DictionaryObject({NameObject("/Im0"): writer._add_object(image)})
+            content = f"q {drawn[0]} 0 0 {drawn[1]} 0 0 cm /Im0 Do Q\n" + content
+        stream = DecodedStreamObject()
+        stream.set_data(content.encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = resources
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def test_text_pages_are_classified_from_content_streams():
+    pages = page_classifier.classify_pdf(FIXTURE)
+    assert [p.kind for p in pages] == ["text", "text"]
+    assert pages[0].char_count > 1000 and pages[0].font_count == 1
+    assert not any(p.needs_ocr for p in pages)
+
+
+def test_scanned_mixed_and_blank_pages():
+    data = _pdf([
+        ("", (612, 792)),            # scanned page
+        (HEADER, (612, 700)),        # text header over a scanned body
+        (BODY, (60, 40)),            # text page with a small logo
+        (HEADER + BODY, (612, 792)),  # searchable scan with a text layer
+        ("", None),                  # blank page
+    ])
+    pages = page_classifier.classify_pdf(data)
+    assert [p.kind for p in pages] == ["scanned", "mixed", "text", "text", "blank"]
+    assert [p.needs_ocr for p in pages] == [True, True, False, False, False]
+    assert pages[0].image_coverage == 1.0
+    assert pages[1].char_count == len(TITLE)
+
+
+def test_large_documents_are_classified_in_parallel(monkeypatch):
+    monkeypatch.setattr(page_classifier, "PARALLEL_MIN_PAGES", 2)
+    data = _pdf([(BODY, None), ("", (612, 792))] * 3 + [(HEADER, (612, 792))])
+    pages = page_classifier.classify_pdf(data, workers=3)
+    assert [p.page_num for p in pages] == list(range(1, 8))
+    assert [p.kind for p in pages] == ["text", "scanned"] * 3 + ["mixed"]
+    assert pages == page_classifier.classify_pdf(data, workers=1)
+
+
+def test_inline_images_and_undetected_drawings_need_ocr():
+    inline = "q 612 0 0 792 0 0 cm BI /W 4 /H 4 /CS /G /BPC 8 ID " + "\x00" * 16 + " EI Q\n"
+    data = _pdf([(inline, None), ("q 1 0 0 1 0 0 cm 0 0 m 612 792 l S Q\n", None), ("", None)])
+    pages = page_classifier.classify_pdf(data)
+    assert [p.kind for p in pages] == ["scanned", "scanned", "blank"]
+    assert pages[0].image_count == 1 and pages[0].image_coverage == 1.0
+    assert [p.needs_ocr for p in pages] == [True, True, False]
@@ -0,0 +1,62 @@
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from engine.pipeline import bounded_map, contract_files, run_pipeline  # noqa: E402
+from engine.rules import Rule  # noqa: E402
+from rag.index import IndexManifest  # noqa: E402
+
+RULES = [
+    Rule(id="breach", title="Breach notice", severity="high", guidance="", citations=[],
+         pattern=r"without undue delay"),
+    Rule(id="audit", title="Audit", severity="low", guidance="", citations=[], keywords=["audit", "records"]),
+]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.ids = []
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.ids.extend(ids)
+
+    def delete(self, ids):
+        self.ids = [i for i in self.ids if i not in ids]
+
+
+def test_bounded_map_limits_items_in_flight():
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        stream = bounded_map(pool, lambda x: x * x, items(), max_pending=3)
+        first = next(stream)
+        assert len(consumed) <= 4
+        results = dict([first, *stream])
+    assert results == {i: i * i for i in range(10)}
+
+
+def test_pipeline_streams_files_to_findings_and_index(tmp_path):
+    (tmp_path / "a.txt").write_text(
+        "1 BREACH\nThe processor shall notify the controller without undue delay.\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("2 AUDIT\nThe processor keeps records for audit.\n", encoding="utf-8")
+    (tmp_path / "c.docx").write_bytes(b"not a zip")
+    (tmp_path / "notes.md").write_text("ignored", encoding="utf-8")
+
+    out = io.StringIO()
+    collection = FakeCollection()
+    stats = run_pipeline(contract_files(str(tmp_path)), RULES, out, collection=collection,
+                         manifest=IndexManifest(), ingest_workers=2, rules_workers=1)
+
+    findings = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(f["rule_id"] for f in findings) == ["audit", "breach"]
+    assert all(f["chunk_id"] for f in findings)
+    assert (stats.files, stats.failed, stats.findings) == (3, 1, 2)
+    assert stats.index["indexed"] == stats.chunks == len(collection.ids)
@@ -3,8 +3,18 @@ import os
 import sys
 from types import SimpleNamespace
 
+import pytest
+
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import rag
+from rag.cache import AnswerCache
+
+
+@pytest.fixture(autouse=True)
+def _reset_rag_caches():
+    rag.clear_caches()
+    yield
+    rag.clear_caches()
 
 
 def test_refuses_on_low_score():
@@ -82,3 +92,108 @@ def test_preserves_existing_citations(monkeypatch):
     assert len(res["citations"]) == 2
     assert res["citations"][0]["source_id"] == "A"
     assert res["citations"][1]["source_id"] == "B"
+
+
+def _install_counting_model(monkeypatch, counter):
+    class FakeGeminiModel:
+        def generate_content(self, prompt):
+            counter["calls"] += 1
+            payload = {"answer": "Cached.", "citations": [], "confidence": 0.7}
+            return SimpleNamespace(text=json.dumps(payload))
+
+    def fake_GenerativeModel(model_name):
+        counter["clients"] += 1
+        return FakeGeminiModel()
+
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(rag.genai, "configure", lambda api_key: None)
+    monkeypatch.setattr(rag.genai, "GenerativeModel", fake_GenerativeModel)
+
+
+@pytest.mark.skipif(rag.genai is None, reason="google-generativeai not installed")
+def test_exact_cache_hit_skips_model_and_reuses_client(monkeypatch):
+    counter = {"calls": 0, "clients": 0}
+    _install_counting_model(monkeypatch, counter)
+    contexts = [
+        {"source_id": "A", "page": 1, "content": "foo", "score": 0.9},
+        {"source_id": "B", "page": 2, "content": "bar", "score": 0.8},
+    ]
+
+    first = rag.generate_answer("What is  the term?", contexts)
+    second = rag.generate_answer("what is the term", list(reversed(contexts)))
+    assert first == second
+    assert counter["calls"] == 1
+
+    # Changing a chunk's content changes the context fingerprint.
+    changed = [dict(contexts[0], content="foo v2"), contexts[1]]
+    rag.generate_answer("What is the term?", changed)
+    assert counter["calls"] == 2
+    assert counter["clients"] == 1
+
+    stats = rag.answer_cache.stats()
+    assert stats["exact_hits"] == 1
+    assert stats["misses"] == 2
+
+
+@pytest.mark.skipif(rag.genai is None, reason="google-generativeai not installed")
+def test_non_json_replies_are_not_cached(monkeypatch):
+    counter = {"calls": 0}
+
+    def fake_generate_content(prompt):
+        counter["calls"] += 1
+        return SimpleNamespace(text="Not JSON")
+
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(rag.genai, "configure", lambda api_key: None)
+    monkeypatch.setattr(rag.genai, "GenerativeModel",
+                        lambda name: SimpleNamespace(generate_content=fake_generate_content))
+    contexts = [{"source_id": "A", "page": 1, "content": "foo", "score": 0.9}]
+
+    assert rag.generate_answer("question", contexts)["answer"] == "Not JSON"
+    rag.generate_answer("question", contexts)
+    assert counter["calls"] == 2
+    assert rag.answer_cache.stats()["size"] == 0
+
+
+@pytest.mark.skipif(rag.genai is None, reason="google-generativeai not installed")
+def test_cached_answer_confidence_follows_retrieval_scores(monkeypatch):
+    def fake_generate_content(prompt):
+        return SimpleNamespace(text=json.dumps({"answer": "Cached.", "citations": []}))
+
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(rag.genai, "configure", lambda api_key: None)
+    monkeypatch.setattr(rag.genai, "GenerativeModel",
+                        lambda name: SimpleNamespace(generate_content=fake_generate_content))
+    contexts = [{"source_id": "A", "page": 1, "content": "foo", "score": 0.9}]
+
+    assert rag.generate_answer("question", contexts)["confidence"] == 0.9
+    weaker = [dict(contexts[0], score=0.6)]
+    assert rag.generate_answer("question", weaker)["confidence"] == 0.6
+    assert rag.answer_cache.stats()["exact_hits"] == 1
+
+
+def test_semantic_tier_is_scoped_to_context_set():
+    cache = AnswerCache(similarity_threshold=0.9)
+    ctx_a = [{"source_id": "A", "page": 1, "content": "foo"}]
+    ctx_b = [{"source_id": "B", "page": 1, "content": "bar"}]
+    cache.put("How long is notice?", ctx_a, "m", {"answer": "30 days"}, [1.0, 0.0])
+
+    assert cache.get("What notice period?", ctx_a, "m", [0.99, 0.05]) == {"answer": "30 days"}
+    assert cache.get("What notice period?", ctx_b, "m", [0.99, 0.05]) is None
+    assert cache.get("Unrelated?", ctx_a, "m", [0.0, 1.0]) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_cache_lru_ttl_and_invalidation():
+    ctx = [{"source_id": "A", "page": 1, "content": "foo"}]
+    cache = AnswerCache(max_entries=2)
+    for q in ("one", "two", "three"):
+        cache.put(q, ctx, "m", {"answer": q})
+    assert cache.get("one", ctx, "m") is None
+    assert cache.get("three", ctx, "m") == {"answer": "three"}
+    assert cache.invalidate("A") == 2
+    assert cache.stats()["size"] == 0
+
+    expired = AnswerCache(ttl_seconds=1e-9)
+    expired.put("q", ctx, "m", {"answer": "x"})
+    assert expired.get("q", ctx, "m") is None
@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag.cache import AnswerCache  # noqa: E402
+from rag.index import IndexManifest, index_chunks, read_chunks  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.upserts = []
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.upserts.append(len(ids))
+        for i, doc, meta in zip(ids, documents, metadatas):
+            self.docs[i] = (doc, meta, embeddings)
+
+    def delete(self, ids):
+        for i in ids:
+            self.docs.pop(i, None)
+
+
+def _chunks(contract_id, texts, prefix=""):
+    return [
+        {"id": f"{prefix}{contract_id}-{i}", "contract_id": contract_id, "section": "1 TERMS",
+         "text": text, "page": 1, "tokens": len(text.split())}
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_index_batches_and_reruns_only_touch_changed_chunks():
+    collection = FakeCollection()
+    manifest = IndexManifest()
+    embedded = []
+
+    def embed(texts):
+        embedded.append(len(texts))
+        return [[1.0, float(len(t))] for t in texts]
+
+    first = _chunks("a", ["one", "two", "three"]) + _chunks("b", ["four", "five"])
+    stats = index_chunks(first, collection, manifest, batch_size=2, embed_fn=embed)
+    assert (stats.documents, stats.upserted, stats.batches) == (2, 5, 3)
+    assert collection.upserts == [2, 2, 1] and embedded == [2, 2, 1]
+    assert collection.docs["a-0"][1]["source"] == "a" and len(manifest) == 5
+
+    again = index_chunks(first, collection, manifest, batch_size=2, embed_fn=embed)
+    assert (again.upserted, again.unchanged, again.deleted) == (0, 5, 0)
+
+    # Contract "a" edited: one chunk changed, one removed; "b" re-ingested with new ids.
+    edited = _chunks("a", ["one", "TWO"]) + _chunks("b", ["four", "five"], prefix="new-")
+    stats = index_chunks(edited, collection, manifest, batch_size=2)
+    assert (stats.upserted, stats.unchanged, stats.deleted) == (1, 3, 1)
+    assert sorted(collection.docs) == ["a-0", "a-1", "b-0", "b-1"]
+    assert collection.docs["a-1"][0] == "TWO"
+
+
+def test_read_chunks_streams_ingest_jsonl(tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text("\n".join(json.dumps(c) for c in _chunks("c", ["x", "y"])) + "\n\n", encoding="utf-8")
+    assert [c["id"] for c in read_chunks(str(path))] == ["c-0", "c-1"]
+
+
+def test_prune_missing_deletes_contracts_absent_from_input():
+    collection = FakeCollection()
+    manifest = IndexManifest()
+    index_chunks(_chunks("a", ["one"]) + _chunks("b", ["two", "three"]), collection, manifest)
+
+    stats = index_chunks(_chunks("a", ["one"]), collection, manifest)
+    assert stats.deleted == 0 and len(collection.docs) == 3
+
+    stats = index_chunks(_chunks("a", ["one"]), collection, manifest, prune_missing=True)
+    assert stats.deleted == 2 and sorted(collection.docs) == ["a-0"] and len(manifest) == 1
+
+
+def test_reindexing_a_contract_invalidates_its_cached_answers():
+    collection = FakeCollection()
+    manifest = IndexManifest()
+    cache = AnswerCache()
+    index_chunks(_chunks("a", ["one"]) + _chunks("b", ["two"]), collection, manifest, cache=cache)
+    for contract_id in ("a", "b"):
+        contexts = [{"source_id": f"{contract_id}-0", "contract_id": contract_id, "page": 1, "content": "x"}]
+        cache.put("question", contexts, "m", {"answer": contract_id})
+
+    index_chunks(_chunks("a", ["one"]) + _chunks("b", ["two"]), collection, manifest, cache=cache)
+    assert cache.stats()["size"] == 2
+    index_chunks(_chunks("a", ["one v2"]) + _chunks("b", ["two"]), collection, manifest, cache=cache)
+    assert cache.stats()["size"] == 1 and cache.stats()["invalidations"] == 1
+
+
+def test_chunks_of_interleaved_contracts_are_indexed_per_contract():
+    collection = FakeCollection()
+    manifest = IndexManifest()
+    a, b = _chunks("a", ["one", "two", "three"]), _chunks("b", ["four", "five"])
+    interleaved = [a[0], b[0], a[1], b[1], a[2]]
+    stats = index_chunks(interleaved, collection, manifest, batch_size=1)
+    assert (stats.documents, stats.chunks, stats.upserted) == (2, 5, 5)
+
+    # Re-ingested with fresh ids, still interleaved, "three" dropped from "a".
+    a, b = _chunks("a", ["one", "two"], prefix="new-"), _chunks("b", ["four", "five"], prefix="new-")
+    stats = index_chunks([b[0], a[0], b[1], a[1]], collection, manifest, batch_size=1)
+    assert (stats.documents, stats.upserted, stats.unchanged, stats.deleted) == (2, 0, 4, 1)
+    assert sorted(collection.docs) == ["a-0", "a-1", "b-0", "b-1"]
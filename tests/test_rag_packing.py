@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rag.packing import count_tokens, pack_contexts, truncate_to_tokens  # noqa: E402
+
+TEXT = (
+    "The Supplier shall process personal data only on documented instructions. "
+    "The Supplier shall ensure that persons authorised to process the data are "
+    "bound by confidentiality. The Supplier shall notify the Customer of any "
+    "personal data breach without undue delay."
+)
+
+
+def test_overlapping_chunks_are_stripped_and_merged():
+    first, second = TEXT[:150], TEXT[100:]
+    contexts = [
+        {"source_id": "dpa", "page": 1, "content": second, "score": 0.7, "start": 100, "end": len(TEXT)},
+        {"source_id": "dpa", "page": 1, "content": first, "score": 0.9, "start": 0, "end": 150},
+    ]
+    result = pack_contexts(contexts, budget=1000)
+    assert len(result.contexts) == 1
+    assert result.contexts[0].content == TEXT
+    assert result.contexts[0].score == 0.9
+    assert result.total_tokens < result.input_tokens
+
+
+def test_overlap_across_pages_keeps_both_citations():
+    contexts = [
+        {"source_id": "dpa", "page": 1, "content": TEXT[:150], "score": 0.9},
+        {"source_id": "dpa", "page": 2, "content": TEXT[100:], "score": 0.8},
+    ]
+    result = pack_contexts(contexts, budget=1000)
+    assert [(c.source_id, c.page) for c in result.contexts] == [("dpa", 1), ("dpa", 2)]
+    assert result.contexts[1].content == TEXT[150:].lstrip()
+
+
+def test_near_duplicates_collapse_into_aliases():
+    contexts = [
+        {"source_id": "A", "page": 1, "content": TEXT, "score": 0.9},
+        {"source_id": "B", "page": 4, "content": TEXT.replace("Customer", "customer"), "score": 0.5},
+    ]
+    result = pack_contexts(contexts, budget=1000)
+    assert len(result.contexts) == 1
+    assert result.contexts[0].tag == "[A:1][B:4]"
+
+
+def test_budget_is_filled_by_score():
+    contexts = [
+        {"source_id": "low", "page": 1, "content": "alpha beta gamma delta", "score": 0.1},
+        {"source_id": "high", "page": 1, "content": "one two three four", "score": 0.9},
+    ]
+    result = pack_contexts(contexts, budget=5)
+    assert [c.source_id for c in result.contexts] == ["high"]
+    assert result.dropped == 1
+    assert result.total_tokens <= 5
+
+
+def test_truncate_to_tokens():
+    assert count_tokens(truncate_to_tokens(TEXT, 10)) == 10
+    assert truncate_to_tokens("short", 10) == "short"
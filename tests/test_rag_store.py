@@ -0,0 +1,292 @@
+import numpy as np
+
+from backend.app.services.metadata_index import MetadataIndex, RowBitmap
+from backend.app.services.rag_store import RAGStore
+
+
+def _store_with_docs() -> RAGStore:
+    store = RAGStore(embedding_dim=2)
+    docs = [
+        ("doc-a", "Alpha clause. " * 5, {"ruleset": "gdpr", "severity": "high"}),
+        ("doc-b", "Beta clause. " * 5, {"ruleset": "gdpr", "severity": "low"}),
+        ("doc-c", "Gamma clause. " * 5, {"ruleset": "aml", "severity": "high"}),
+    ]
+    for i, (doc_id, text, metadata) in enumerate(docs):
+        chunks = store.chunk_text(text, doc_id, metadata=metadata)
+        store.embed_chunks(chunks, [[1.0, float(i)] for _ in chunks])
+    return store
+
+
+def test_row_bitmap_rows_roundtrip():
+    bitmap = RowBitmap()
+    for row in (0, 3, 64, 130):
+        bitmap.add(row)
+    bitmap.discard(3)
+    assert bitmap.rows().tolist() == [0, 64, 130]
+    assert len(bitmap) == 3
+    assert 64 in bitmap and 3 not in bitmap
+
+
+def test_row_bitmap_sparse_and_dense_blocks_agree_with_sets():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    dense = set(range(0, 70000, 2))          # block 0 dense, block 1 sparse
+    sparse = set(rng.integers(0, 200000, 3000).tolist())
+    bulk = RowBitmap(sorted(dense))
+    single = RowBitmap()
+    for row in sparse:
+        single.add(row)
+    for row in list(dense)[::7]:
+        bulk.discard(row)
+        dense.discard(row)
+
+    assert bulk.rows().tolist() == sorted(dense) and len(bulk) == len(dense)
+    assert (bulk & single).rows().tolist() == sorted(dense & sparse)
+    assert (bulk | single).rows().tolist() == sorted(dense | sparse)
+    assert max(dense) in bulk and max(dense) + 1 not in bulk
+
+
+def test_metadata_index_intersects_and_unions():
+    index = MetadataIndex(["ruleset", "severity"])
+    index.add(0, {"ruleset": "gdpr", "severity": "high"})
+    index.add(1, {"ruleset": "gdpr", "severity": "low"})
+    index.add(2, {"ruleset": "aml", "severity": "high"})
+    assert index.match({}) is None
+    assert index.match({"ruleset": "gdpr", "severity": "high"}).rows().tolist() == [0]
+    assert index.match({"severity": ["high", "low"], "ruleset": "aml"}).rows().tolist() == [2]
+    assert not index.match({"ruleset": "missing"})
+    index.remove(0, {"ruleset": "gdpr", "severity": "high"})
+    assert index.count("severity", "high") == 1
+
+
+def test_bitmap_results_do_not_alias_index_containers():
+    index = MetadataIndex(["ruleset"])
+    index.add_many(range(5000), [{"ruleset": "gdpr"}] * 5000)  # one dense block
+    matched = index.match({"ruleset": ["gdpr", "aml"]})
+    matched.discard(0)
+    (RowBitmap(range(5000)) | RowBitmap([70000])).discard(1)
+
+    assert 0 not in matched
+    assert index.count("ruleset", "gdpr") == 5000
+    assert 0 in index.match({"ruleset": "gdpr"})
+
+
+def test_unindexed_filters_fall_back_to_row_predicate():
+    index = MetadataIndex(["ruleset"])
+    rows = [{"ruleset": "gdpr", "region": "eu"}, {"ruleset": "gdpr", "region": "us"},
+            {"ruleset": "aml", "region": "eu"}]
+    index.add_many(range(3), rows)
+    assert index.match({"ruleset": "gdpr", "region": "eu"}, rows.__getitem__).rows().tolist() == [0]
+    assert index.match({"region": ["eu"]}, rows.__getitem__, lambda: range(3)).rows().tolist() == [0, 2]
+
+    store = RAGStore(embedding_dim=2)
+    for i, region in enumerate(["eu", "us", "eu"]):
+        chunks = store.chunk_text("Clause text. " * 5, f"doc-{i}", metadata={"region": region})
+        store.embed_chunks(chunks, [[1.0, float(i)] for _ in chunks])
+    results = store.retrieve_similar([1.0, 0.0], top_k=1000, filters={"region": "eu"})
+    assert {chunk.doc_id for chunk, _ in results} == {"doc-0", "doc-2"}
+    results = store.retrieve_similar([1.0, 0.0], top_k=1000, doc_id="doc-1", filters={"region": "eu"})
+    assert results == []
+
+
+def test_retrieve_similar_applies_metadata_filters():
+    store = _store_with_docs()
+    results = store.retrieve_similar([1.0, 0.0], top_k=1000, filters={"severity": "high"})
+    assert {chunk.doc_id for chunk, _ in results} == {"doc-a", "doc-c"}
+
+    results = store.retrieve_similar([1.0, 0.0], top_k=1000, doc_id="doc-b", filters={"ruleset": "gdpr"})
+    assert {chunk.doc_id for chunk, _ in results} == {"doc-b"}
+
+    store.clear_document("doc-a")
+    results = store.retrieve_similar([1.0, 0.0], top_k=1000, filters={"severity": "high"})
+    assert {chunk.doc_id for chunk, _ in results} == {"doc-c"}
+
+
+def test_document_index_orders_chunks_and_supports_removal():
+    store = RAGStore(embedding_dim=2)
+    text = "First sentence here. " * 200
+    chunks = store.chunk_text(text, "doc-a")
+    store.chunk_text("Other document. " * 100, "doc-b")
+
+    doc_chunks = store.get_document_chunks("doc-a")
+    assert [c.id for c in doc_chunks] == [c.id for c in chunks]
+    assert [c.start_pos for c in doc_chunks] == sorted(c.start_pos for c in doc_chunks)
+
+    middle = chunks[2]
+    expected = " ".join(c.text for c in chunks[1:4])
+    assert store.get_context_around_chunk(middle.id, context_chunks=1) == expected
+
+    stats = store.get_stats()
+    assert stats["total_documents"] == 2
+    assert set(stats["document_ids"]) == {"doc-a", "doc-b"}
+
+    store.clear_document("doc-a")
+    assert store.get_document_chunks("doc-a") == []
+    assert store.get_stats()["document_ids"] == ["doc-b"]
+    assert all(c.doc_id == "doc-b" for c in store.chunks.values())
+
+
+def test_chunks_are_views_over_columnar_storage():
+    store = RAGStore(embedding_dim=3)
+    chunks = store.chunk_text("Clause one applies. " * 120, "doc-a", metadata={"ruleset": "gdpr"})
+    store.embed_chunks(chunks, [[1.0, 0.0, float(i)] for i in range(len(chunks))])
+
+    chunk = store.chunks[chunks[1].id]
+    assert chunk == chunks[1]
+    assert chunk.text.startswith("Clause")
+    assert chunk.metadata == {"ruleset": "gdpr"}
+    assert chunk.embedding.dtype.name == "float32"
+    assert list(store.embeddings[chunk.id]) == [1.0, 0.0, 1.0]
+    assert not hasattr(chunk, "__dict__")
+
+    # A 3-dim float32 row instead of boxed Python floats per chunk.
+    text_bytes = sum(len(c.text) for c in chunks)
+    assert store.memory_usage() < text_bytes + len(chunks) * 200 + 64 * 64
+
+
+def test_compact_preserves_live_chunks_and_filters():
+    store = _store_with_docs()
+    kept = {cid: store.chunks[cid].text for cid in store.chunks if cid.startswith("doc-c")}
+    store.clear_document("doc-a")
+    store.clear_document("doc-b")
+    store.compact()
+
+    assert {cid: store.chunks[cid].text for cid in store.chunks} == kept
+    results = store.retrieve_similar([1.0, 2.0], top_k=1000, filters={"ruleset": "aml"})
+    assert len(results) == len(kept)
+    assert all(abs(score - 1.0) < 1e-6 for _, score in results)
+    assert store.get_document_chunks("doc-c")[0].id in kept
+
+
+def _clustered_store(n: int = 600, dim: int = 32) -> tuple:
+    import numpy as np
+
+    from backend.app.services.rag_store import TextChunk
+
+    rng = np.random.default_rng(1)
+    centres = rng.normal(size=(12, dim))
+    vectors = (centres[rng.integers(0, 12, n)] + 0.2 * rng.normal(size=(n, dim))).astype("float32")
+    store = RAGStore(embedding_dim=dim)
+    chunks = [TextChunk(id=f"c{i}", doc_id="doc", text="t", start_pos=i, end_pos=i + 1) for i in range(n)]
+    for chunk in chunks:
+        store._add_chunk(chunk)
+    store.embed_chunks(chunks, vectors)
+    return store, vectors
+
+
+def test_quantized_retrieval_reranks_with_exact_scores(tmp_path):
+    for kind, options in (("int8", {}), ("pq", {"n_subspaces": 8})):
+        store, vectors = _clustered_store()
+        exact = store.retrieve_similar(vectors[7], top_k=5)
+        store.enable_quantization(kind, mmap_path=str(tmp_path / f"{kind}.f32"), rerank_factor=8, **options)
+        approx = store.retrieve_similar(vectors[7], top_k=5)
+
+        assert approx[0][0].id == "c7"
+        assert abs(approx[0][1] - 1.0) < 1e-5  # exact score after re-ranking
+        assert len({c.id for c, _ in approx} & {c.id for c, _ in exact}) >= 4
+        assert (tmp_path / f"{kind}.f32").stat().st_size >= vectors.nbytes
+
+
+def test_quantized_codes_follow_rows_embedded_out_of_order():
+    store = RAGStore(embedding_dim=2)
+    chunks = [store.chunk_text(f"Clause {i}.", f"doc-{i}")[0] for i in range(4)]
+    store.embed_chunks(chunks, [[1.0, 1.0]] * len(chunks))
+    store.enable_quantization("int8")
+    vectors = [[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, -1.0]]
+    order = [0, 2, 1, 3]
+    store.embed_chunks([chunks[i] for i in order], [vectors[i] for i in order])
+
+    for i, vector in enumerate(vectors):
+        row = store._rows[chunks[i].id]
+        assert store._codes.approx_dot(np.asarray(vector, dtype=np.float32), np.array([row]))[0] > 0.9
+
+
+async def test_store_document_reembeds_only_changed_chunks_of_new_version():
+    calls = []
+
+    async def embed(texts):
+        calls.append(len(texts))
+        return [[1.0, float(len(t))] for t in texts]
+
+    store = RAGStore(embedding_dim=2)
+    clauses = [f"Clause {i} requires notice within {i % 30 + 1} days of the event." for i in range(600)]
+    v1 = await store.store_document("msa", " ".join(clauses), {"contract_type": "msa-v1"}, embed_fn=embed)
+    assert calls == [len(v1)]
+
+    clauses[300] = "Clause 300 now allows termination for convenience on ninety days notice."
+    v2 = await store.store_document("msa", " ".join(clauses), {"contract_type": "msa-v2"}, embed_fn=embed)
+
+    assert len(calls) == 2 and calls[1] <= 2
+    retired = {c.id for c in v1} - {c.id for c in v2}
+    assert len(retired) == calls[1]
+    assert not any(cid in store.chunks for cid in retired)
+    assert [c.id for c in store.get_document_chunks("msa")] == [c.id for c in v2]
+    assert all(c.metadata == {"contract_type": "msa-v2"} for c in v2)
+    assert store.retrieve_similar([1.0, 0.0], top_k=1000, filters={"contract_type": "msa-v1"}) == []
+    assert store.ingest_stats["chunks_reused"] == len(v2) - calls[1]
+
+
+async def test_compact_with_rows_never_encoded(monkeypatch):
+    monkeypatch.setattr("backend.app.services.rag_store._COMPACT_MIN_DEAD", 64)
+    store = RAGStore(embedding_dim=2)
+    store.enable_quantization("int8")
+    for doc_id in ("a", "b", "c"):
+        text = " ".join(f"Clause {i} of {doc_id} requires notice within {i} days." for i in range(1500))
+        await store.store_document(doc_id, text, {})
+    store.clear_document("a")
+    store.clear_document("b")
+
+    assert store._columns.dead == 0  # compacted
+    assert len(store.get_document_chunks("c")) == len(store.chunks)
+    store.train_quantizer()
+    assert len(store.retrieve_similar([1.0, 0.0], top_k=3)) == 3
+
+
+async def test_embedding_calls_skip_batches_served_by_clause_cache(monkeypatch):
+    import sys
+
+    from rag.clause_cache import ClauseCache
+
+    # ``rag.clause_cache`` the attribute is the shared instance, not the module
+    monkeypatch.setattr(sys.modules["rag.clause_cache"], "clause_cache", ClauseCache())
+    calls = []
+
+    async def embed(texts):
+        calls.append(len(texts))
+        return [[1.0, float(len(t))] for t in texts]
+
+    store = RAGStore(embedding_dim=2)
+    text = " ".join(f"Clause {i} requires notice within {i} days." for i in range(50))
+    await store.store_document("a", text, {}, embed_fn=embed, embedding_model="m")
+    await store.store_document("b", text, {}, embed_fn=embed, embedding_model="m")
+
+    assert len(calls) == 1
+    assert store.ingest_stats["embedding_calls"] == 1
+
+
+def test_compact_drops_interned_metadata_of_removed_rows():
+    store = RAGStore(embedding_dim=2)
+    for i in range(20):
+        chunks = store.chunk_text("Clause text. " * 5, f"doc-{i}", metadata={"version": i})
+        store.embed_chunks(chunks, [[1.0, float(i)] for _ in chunks])
+    for i in range(19):
+        store.clear_document(f"doc-{i}")
+    store.compact()
+
+    columns = store._columns
+    assert columns._doc_ids == ["doc-19"]
+    assert columns._metadata == [{"version": 19}]
+    chunk = store.get_document_chunks("doc-19")[0]
+    assert chunk.doc_id == "doc-19" and chunk.metadata == {"version": 19}
+    assert store.retrieve_similar([1.0, 19.0], top_k=5, filters={"doc_id": "doc-19"})
+
+
+def test_chunk_metadata_cannot_be_mutated_through_the_store():
+    store = RAGStore(embedding_dim=2)
+    metadata = {"ruleset": "gdpr"}
+    chunks = store.chunk_text("Clause text. " * 5, "doc-a", metadata=metadata)
+    metadata["ruleset"] = "aml"
+    store.chunks[chunks[0].id].metadata["ruleset"] = "aml"
+
+    assert all(c.metadata == {"ruleset": "gdpr"} for c in store.get_document_chunks("doc-a"))
@@ -0,0 +1,97 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from backend.app.services.rag_store import RAGStore, TextChunk  # noqa: E402
+from backend.app.services.reranker import CrossEncoderReranker  # noqa: E402
+from rag import query as rag_query  # noqa: E402
+
+
+class KeywordCrossEncoder:
+    """Scores a pair by how often the query's words occur in the passage."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(len(pairs))
+        return [sum(passage.lower().count(w) for w in query.lower().split()) for query, passage in pairs]
+
+
+def test_rerank_batches_uncached_pairs_and_caches_scores():
+    model = KeywordCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, batch_size=2)
+    candidates = [
+        ("c1", "payment terms", "a"),
+        ("c2", "liability cap and liability carve-outs", "b"),
+        ("c3", "governing law", "c"),
+    ]
+
+    ranked = reranker.rerank("liability", candidates, top_n=2)
+    assert [payload for payload, _ in ranked] == ["b", "a"]
+    assert model.calls == [3]
+
+    reranker.rerank("  Liability ", candidates + [("c4", "liability", "d")])
+    assert model.calls == [3, 1]
+    assert reranker.stats["cache_hits"] == 3
+    assert reranker.stats["batches"] == 3
+
+
+def test_store_retrieve_reranked_overfetches_candidates():
+    store = RAGStore(embedding_dim=2)
+    texts = ["termination for convenience", "liability is capped", "notices clause", "liability excluded"]
+    chunks = [TextChunk(id=f"c{i}", doc_id="doc", text=t, start_pos=i, end_pos=i + 1) for i, t in enumerate(texts)]
+    for chunk in chunks:
+        store._add_chunk(chunk)
+    store.embed_chunks(chunks, [[1.0, 0.0], [0.5, 0.5], [0.9, 0.1], [0.1, 0.9]])
+
+    reranker = CrossEncoderReranker(model=KeywordCrossEncoder())
+    results = store.retrieve_reranked("liability", [1.0, 0.0], reranker, top_k=2, candidates=4)
+    assert {chunk.id for chunk, _ in results} == {"c1", "c3"}
+
+
+def test_query_retrieve_reranks_fused_results(monkeypatch):
+    requested = []
+
+    def fake_query_collection(db_path, collection_name, query, n_results, filters=None):
+        requested.append(n_results)
+        return [
+            {"id": f"{collection_name}-{i}", "text": text, "source": f"{collection_name}-{i}", "rank": i + 1}
+            for i, text in enumerate(["indemnity", "data breach notification", "breach of contract"][:n_results])
+        ]
+
+    monkeypatch.setattr(rag_query, "_query_collection", fake_query_collection)
+    reranker = CrossEncoderReranker(model=KeywordCrossEncoder())
+    out = rag_query.retrieve("breach", k_contracts=1, k_authority=1, reranker=reranker, rerank_top_n=2)
+
+    assert requested == [3, 3]
+    assert len(out["results"]) == 2
+    assert all("breach" in r["text"] for r in out["results"])
+    assert all("rerank_score" in r for r in out["results"])
+
+
+def test_query_rerank_cache_is_keyed_by_chunk_not_source(monkeypatch):
+    chunks = {"gdpr": ("c1", "breach notification within 72 hours"), "aml": ("c2", "payment terms")}
+
+    def fake_query_collection(db_path, collection_name, query, n_results, filters=None):
+        chunk_id, text = chunks[filters["ruleset"]]
+        return [{"id": chunk_id, "text": text, "source": "contract-1", "rank": 1}]
+
+    monkeypatch.setattr(rag_query, "_query_collection", fake_query_collection)
+    model = KeywordCrossEncoder()
+    reranker = CrossEncoderReranker(model=model)
+    first = rag_query.retrieve("breach", ruleset="gdpr", reranker=reranker)["results"]
+    second = rag_query.retrieve("breach", ruleset="aml", reranker=reranker)["results"]
+
+    assert first[0]["id"] == "c1" and first[0]["rerank_score"] > 0
+    assert second[0]["id"] == "c2" and second[0]["rerank_score"] == 0
+    assert model.calls == [1, 1]
+
+
+def test_query_fusion_keeps_chunks_of_one_source():
+    contract = [{"id": f"msa-{i}", "text": f"clause {i}", "source": "msa", "rank": i + 1} for i in range(3)]
+    authority = [{"id": "msa-1", "text": "clause 1", "source": "msa", "rank": 1}]
+    fused = rag_query._rrf([contract, authority], top_k=10)
+
+    assert [r["id"] for r in fused] == ["msa-1", "msa-0", "msa-2"]
+    assert {r["source"] for r in fused} == {"msa"}
@@ -0,0 +1,109 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.backend.app.core import vectors  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = vectors.VectorStore(str(tmp_path / "vectors.db"))
+    monkeypatch.setattr(vectors, "_vector_store", store)
+    monkeypatch.setattr(vectors, "EMBEDDING_BACKEND", "hashing")
+    return store
+
+
+async def test_batch_add_and_filtered_search(store):
+    ids = await vectors.batch_add_documents([
+        {"text": "The processor shall notify the controller of a personal data breach",
+         "source": "dpa.pdf", "source_type": "contract", "page": 1, "paragraph": 1},
+        {"text": "Liability is capped at the fees paid in the preceding twelve months",
+         "source": "msa.pdf", "source_type": "contract", "page": 4, "paragraph": 2},
+        {"text": "The controller must notify the supervisory authority of a personal data breach",
+         "source": "gdpr", "source_type": "statute", "page": None, "paragraph": 33,
+         "metadata": {"article": 33}},
+    ])
+    assert len(set(ids)) == 3 and store.count() == 3
+
+    results = await vectors.search_documents("notify personal data breach", limit=2)
+    assert {r["source"] for r in results} == {"dpa.pdf", "gdpr"}
+    assert results[0]["score"] >= results[1]["score"]
+
+    statute = await vectors.search_documents("notify personal data breach", source_type="statute")
+    assert [r["source"] for r in statute] == ["gdpr"]
+    assert statute[0]["metadata"] == {"article": 33} and statute[0]["sourceType"] == "statute"
+
+    only_msa = await vectors.search_documents("breach", source_type="contract", source="msa.pdf")
+    assert [r["paragraph"] for r in only_msa] == [2]
+    assert await vectors.search_documents("breach", source="missing.pdf") == []
+
+
+async def test_reingest_upserts_and_delete(store):
+    doc = {"text": "Governing law is England and Wales", "source": "msa.pdf", "page": 9, "paragraph": 1}
+    first = await vectors.batch_add_documents([doc])
+    again = await vectors.add_document(**doc)
+    assert first == [again] and store.count() == 1
+
+    assert await vectors.delete_document(again) is True
+    assert await vectors.delete_document(again) is False
+    assert await vectors.search_documents("governing law") == []
+
+
+async def test_embedder_hook_and_dimension_check(store):
+    calls = []
+
+    async def embed(texts):
+        calls.append(len(texts))
+        return [[1.0, float(len(t))] for t in texts]
+
+    vectors.set_embedder(embed)
+    try:
+        await vectors.batch_add_documents([{"text": "a"}, {"text": "bb"}])
+        assert calls == [2]
+        with pytest.raises(ValueError):
+            store.search([1.0, 0.0, 0.0])
+    finally:
+        vectors.set_embedder(None)
+
+
+def test_concurrent_readers_see_writes_from_another_connection(tmp_path):
+    path = str(tmp_path / "shared.db")
+    writer = vectors.VectorStore(path)
+    reader = vectors.VectorStore(path)
+    embeddings = vectors.hashing_embed(["indemnity clause", "termination for convenience"])
+    writer.upsert([{"id": "a", "text": "indemnity clause"}, {"id": "b", "text": "termination for convenience"}],
+                  embeddings)
+
+    query = vectors.hashing_embed(["indemnity"])[0]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: reader.search(query, limit=1), range(16)))
+    assert all(r[0]["id"] == "a" for r in results)
+
+    writer.delete("a")
+    assert [r["id"] for r in reader.search(query, limit=5)] == ["b"]
+
+
+def test_own_writes_patch_the_snapshot_without_reloading(tmp_path, monkeypatch):
+    store = vectors.VectorStore(str(tmp_path / "vectors.db"))
+    loads = []
+    load = store._load_snapshot
+    monkeypatch.setattr(store, "_load_snapshot", lambda: loads.append(1) or load())
+    embeddings = np.random.default_rng(0).normal(size=(2100, 16)).astype(np.float32)
+    for i in range(2100):
+        store.upsert([{"id": str(i), "text": f"clause {i}", "source_type": "contract" if i % 2 else "statute"}],
+                     embeddings[i:i + 1])
+        if i % 50 == 0:
+            assert store.search(embeddings[i], limit=1)[0]["id"] == str(i)
+    for i in range(1800):
+        store.delete(str(i))
+    store.upsert([{"id": "2000", "text": "audit rights", "source_type": "statute"}], embeddings[:1])
+
+    assert len(loads) == 1
+    assert store._snapshot.dead < 1800  # compacted
+    found = store.search(embeddings[0], limit=300, source_type="statute")
+    assert found[0]["id"] == "2000" and found[0]["content"] == "audit rights"
+    assert {r["id"] for r in found} == {str(i) for i in range(1800, 2100, 2)}